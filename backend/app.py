@@ -1,76 +1,1081 @@
-from flask import Flask, jsonify, request
+import cProfile
+import csv
+import datetime
+import decimal
+import functools
+import io
+import json
+import math
+import os
+import pstats
+import re
+import secrets
+import time
+
+import click
+from flask import Blueprint, Flask, Response, current_app, g, has_request_context, jsonify, request, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+import numpy as np
 import pandas as pd
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+
+from auth import DUMMY_HASH, HasherBusy, PasswordHasher, TokenSigner, is_hashed
+from cache import ResponseCache
+from metrics import Registry
+from serialization import (
+    ARROW_MIMETYPE, JSON_MIMETYPE, MSGPACK_MIMETYPE, columnar_mimetypes, compress, compress_stream, content_codings,
+    encode_columns, json_provider_class
+)
+
+try:
+    import pyinstrument
+except ImportError:  # optional; ?profile=1 falls back to cProfile
+    pyinstrument = None
+
+# Routes live on a blueprint; create_app() builds and configures the Flask app around it
+bp = Blueprint('finance', __name__, cli_group=None)
+
+# Settings taken from the environment; create_app(config) can override any of them
+def default_config():
+    return {
+        # Any SQLAlchemy URL; the default SQLite file is created in the instance folder
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('FINANCE_DATABASE_URI', 'sqlite:///finance.db'),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        # Connection pool: one connection per concurrent request thread plus some overflow
+        'DB_POOL_SIZE': int(os.environ.get('FINANCE_DB_POOL_SIZE', 8)),
+        'DB_POOL_OVERFLOW': int(os.environ.get('FINANCE_DB_POOL_OVERFLOW', 8)),
+        'DB_POOL_TIMEOUT': int(os.environ.get('FINANCE_DB_POOL_TIMEOUT', 10)),  # seconds
+        'SQLITE_PROFILE': os.environ.get('FINANCE_SQLITE_PROFILE', 'wal'),
+        # Run migrations and DDL in create_app(); turn off for workers and run `flask init-db` once instead
+        'AUTO_INIT_DB': os.environ.get('FINANCE_AUTO_INIT_DB', '1') != '0',
+        # Bounds for the in-process cache of read responses
+        'RESPONSE_CACHE_MAX_ENTRIES': 1024,
+        'RESPONSE_CACHE_TTL': 60,  # seconds
+        # Signs session tokens; set it in production so tokens survive restarts and work across workers
+        'SECRET_KEY': os.environ.get('FINANCE_SECRET_KEY') or secrets.token_hex(32),
+        'AUTH_TOKEN_TTL': int(os.environ.get('FINANCE_AUTH_TOKEN_TTL', 86400)),  # seconds
+        # Reject requests without a session token; when off, tokenless requests act for the user_id they name
+        'AUTH_REQUIRED': os.environ.get('FINANCE_AUTH_REQUIRED', '0') == '1',
+        # Password hashes computed at once, and how many more may wait before logins get a 503
+        'PASSWORD_HASH_WORKERS': int(os.environ.get('FINANCE_PASSWORD_HASH_WORKERS', os.cpu_count() or 1)),
+        'PASSWORD_HASH_QUEUE': int(os.environ.get('FINANCE_PASSWORD_HASH_QUEUE', 16)),
+        # Repeat logins with the same credentials within this window skip the password hash
+        'LOGIN_CACHE_MAX_ENTRIES': 4096,
+        'LOGIN_CACHE_TTL': 300,  # seconds
+        # 'orjson', 'stdlib', or 'auto' to use orjson when it is installed
+        'JSON_PROVIDER': os.environ.get('FINANCE_JSON_PROVIDER', 'auto'),
+        # Compress responses for clients that accept it; turn off behind a proxy that compresses
+        'COMPRESSION_ENABLED': os.environ.get('FINANCE_COMPRESSION', '1') == '1',
+        'COMPRESSION_MIN_SIZE': 1024,  # bytes; smaller bodies of uncached routes are sent as is
+        # Route and SQL instrumentation served at /metrics
+        'METRICS_ENABLED': os.environ.get('FINANCE_METRICS', '1') == '1',
+        # Let any request ask for a profile of itself with ?profile=1; keep off in production
+        'PROFILING_ENABLED': os.environ.get('FINANCE_PROFILING', '0') == '1',
+    }
+
+# SQLite storage profiles, applied as PRAGMAs to every new pooled connection.
+# 'wal' lets readers keep going while a writer commits; 'rollback' is SQLite's stock journal.
+SQLITE_PROFILES = {
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # fsync at checkpoints only, which WAL keeps crash-safe
+        'cache_size': -65536,  # negative means KiB: a 64 MiB page cache per connection
+        'mmap_size': 268435456,  # serve reads of the first 256 MiB through mmap
+        'busy_timeout': 5000,  # ms to wait for the write lock before "database is locked"
+        'temp_store': 'MEMORY',
+    },
+    'rollback': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+}
+
+# Pool options for the configured database; in-memory SQLite lives in a single connection
+def engine_options(config):
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_POOL_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_pre_ping': url.get_backend_name() != 'sqlite',  # server connections can drop while idle
+    }
+
+# Initialize the database; bound to the app in create_app()
+db = SQLAlchemy()
+
+# Apply a SQLite profile's PRAGMAs when the pool opens a connection
+def apply_sqlite_profile(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in pragmas.items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    cursor.close()
+
+# Serialized get_expenses/visualize responses, invalidated per user by the write handlers; sized in create_app()
+response_cache = ResponseCache()
+
+# Password hashing pool, session token signer and cache of recent logins, all configured in create_app()
+password_hasher = PasswordHasher()
+token_signer = TokenSigner()
+login_cache = ResponseCache()  # username -> {credential fingerprint: (user_id, token)}
+
+# Ids of users known to exist; users are never deleted, so entries never go stale
+known_users = set()
 
-# Initialize the Flask app
-app = Flask(__name__)
+# Request and SQL instrumentation exported at /metrics
+metrics = Registry()
+request_latency = metrics.histogram(
+    'finance_http_request_duration_seconds', 'Time to produce a response, by route.', ('endpoint', 'method', 'status'))
+request_sql_statements = metrics.histogram(
+    'finance_http_request_sql_statements', 'SQL statements executed per request.', ('endpoint',),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100))
+request_sql_seconds = metrics.histogram(
+    'finance_http_request_sql_seconds', 'Time spent executing SQL per request.', ('endpoint',))
+request_sql_rows = metrics.histogram(
+    'finance_http_request_sql_rows', 'Rows returned by SQL queries per request.', ('endpoint',),
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000, 1000000))
+sql_statement_seconds = metrics.histogram(
+    'finance_sql_statement_duration_seconds', 'Time per SQL statement, by leading keyword.', ('operation',))
 
-# Configure the SQLite database
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///finance.db'  # Database file will be created in the project directory
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Response cache counters, read when /metrics is scraped
+def response_cache_metrics():
+    for name, value in response_cache.stats().items():
+        kind = 'gauge' if name in ('entries', 'max_entries', 'ttl') else 'counter'
+        yield f"finance_response_cache_{name}", kind, f"Response cache {name.replace('_', ' ')}.", value
 
-# Initialize the database
-db = SQLAlchemy(app)
+metrics.add_collector(response_cache_metrics)
+
+# Functions listed in a cProfile report
+PROFILE_TOP_FUNCTIONS = 40
 
 # Define the User model
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
-    password = db.Column(db.String(50), nullable=False)
+    password = db.Column(db.String(255), nullable=False)  # scrypt hash; plaintext rows are rehashed on login
+
+# Longest client-generated expense id accepted
+CLIENT_ID_MAX = 64
 
 # Define the Expense model
 class Expense(db.Model):
+    # Composite indexes serving per-user category aggregations and date-ordered pages; client ids are unique per user
+    __table_args__ = (
+        db.Index('ix_expense_user_category_date', 'user_id', 'category', 'date'),
+        db.Index('ix_expense_user_date', 'user_id', 'date'),
+        db.Index('ix_expense_user_version', 'user_id', 'version'),
+        db.Index('ix_expense_user_client_id', 'user_id', 'client_id', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    date = db.Column(db.String(10), nullable=False)  # Format: YYYY-MM-DD
+    date = db.Column(db.Date, nullable=False)
     category = db.Column(db.String(50), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount_paise = db.Column(db.BigInteger, nullable=False)  # Exact amount in minor units; the API speaks rupees
     description = db.Column(db.String(200))
+    # Data version of the write that last touched the row; clients sync the rows newer than theirs
+    version = db.Column(db.Integer, nullable=False, server_default='0')
+    # Id the client generated for the expense; an upload replayed with the same id is not stored twice
+    client_id = db.Column(db.String(CLIENT_ID_MAX))
+
+# Largest paise amount the 64-bit amount columns hold
+MAX_PAISE = 2**63 - 1
+
+# Convert a rupee amount (number or numeric string) to exact integer paise; raises ValueError when out of range
+def to_paise(amount):
+    paise = int((decimal.Decimal(str(amount)) * 100).to_integral_value(decimal.ROUND_HALF_UP))
+    if abs(paise) > MAX_PAISE:
+        raise ValueError("amount out of range")
+    return paise
+
+# Convert integer paise back to the rupee amount the API returns
+def from_paise(paise):
+    return paise / 100
+
+# Parse an optional YYYY-MM-DD query argument; raises ValueError when malformed
+def date_arg(name):
+    value = request.args.get(name)
+    return datetime.date.fromisoformat(value) if value else None
+
+# Per-user category totals by month, kept up to date by the expense write handlers
+class CategoryTotal(db.Model):
+    __tablename__ = 'category_totals'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # Format: YYYY-MM
+    total_paise = db.Column(db.BigInteger, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# Name of the bound database's dialect, e.g. 'sqlite' or 'postgresql'
+def dialect_name():
+    return db.engine.dialect.name
+
+# INSERT that supports on_conflict_do_update() on the bound database
+def upsert(table):
+    if dialect_name() == 'postgresql':
+        return postgresql_insert(table)
+    return sqlite_insert(table)
+
+# SQL string literal for a constant argument. Expressions that appear in both SELECT and GROUP BY must
+# not take bound parameters: drivers that bind on the server (psycopg 3) send each occurrence as its own
+# parameter, and PostgreSQL then no longer sees the two expressions as the same.
+def sql_literal(value):
+    return db.literal(value, literal_execute=True)
+
+# YYYY-MM label of a date column in the bound database's dialect
+def month_label(column):
+    if dialect_name() == 'postgresql':
+        return db.func.to_char(column, sql_literal('YYYY-MM'))
+    return db.func.strftime(sql_literal('%Y-%m'), column)
+
+# Sum of a paise column as a 64-bit integer; PostgreSQL widens SUM(bigint) to numeric, which reads back as Decimal
+def sum_paise(column):
+    return db.cast(db.func.sum(column), db.BigInteger)
+
+# Totals per (user, category, month) recomputed from the Expense table
+def expense_totals_select():
+    month = month_label(Expense.date)
+    return db.select(
+        Expense.user_id, Expense.category, month.label('month'),
+        sum_paise(Expense.amount_paise).label('total_paise'), db.func.count().label('count')
+    ).group_by(Expense.user_id, Expense.category, month)
+
+# Recompute the whole category_totals and category_stats tables from Expense
+def rebuild_category_totals():
+    db.session.execute(db.delete(CategoryTotal))
+    db.session.execute(
+        db.insert(CategoryTotal).from_select(['user_id', 'category', 'month', 'total_paise', 'count'], expense_totals_select())
+    )
+    db.session.execute(db.delete(CategoryStats))
+    db.session.execute(
+        db.insert(CategoryStats).from_select(['user_id', 'category', 'count', 'mean_paise', 'm2'], expense_stats_select())
+    )
+    db.session.commit()
+
+# Build the category_totals delta for adding (sign=1) or removing (sign=-1) an expense
+def category_delta(user_id, category, date, amount_paise, sign=1):
+    return {"user_id": user_id, "category": category, "month": date.strftime('%Y-%m'),
+            "total_paise": sign * amount_paise, "count": sign}
+
+# Upsert adding deltas to category_totals, built once per dialect since the write handlers run it on every write
+@functools.cache
+def category_totals_upsert(dialect):
+    table = CategoryTotal.__table__
+    stmt = upsert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.category, table.c.month],
+        set_={"total_paise": table.c.total_paise + stmt.excluded.total_paise, "count": table.c.count + stmt.excluded.count}
+    )
+
+# Add deltas to category_totals in the caller's transaction, creating rows as needed
+def apply_category_deltas(deltas):
+    if deltas:
+        db.session.execute(category_totals_upsert(dialect_name()), deltas)
+
+# Per-user data version, bumped by every expense write; the read routes use it as their ETag
+class DataVersion(db.Model):
+    __tablename__ = 'data_versions'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Current data version of a user (0 until their first write)
+def data_version(user_id):
+    return db.session.execute(data_version_select(user_id)).scalar() or 0
+
+# Statement reading a user's data version
+def data_version_select(user_id):
+    return db.select(DataVersion.version).where(DataVersion.user_id == user_id)
+
+# Bump the data version of the given users in the caller's transaction; returns {user_id: new version}.
+# The bump locks the user's row until commit, so rows tagged with a version commit in version order.
+def bump_data_versions(user_ids):
+    table = DataVersion.__table__
+    stmt = upsert(table)
+    stmt = stmt.on_conflict_do_update(index_elements=[table.c.user_id], set_={"version": table.c.version + 1})
+    versions = {}
+    for user_id in user_ids:
+        versions[user_id] = db.session.execute(stmt.returning(table.c.version),
+                                               {"user_id": user_id, "version": 1}).scalar_one()
+    return versions
+
+# Ids of deleted expenses with the data version of the delete, for clients syncing deletions
+class ExpenseTombstone(db.Model):
+    __tablename__ = 'expense_tombstones'
+    __table_args__ = (db.Index('ix_expense_tombstone_user_version', 'user_id', 'version'),)
+
+    expense_id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+
+# Per-user monthly spending limit for a category
+class Budget(db.Model):
+    __tablename__ = 'budgets'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    limit_paise = db.Column(db.BigInteger, nullable=False)
+
+# Running count, mean and sum of squared deviations of each user's expense amounts per category,
+# kept up to date by the expense write handlers; new expenses are scored against it for anomalies
+class CategoryStats(db.Model):
+    __tablename__ = 'category_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    mean_paise = db.Column(db.Float, nullable=False, default=0)
+    m2 = db.Column(db.Float, nullable=False, default=0)  # Sum of squared deviations from the mean, in paise²
+
+# Budget and anomaly alerts raised by expense writes
+class Alert(db.Model):
+    __tablename__ = 'alerts'
+    __table_args__ = (db.Index('ix_alert_user_id', 'user_id', 'id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # 'budget' or 'anomaly'
+    category = db.Column(db.String(50), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # Format: YYYY-MM
+    amount_paise = db.Column(db.BigInteger, nullable=False)  # The expense for anomalies, the month's total for budgets
+    score = db.Column(db.Float, nullable=False)  # z-score for anomalies, share of the budget used for budgets
+    expense_id = db.Column(db.Integer)  # Set for single inserts; bulk inserts do not return ids
+    message = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+
+# Build the category_stats delta for adding (sign=1) or removing (sign=-1) a group of amounts
+def stats_delta(user_id, category, count, mean_paise, m2, sign=1):
+    return {"user_id": user_id, "category": category, "count": sign * count, "mean_paise": mean_paise,
+            "m2": sign * m2}
+
+# category_stats deltas for (user_id, category, amount_paise) rows, merged per category with Welford's update
+def merged_stats_deltas(rows, sign=1):
+    merged = {}
+    for user_id, category, amount_paise in rows:
+        count, mean, m2 = merged.get((user_id, category), (0, 0.0, 0.0))
+        count += 1
+        delta = amount_paise - mean
+        mean += delta / count
+        merged[(user_id, category)] = (count, mean, m2 + delta * (amount_paise - mean))
+    return [stats_delta(user_id, category, count, mean, m2, sign)
+            for (user_id, category), (count, mean, m2) in merged.items()]
+
+# ON CONFLICT clause merging a stats delta into category_stats with Chan's parallel update. A removal is
+# the same merge with a negative count and m2, so every write costs O(1) per (user, category).
+def merge_category_stats(stmt):
+    table, new = CategoryStats.__table__, stmt.excluded
+    count = table.c.count + new.count
+    delta = new.mean_paise - table.c.mean_paise
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.category],
+        set_={
+            "count": count,
+            "mean_paise": db.case((count == 0, 0.0), else_=table.c.mean_paise + delta * new.count / count),
+            "m2": db.case((count == 0, 0.0), else_=table.c.m2 + new.m2 + delta * delta * table.c.count * new.count / count),
+        }
+    )
 
-# Create the database tables
-with app.app_context():
+# Upsert merging deltas into category_stats, optionally returning the merged row; built once per dialect
+# and variant, since building the merge expressions costs more than running them
+@functools.cache
+def category_stats_upsert(dialect, returning=False):
+    table = CategoryStats.__table__
+    stmt = merge_category_stats(upsert(table))
+    return stmt.returning(table.c.count, table.c.mean_paise, table.c.m2) if returning else stmt
+
+# Add stats deltas to category_stats in the caller's transaction, creating rows as needed
+def apply_stats_deltas(deltas):
+    if deltas:
+        db.session.execute(category_stats_upsert(dialect_name()), deltas)
+
+# (count, mean, m2) from before amount_paise was merged into the given stats; undoes one Welford step
+def stats_without(amount_paise, count, mean_paise, m2):
+    count -= 1
+    if count == 0:
+        return 0, 0.0, 0.0
+    before = (mean_paise * (count + 1) - amount_paise) / count
+    return count, before, m2 - (amount_paise - before) * (amount_paise - mean_paise)
+
+# Count, mean and sum of squared deviations per (user, category) recomputed from the Expense table,
+# as category_stats deltas for adding (sign=1) or removing (sign=-1) the selected rows
+def expense_stats_select(sign=1):
+    amount = db.cast(Expense.amount_paise, db.Float)
+    count = db.func.count()
+    m2 = db.func.sum(amount * amount) - db.func.sum(amount) * db.func.sum(amount) / count
+    return db.select(
+        Expense.user_id, Expense.category, (sign * count).label('count'), db.func.avg(amount).label('mean_paise'),
+        (sign * m2).label('m2')
+    ).group_by(Expense.user_id, Expense.category)
+
+# Expenses in a category with at least this many earlier ones are scored for anomalies
+ANOMALY_MIN_COUNT = 10
+# z-score above the category's mean that flags an expense as an anomaly
+ANOMALY_Z_SCORE = 3.0
+# Fractions of a monthly budget whose crossing raises an alert
+BUDGET_ALERT_THRESHOLDS = (0.8, 1.0)
+
+# z-scores of amounts against (count, mean, m2) stats taken before they were written; NaN when too few
+def anomaly_scores(amount_paise, count, mean_paise, m2):
+    count = np.asarray(count, dtype=float)
+    std = np.sqrt(np.maximum(m2, 0) / np.maximum(count - 1, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (np.asarray(amount_paise, dtype=float) - mean_paise) / std
+    return np.where((count >= ANOMALY_MIN_COUNT) & (std > 0), scores, np.nan)
+
+# Alert row for an expense scored above ANOMALY_Z_SCORE
+def anomaly_alert(user_id, category, date, amount_paise, score, mean_paise, expense_id=None):
+    return {"user_id": user_id, "kind": "anomaly", "category": category, "month": date.strftime('%Y-%m'),
+            "amount_paise": amount_paise, "score": float(score), "expense_id": expense_id,
+            "message": f"₹{from_paise(amount_paise):.2f} on {category} is {score:.1f} standard deviations "
+                       f"above its ₹{from_paise(mean_paise):.2f} average"}
+
+# Month totals of the budgeted categories of some users in some months, with the budget; starts from
+# budgets so both tables are read through their primary keys
+BUDGETED_TOTALS_SELECT = db.select(
+    CategoryTotal.user_id, CategoryTotal.category, CategoryTotal.month, CategoryTotal.total_paise, Budget.limit_paise
+).select_from(Budget) \
+    .join(CategoryTotal, (CategoryTotal.user_id == Budget.user_id) & (CategoryTotal.category == Budget.category)
+          & CategoryTotal.month.in_(db.bindparam('months', expanding=True))) \
+    .where(Budget.user_id.in_(db.bindparam('user_ids', expanding=True)))
+
+# Alert rows for the months whose category total crossed a budget threshold with these category_totals
+# deltas; reads only the touched category_totals rows, after apply_category_deltas() in the same transaction
+def budget_alerts(deltas):
+    added = {(delta["user_id"], delta["category"], delta["month"]): delta["total_paise"]
+             for delta in deltas if delta["total_paise"] > 0}
+    if not added:
+        return []
+    rows = db.session.execute(BUDGETED_TOTALS_SELECT, {"user_ids": list({user_id for user_id, _, _ in added}),
+                                                       "months": list({month for _, _, month in added})})
+    alerts = []
+    for user_id, category, month, total_paise, limit_paise in rows:
+        if (user_id, category, month) not in added:
+            continue
+        before = total_paise - added[(user_id, category, month)]
+        crossed = [share for share in BUDGET_ALERT_THRESHOLDS if before < share * limit_paise <= total_paise]
+        if crossed:
+            alerts.append({"user_id": user_id, "kind": "budget", "category": category, "month": month,
+                           "amount_paise": total_paise, "score": total_paise / limit_paise, "expense_id": None,
+                           "message": f"{category} spending in {month} reached {crossed[-1]:.0%} of its "
+                                      f"₹{from_paise(limit_paise):.2f} budget"})
+    return alerts
+
+# Store alerts in the caller's transaction
+def record_alerts(alerts):
+    if alerts:
+        db.session.execute(db.insert(Alert), alerts)
+
+# Rows copied per transaction when migrating an old expense table
+EXPENSE_MIGRATION_BATCH = 10000
+
+# Stored dates that SQLite's date() cannot read but that name a real day, e.g. 2024-3-5
+LOOSE_DATE = re.compile(r'\s*(\d{4})-(\d{1,2})-(\d{1,2})\s*')
+
+# YYYY-MM-DD for a loosely formatted stored date, or None when it is not a valid date
+def normalise_date(value):
+    match = LOOSE_DATE.fullmatch(str(value))
+    if match is None:
+        return None
+    try:
+        return datetime.date(*map(int, match.groups())).isoformat()
+    except ValueError:
+        return None
+
+# Fix the expense dates SQLite cannot read or that name no real day, which the old API stored as sent:
+# loose ones are normalised in place, the rest are moved to expense_quarantine (the row as JSON) and
+# reported. Runs before the storage migration copies rows and before a totals rebuild; returns the rows touched.
+def repair_expense_dates():
+    with db.engine.begin() as conn:
+        # date() passes impossible days such as 2024-02-30 through; adding '+0 days' rolls them over
+        rows = conn.execute(db.text(
+            "SELECT * FROM expense WHERE date(date) IS NULL OR date(date) != date(date, '+0 days')"
+        )).mappings().all()
+        if not rows:
+            return 0
+        fixed, quarantined = [], []
+        for row in rows:
+            date = normalise_date(row['date'])
+            if date is not None:
+                fixed.append({"id": row['id'], "date": date})
+            else:
+                quarantined.append({"id": row['id'], "row": json.dumps(dict(row), default=str),
+                                    "reason": f"unreadable date {row['date']!r}"})
+        if fixed:
+            conn.execute(db.text("UPDATE expense SET date = :date WHERE id = :id"), fixed)
+        if quarantined:
+            conn.execute(db.text(
+                "CREATE TABLE IF NOT EXISTS expense_quarantine "
+                "(id INTEGER PRIMARY KEY, row TEXT NOT NULL, reason TEXT NOT NULL)"
+            ))
+            conn.execute(db.text("INSERT OR REPLACE INTO expense_quarantine (id, row, reason) VALUES (:id, :row, :reason)"),
+                         quarantined)
+            conn.execute(db.text("DELETE FROM expense WHERE id = :id"), [{"id": row["id"]} for row in quarantined])
+    if fixed:
+        current_app.logger.warning("Normalised %d expense dates to YYYY-MM-DD", len(fixed))
+    if quarantined:
+        current_app.logger.warning("Moved %d expenses with unreadable dates to expense_quarantine: ids %s",
+                                   len(quarantined), [row["id"] for row in quarantined])
+    return len(rows)
+
+# Move an expense table with string dates and float amounts to Date + integer paise.
+# Rows are copied into a staging table in id-ordered batches, one short transaction
+# each, so an interrupted run resumes where it stopped; the swap happens at the end.
+# category_totals is derived data, so it is dropped and rebuilt afterwards.
+def migrate_expense_storage(batch_size=EXPENSE_MIGRATION_BATCH):
+    if dialect_name() != 'sqlite':
+        return False  # only SQLite databases predate this storage format
+    inspector = db.inspect(db.engine)
+    if not inspector.has_table('expense'):
+        return False
+    if 'amount_paise' in {column['name'] for column in inspector.get_columns('expense')}:
+        return False
+
+    repair_expense_dates()
+    metadata = db.MetaData()
+    User.__table__.to_metadata(metadata)  # target of the staging table's foreign key
+    staging = Expense.__table__.to_metadata(metadata, name='expense_migration')
+    with db.engine.begin() as conn:
+        # Index names are database-wide in SQLite; the staging table takes them over
+        for index in inspector.get_indexes('expense'):
+            conn.execute(db.text(f'DROP INDEX IF EXISTS "{index["name"]}"'))
+        staging.create(conn, checkfirst=True)
+
+    copied = 0
+    while True:
+        with db.engine.begin() as conn:
+            last_id = conn.execute(db.select(db.func.max(staging.c.id))).scalar() or 0
+            result = conn.execute(db.text(
+                "INSERT INTO expense_migration (id, user_id, date, category, amount_paise, description) "
+                "SELECT id, user_id, date(date), category, CAST(ROUND(amount * 100) AS INTEGER), description "
+                "FROM expense WHERE id > :last_id ORDER BY id LIMIT :batch_size"
+            ), {"last_id": last_id, "batch_size": batch_size})
+        if result.rowcount <= 0:
+            break
+        copied += result.rowcount
+
+    with db.engine.begin() as conn:
+        conn.execute(db.text("DROP TABLE expense"))
+        conn.execute(db.text("ALTER TABLE expense_migration RENAME TO expense"))
+        conn.execute(db.text("DROP TABLE IF EXISTS category_totals"))
+    current_app.logger.info("Migrated %d expenses to date/paise storage", copied)
+    return True
+
+# Columns added to the expense table after it was first released, with the DDL for each. Existing rows get
+# version 0, which every client's first (full) sync already covers, and no client id.
+EXPENSE_ADDED_COLUMNS = {
+    'version': "INTEGER NOT NULL DEFAULT 0",
+    'client_id': f"VARCHAR({CLIENT_ID_MAX})",
+}
+
+# Add the EXPENSE_ADDED_COLUMNS an expense table created before them lacks; init_db() then adds their indexes
+def add_expense_columns():
+    inspector = db.inspect(db.engine)
+    if not inspector.has_table('expense'):
+        return False
+    existing = {column['name'] for column in inspector.get_columns('expense')}
+    missing = [name for name in EXPENSE_ADDED_COLUMNS if name not in existing]
+    with db.engine.begin() as conn:
+        for name in missing:
+            conn.execute(db.text(f"ALTER TABLE expense ADD COLUMN {name} {EXPENSE_ADDED_COLUMNS[name]}"))
+    return bool(missing)
+
+# Widen amount_paise on PostgreSQL expense tables created while it was a 32-bit integer column, which
+# rejected amounts over ₹21,474,836.47; SQLite integers are 64-bit already
+def widen_expense_amount_column():
+    if dialect_name() != 'postgresql':
+        return False
+    inspector = db.inspect(db.engine)
+    if not inspector.has_table('expense'):
+        return False
+    column = next(column for column in inspector.get_columns('expense') if column['name'] == 'amount_paise')
+    if isinstance(column['type'], db.BigInteger):
+        return False
+    with db.engine.begin() as conn:
+        conn.execute(db.text("ALTER TABLE expense ALTER COLUMN amount_paise TYPE BIGINT"))
+    return True
+
+# Full-text index over expense descriptions and categories. On SQLite it is an external-content
+# FTS5 table kept in sync by triggers; on PostgreSQL a GIN index over the same tsvector expression.
+EXPENSE_FTS_TABLE = db.table('expense_fts', db.column('rowid'), db.column('rank'))
+EXPENSE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS expense_fts_insert AFTER INSERT ON expense BEGIN "
+    "INSERT INTO expense_fts (rowid, description, category) VALUES (new.id, new.description, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS expense_fts_delete AFTER DELETE ON expense BEGIN "
+    "INSERT INTO expense_fts (expense_fts, rowid, description, category) VALUES ('delete', old.id, old.description, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS expense_fts_update AFTER UPDATE OF description, category ON expense BEGIN "
+    "INSERT INTO expense_fts (expense_fts, rowid, description, category) VALUES ('delete', old.id, old.description, old.category); "
+    "INSERT INTO expense_fts (rowid, description, category) VALUES (new.id, new.description, new.category); END",
+]
+
+# tsvector searched on PostgreSQL; must match the expression of ix_expense_search
+def expense_search_vector():
+    return db.func.to_tsvector('simple', db.func.coalesce(Expense.description, '') + ' ' + Expense.category)
+
+# Create the search index and its triggers, indexing existing rows the first time
+def create_search_index():
+    with db.engine.begin() as conn:
+        if dialect_name() == 'postgresql':
+            conn.execute(db.text(
+                "CREATE INDEX IF NOT EXISTS ix_expense_search ON expense "
+                "USING gin (to_tsvector('simple', coalesce(description, '') || ' ' || category))"
+            ))
+            return
+        if not db.inspect(conn).has_table('expense_fts'):
+            conn.execute(db.text(
+                "CREATE VIRTUAL TABLE expense_fts USING fts5(description, category, content='expense', content_rowid='id')"
+            ))
+            conn.execute(db.text("INSERT INTO expense_fts (expense_fts) VALUES ('rebuild')"))
+        for trigger in EXPENSE_FTS_TRIGGERS:
+            conn.execute(db.text(trigger))
+
+# Migrate old data and create the database tables; runs inside an app context
+def init_db():
+    migrate_expense_storage()
+    add_expense_columns()
+    widen_expense_amount_column()
     db.create_all()
+    # create_all() skips indexes on tables that already exist, so add them explicitly
+    for index in Expense.__table__.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+    # Backfill totals and stats for databases created before category_totals or category_stats existed
+    if CategoryTotal.query.first() is None or CategoryStats.query.first() is None:
+        if dialect_name() == 'sqlite':
+            repair_expense_dates()  # also unsticks databases whose migration copied unreadable dates
+        if Expense.query.first() is not None:
+            rebuild_category_totals()
+    create_search_index()
+
+# Create or migrate the schema once per deployment, before starting workers with AUTO_INIT_DB off
+@bp.cli.command('init-db')
+def init_db_command():
+    init_db()
+    click.echo("database initialized")
+
+# Relative error in a stored mean or standard deviation that --verify tolerates as float rounding
+STATS_DRIFT_TOLERANCE = 1e-6
+
+# Recompute category_totals and category_stats from Expense, or with --verify only report drift
+@bp.cli.command('rebuild-totals')
+@click.option('--verify', is_flag=True, help='Report drift without rewriting the tables.')
+def rebuild_totals_command(verify):
+    if not verify:
+        rebuild_category_totals()
+        click.echo("category_totals and category_stats rebuilt")
+        return
+
+    key = lambda row: (row.user_id, row.category, row.month)
+    expected = {key(row): row for row in db.session.execute(expense_totals_select())}
+    stored = {key(row): row for row in CategoryTotal.query.filter(CategoryTotal.count != 0)}
+
+    drift = 0
+    for row_key in sorted(expected.keys() | stored.keys(), key=str):
+        want, have = expected.get(row_key), stored.get(row_key)
+        want_total, want_count = (want.total_paise, want.count) if want else (0, 0)
+        have_total, have_count = (have.total_paise, have.count) if have else (0, 0)
+        if want_count != have_count or want_total != have_total:
+            drift += 1
+            click.echo(f"drift {row_key}: stored total_paise={have_total} count={have_count}, "
+                       f"expected total_paise={want_total} count={want_count}")
+
+    key = lambda row: (row.user_id, row.category)
+    expected = {key(row): row for row in db.session.execute(expense_stats_select())}
+    stored = {key(row): row for row in CategoryStats.query.filter(CategoryStats.count != 0)}
+    summary = lambda row: (row.count, row.mean_paise, math.sqrt(max(row.m2, 0) / row.count)) if row else (0, 0.0, 0.0)
+    for row_key in sorted(expected.keys() | stored.keys(), key=str):
+        (want_count, want_mean, want_std), (have_count, have_mean, have_std) = \
+            summary(expected.get(row_key)), summary(stored.get(row_key))
+        if want_count != have_count or not math.isclose(want_mean, have_mean, rel_tol=STATS_DRIFT_TOLERANCE) \
+                or not math.isclose(want_std, have_std, rel_tol=STATS_DRIFT_TOLERANCE, abs_tol=1e-3):
+            drift += 1
+            click.echo(f"drift {row_key}: stored count={have_count} mean_paise={have_mean:.3f} std={have_std:.3f}, "
+                       f"expected count={want_count} mean_paise={want_mean:.3f} std={want_std:.3f}")
+    click.echo(f"{drift} drifted row(s)")
+    if drift:
+        raise SystemExit(1)
+
+# Read routes that can also answer with binary columns, and the Arrow types of their columns
+COLUMNAR_ENDPOINTS = {
+    'finance.get_expenses': {'dates': 'date32', 'categories': 'dictionary'},
+    'finance.visualize': {},
+}
+# ETag suffix of each response format
+FORMAT_ETAG_SUFFIXES = {JSON_MIMETYPE: '', ARROW_MIMETYPE: '.arrow', MSGPACK_MIMETYPE: '.msgpack'}
+
+# Format and content coding (None for identity) of a read route's response, from the Accept headers
+def negotiate(endpoint, accept_mimetypes, accept_encodings, compression_enabled):
+    offered = [JSON_MIMETYPE] + (columnar_mimetypes() if endpoint in COLUMNAR_ENDPOINTS else [])
+    mimetype = accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+    coding = accept_encodings.best_match(content_codings()) if compression_enabled else None
+    return mimetype, coding
+
+# ETag of one representation of a user's data; each format and content coding gets its own, and so does
+# each variant (a value the response depends on beyond the URL, such as a default month)
+def representation_etag(version, mimetype, coding, variant=None):
+    return f"v{version}{FORMAT_ETAG_SUFFIXES[mimetype]}" + (f"-{variant}" if variant else "") \
+        + (f"-{coding}" if coding else "")
+
+# Serialize a read route's body in the negotiated format
+def encode_body(body, mimetype, endpoint, json_provider):
+    if mimetype == JSON_MIMETYPE:
+        return json_provider.response(body).get_data()
+    return encode_columns(body, mimetype, COLUMNAR_ENDPOINTS[endpoint])
+
+# Response for a columnar read route in the format cached_response() negotiated
+def render_columns(body):
+    if g.response_mimetype == JSON_MIMETYPE:
+        return jsonify(body)
+    return current_app.response_class(encode_body(body, g.response_mimetype, request.endpoint, current_app.json),
+                                      mimetype=g.response_mimetype)
+
+# Serve a per-user read route with an ETag from the user's data version and the negotiated
+# representation. A matching If-None-Match gets a 304 without running the view; other requests
+# are served from response_cache, which holds the encoded and compressed bytes of each representation.
+# A view whose response depends on more than the URL passes variant, a function giving that extra part.
+def cached_response(view=None, variant=None):
+    if view is None:
+        return functools.partial(cached_response, variant=variant)
+
+    @functools.wraps(view)
+    def wrapper(user_id):
+        g.response_mimetype, coding = negotiate(request.endpoint, request.accept_mimetypes, request.accept_encodings,
+                                                current_app.config['COMPRESSION_ENABLED'])
+        etag = representation_etag(data_version(user_id), g.response_mimetype, coding,
+                                   variant and variant())
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            key = (request.endpoint, request.query_string, etag)
+            cached = response_cache.get(user_id, key)
+            if cached is not None:
+                body, status, mimetype = cached
+                response = current_app.response_class(body, status=status, mimetype=mimetype)
+            else:
+                generation = response_cache.generation(user_id)
+                response, status = view(user_id)
+                response.status_code = status
+                if coding:
+                    response.set_data(compress(response.get_data(), coding))
+                response_cache.set(user_id, key, (response.get_data(), status, response.mimetype), generation)
+            if coding:
+                response.headers['Content-Encoding'] = coding
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        if request.endpoint in COLUMNAR_ENDPOINTS:
+            response.vary.add('Accept')
+        return response
+    return wrapper
+
+# Page size bounds for the expense list
+EXPENSE_PAGE_SIZE = 100
+EXPENSE_PAGE_MAX = 1000
+
+# Category totals from the materialized table, optionally limited to some categories
+def materialized_category_totals(user_id, categories=None):
+    stmt = db.select(CategoryTotal.category, sum_paise(CategoryTotal.total_paise)) \
+        .where(CategoryTotal.user_id == user_id) \
+        .group_by(CategoryTotal.category) \
+        .having(db.func.sum(CategoryTotal.count) > 0)
+    if categories:
+        stmt = stmt.where(CategoryTotal.category.in_(categories))
+    return stmt.order_by(CategoryTotal.category)
+
+# Sum expense paise per category by scanning Expense, optionally limited to a date range and categories
+def scan_category_totals(user_id, start=None, end=None, categories=None):
+    stmt = db.select(Expense.category, sum_paise(Expense.amount_paise)).where(Expense.user_id == user_id)
+    if categories:
+        stmt = stmt.where(Expense.category.in_(categories))
+    if start:
+        stmt = stmt.where(Expense.date >= start)
+    if end:
+        stmt = stmt.where(Expense.date <= end)
+    return stmt.group_by(Expense.category).order_by(Expense.category)
+
+# Statement for the category totals in /visualize; only arbitrary date ranges need to scan Expense
+def category_totals_select(user_id, start=None, end=None, categories=None):
+    if start or end:
+        return scan_category_totals(user_id, start, end, categories)
+    return materialized_category_totals(user_id, categories)
+
+# /visualize body for (category, paise) rows
+def chart_body(rows):
+    return {
+        "categories": [category for category, _ in rows],
+        "amounts": [from_paise(paise) for _, paise in rows]
+    }
+
+# Keyset pagination over (date, id) for one page of a user's expenses, plus one row to detect a next page.
+# The cursor carries the date of the last row, so paging survives that row being changed or deleted.
+def expense_page_select(user_id, after_date=None, after_id=None, limit=EXPENSE_PAGE_SIZE):
+    # Plain column rows skip ORM hydration
+    stmt = db.select(Expense.id, expense_date_json(), Expense.category, Expense.amount_paise, Expense.description) \
+        .where(Expense.user_id == user_id)
+    if after_date is not None and after_id is not None:
+        stmt = stmt.where(db.tuple_(Expense.date, Expense.id) > db.tuple_(after_date, after_id))
+    return stmt.order_by(Expense.date, Expense.id).limit(limit + 1)
+
+# Expense.date for a JSON response, skipping the Date result conversion: SQLite hands back its
+# stored YYYY-MM-DD text as is, other drivers a date that the JSON provider writes in ISO format
+def expense_date_json():
+    return db.type_coerce(Expense.date, db.String).label('date')
+
+# Response shapes for expense lists: one object per expense, or one array per field
+EXPENSE_SHAPES = ('rows', 'columns')
+
+# Expense list fields built straight from (id, date, category, amount_paise, description) result rows.
+# Dates are left to the JSON provider; the 'columns' shape builds no per-row objects at all.
+def expense_list_fields(rows, shape='rows'):
+    if shape == 'columns':
+        ids, dates, categories, amounts_paise, descriptions = ([row[i] for row in rows] for i in range(5))
+        return {"ids": ids, "dates": dates, "categories": categories,
+                "amounts": from_paise(np.array(amounts_paise, dtype=np.int64)), "descriptions": descriptions}
+    return {"expenses": [
+        {"id": id, "date": date, "category": category, "amount": from_paise(amount_paise), "description": description}
+        for id, date, category, amount_paise, description in rows
+    ]}
+
+# get_expenses body for rows from expense_page_select()
+def expense_page_body(rows, limit, shape='rows'):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {**expense_list_fields(rows, shape),
+            "next_after_date": rows[-1].date if has_more else None,
+            "next_after_id": rows[-1].id if has_more else None}
+
+# Rows fetched from the cursor per chunk of a streamed export
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ["id", "date", "category", "amount", "description"]
+
+# Rows per executemany batch during bulk ingest
+BULK_INSERT_CHUNK = 5000
+BULK_COLUMNS = ["user_id", "date", "category", "amount", "description", "client_id"]
+BULK_INSERT_COLUMNS = ["user_id", "date", "category", "amount_paise", "description", "version", "client_id"]
+
+# Numpy period unit and step for each timeseries frequency; weeks are labelled by their Monday
+TIMESERIES_PERIODS = {'D': ('datetime64[D]', 1), 'W': ('datetime64[D]', 7), 'M': ('datetime64[M]', 1)}
+TIMESERIES_WINDOW = 3
 
 # Home route
-@app.route('/')
+@bp.route('/')
 def home():
     return jsonify({"message": "Welcome to the Finance Dashboard!"})
 
+# Time each SQL statement; inside a request, add it to the request's tallies
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_started = time.perf_counter()
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.query_started
+    sql_statement_seconds.observe(elapsed, statement.lstrip().split(None, 1)[0].upper())
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_statements += 1
+        g.sql_seconds += elapsed
+
+# Count rows returned by SELECTs through the session during a request. The result is buffered to
+# count it, so streamed (yield_per) results are passed through uncounted.
+def count_result_rows(orm_execute_state):
+    if not (has_request_context() and 'sql_rows' in g) or not orm_execute_state.is_select \
+            or orm_execute_state.execution_options.get('yield_per'):
+        return None
+    result = orm_execute_state.invoke_statement()
+    frozen = result.freeze()
+    g.sql_rows += len(frozen.data)
+    return frozen()
+
+# Profile one request with pyinstrument when it is installed, else cProfile
+def start_profiler():
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+# Stop a profiler from start_profiler() and return its text report
+def profile_report(profiler):
+    if pyinstrument is not None and isinstance(profiler, pyinstrument.Profiler):
+        profiler.stop()
+        return profiler.output_text()
+    profiler.disable()
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+    return report.getvalue()
+
+# Start the request's clock and SQL tallies, and its profiler when ?profile=1 is allowed
+@bp.before_request
+def start_instrumentation():
+    if current_app.config['METRICS_ENABLED']:
+        g.request_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_seconds = 0.0
+        g.sql_rows = 0
+    if request.args.get('profile') == '1' and current_app.config['PROFILING_ENABLED']:
+        g.profiler = start_profiler()
+
+# Record the request's metrics; a profiled request gets its report instead of the normal body
+@bp.after_request
+def finish_instrumentation(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        summary = f"{request.method} {request.full_path} -> {response.status}"
+        if 'sql_statements' in g:
+            summary += f"\nSQL: {g.sql_statements} statements, {g.sql_seconds * 1000:.1f} ms, {g.sql_rows} rows"
+        response = current_app.response_class(summary + "\n\n" + profile_report(profiler), mimetype='text/plain')
+
+    if 'request_started' in g:
+        endpoint = request.endpoint
+        request_latency.observe(time.perf_counter() - g.request_started, endpoint, request.method, response.status_code)
+        request_sql_statements.observe(g.sql_statements, endpoint)
+        request_sql_seconds.observe(g.sql_seconds, endpoint)
+        request_sql_rows.observe(g.sql_rows, endpoint)
+    return response
+
+# Compress responses the read cache has not already encoded, for clients that accept it.
+# Streamed responses such as exports are compressed chunk by chunk as they are sent.
+@bp.after_request
+def compress_response(response):
+    if not current_app.config['COMPRESSION_ENABLED'] or 'Content-Encoding' in response.headers \
+            or response.status_code in (204, 304) or request.method == 'HEAD':
+        return response
+    coding = request.accept_encodings.best_match(content_codings())
+    if coding is None:
+        return response
+    if response.is_streamed:
+        response.response = compress_stream(response.iter_encoded(), coding)
+    elif response.content_length < current_app.config['COMPRESSION_MIN_SIZE']:
+        return response
+    else:
+        response.set_data(compress(response.get_data(), coding))
+    response.headers['Content-Encoding'] = coding
+    response.vary.add('Accept-Encoding')
+    return response
+
+# Endpoints reachable without a session token
+PUBLIC_ENDPOINTS = {'finance.home', 'finance.register', 'finance.login', 'finance.prometheus_metrics'}
+
+# Resolve the acting user from an Authorization header without a database lookup. Routes scoped
+# to a user_id in the URL must belong to the token's user. Returns (user_id, None), or
+# (user_id, (message, status)) when the request must be refused.
+def resolve_user(header, url_user_id, auth_required):
+    user_id = None
+    if header.startswith('Bearer '):
+        user_id = token_signer.verify(header[len('Bearer '):])
+        if user_id is None:
+            return None, ("Invalid or expired token", 401)
+        known_users.add(user_id)  # tokens are only issued to existing users
+    elif auth_required:
+        return None, ("Authentication required", 401)
+
+    if user_id is not None and url_user_id is not None and url_user_id != user_id:
+        return user_id, ("Forbidden", 403)
+    return user_id, None
+
+# Resolve the acting user once per request
+@bp.before_request
+def authenticate():
+    g.user_id = None
+    if request.endpoint in PUBLIC_ENDPOINTS:
+        return None
+
+    g.user_id, error = resolve_user(request.headers.get('Authorization', ''),
+                                    (request.view_args or {}).get('user_id'), current_app.config['AUTH_REQUIRED'])
+    if error is not None:
+        message, status = error
+        return jsonify({"error": message}), status
+    return None
+
+# Ids among user_ids with no User row; known users are answered from memory
+def missing_users(user_ids):
+    unknown = {int(user_id) for user_id in user_ids} - known_users
+    if unknown:
+        found = db.session.execute(db.select(User.id).where(User.id.in_(unknown))).scalars().all()
+        known_users.update(found)
+        unknown.difference_update(found)
+    return unknown
+
+# Extra WHERE clauses restricting an expense lookup to the token's user, if there is one
+def owner_filter():
+    return [Expense.user_id == g.user_id] if g.user_id is not None else []
+
+# Response for auth requests turned away while the hashing pool is saturated
+def hasher_busy():
+    response = jsonify({"error": "Too many login attempts in progress, try again shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # User registration route
-@app.route('/register', methods=['POST'])
+@bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
     username = data.get('username')
     password = data.get('password')
 
-    if not username or not password:
+    if not (isinstance(username, str) and isinstance(password, str) and username and password):
         return jsonify({"error": "Username and password are required"}), 400
 
-    if User.query.filter_by(username=username).first():
-        return jsonify({"error": "Username already exists"}), 400
+    try:
+        password_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return hasher_busy()
 
-    new_user = User(username=username, password=password)
-    db.session.add(new_user)
-    db.session.commit()
+    # The unique index on username rejects duplicates, so no separate existence query
+    db.session.add(User(username=username, password=password_hash))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Username already exists"}), 400
 
     return jsonify({"message": "User registered successfully"}), 201
 
 # User login route
-@app.route('/login', methods=['POST'])
+@bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
     username = data.get('username')
     password = data.get('password')
 
-    user = User.query.filter_by(username=username, password=password).first()
+    if not (isinstance(username, str) and isinstance(password, str) and username and password):
+        return jsonify({"error": "Invalid username or password"}), 401
+
+    # Credentials that logged in recently get their cached token without another hash
+    fingerprint = token_signer.fingerprint(username, password)
+    cached = login_cache.get(username, fingerprint)
+    if cached is not None:
+        user_id, token = cached
+        return jsonify({"message": "Login successful", "user_id": user_id, "token": token}), 200
+
+    generation = login_cache.generation(username)
+    user = db.session.execute(db.select(User.id, User.password).where(User.username == username)).first()
+    try:
+        if user is None:
+            # Unknown usernames cost a verify too, so the reply time does not tell which usernames exist
+            password_hasher.verify(password, DUMMY_HASH)
+            valid = False
+        else:
+            valid = password_hasher.verify(password, user.password)
+        if valid and not is_hashed(user.password):
+            db.session.execute(db.update(User).where(User.id == user.id).values(password=password_hasher.hash(password)))
+            db.session.commit()
+    except HasherBusy:
+        return hasher_busy()
 
-    if not user:
+    if not valid:
         return jsonify({"error": "Invalid username or password"}), 401
 
-    return jsonify({"message": "Login successful", "user_id": user.id}), 200
+    token = token_signer.sign(user.id)
+    login_cache.set(username, fingerprint, (user.id, token), generation)
+    return jsonify({"message": "Login successful", "user_id": user.id, "token": token}), 200
 
 # Add an expense route
-@app.route('/expenses', methods=['POST'])
+@bp.route('/expenses', methods=['POST'])
 def add_expense():
     data = request.get_json()
     user_id = data.get('user_id')
@@ -78,90 +1083,888 @@ def add_expense():
     category = data.get('category')
     amount = data.get('amount')
     description = data.get('description')
+    client_id = data.get('client_id')
+
+    if g.user_id is not None:
+        if user_id is not None and str(user_id) != str(g.user_id):
+            return jsonify({"error": "Forbidden"}), 403
+        user_id = g.user_id
 
     if not user_id or not date or not category or not amount:
         return jsonify({"error": "Missing required fields"}), 400
+    if isinstance(category, (list, dict)) or isinstance(description, (list, dict)):
+        return jsonify({"error": "Category and description must be text"}), 400
+
+    # Exactly an int: missing_users() would truncate 1.7 and True to user 1
+    if type(user_id) is not int:
+        return jsonify({"error": "user_id must be an integer"}), 400
+    if missing_users([user_id]):
+        return jsonify({"error": "Unknown user"}), 400
+
+    try:
+        amount_paise = to_paise(amount)
+    except (TypeError, ValueError, ArithmeticError):
+        return jsonify({"error": "Amount must be a number"}), 400
 
-    new_expense = Expense(user_id=user_id, date=date, category=category, amount=amount, description=description)
+    try:
+        date = datetime.date.fromisoformat(date)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Date must be in YYYY-MM-DD format"}), 400
+
+    if client_id is not None:
+        if not isinstance(client_id, str) or not 0 < len(client_id) <= CLIENT_ID_MAX:
+            return jsonify({"error": f"client_id must be a string of at most {CLIENT_ID_MAX} characters"}), 400
+        # A retried request gets the expense its first attempt stored
+        existing = db.session.execute(
+            db.select(Expense.id).where(Expense.user_id == user_id, Expense.client_id == client_id)).scalar()
+        if existing is not None:
+            return jsonify({"message": "Expense already added", "id": existing}), 200
+
+    versions = bump_data_versions([user_id])
+    new_expense = Expense(user_id=user_id, date=date, category=category, amount_paise=amount_paise,
+                          description=description, version=versions[user_id], client_id=client_id)
     db.session.add(new_expense)
+    deltas = [category_delta(user_id, category, date, amount_paise)]
+    apply_category_deltas(deltas)
+    alerts = budget_alerts(deltas)
+    # Score against the category's stats from before this expense joined them
+    merged = db.session.execute(category_stats_upsert(dialect_name(), returning=True),
+                                stats_delta(user_id, category, 1, amount_paise, 0.0)).one()
+    count, mean_paise, m2 = stats_without(amount_paise, *merged)
+    score = float(anomaly_scores(amount_paise, count, mean_paise, m2))
+    if score > ANOMALY_Z_SCORE:
+        db.session.flush()  # assigns new_expense.id
+        alerts.append(anomaly_alert(user_id, category, date, amount_paise, score, mean_paise, new_expense.id))
+    record_alerts(alerts)
+    db.session.commit()
+    response_cache.invalidate(new_expense.user_id)
+
+    return jsonify({"message": "Expense added successfully", "id": new_expense.id}), 201
+
+# Validate a frame of incoming expenses column-wise; returns a frame of clean rows and per-row errors
+def validate_expense_frame(df):
+    df = df.reindex(columns=BULK_COLUMNS)
+    user_ids = pd.to_numeric(df["user_id"], errors="coerce")
+    dates = pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce")
+    categories = df["category"].astype("string").str.strip()
+    amounts = pd.to_numeric(df["amount"], errors="coerce")
+    paise = (amounts * 100).round()
+    client_ids = df["client_id"].astype("string").str.strip()
+    # astype("string") would turn a JSON list or object into its repr instead of rejecting it
+    nested = df[["category", "description", "client_id"]].map(lambda value: isinstance(value, (list, dict)))
+
+    checks = pd.DataFrame({
+        "Invalid user_id": user_ids.isna() | (user_ids <= 0) | (user_ids % 1 != 0),
+        "Invalid date": dates.isna(),
+        "Missing category": categories.isna() | (categories == "") | nested["category"],
+        # Floats at or above 2**63 would wrap when cast to int64 below
+        "Invalid amount": paise.isna() | (paise == 0) | (paise.abs() >= 2.0**63),
+        "Invalid description": nested["description"],
+        "Invalid client_id": nested["client_id"] | (client_ids.notna() & ((client_ids == "")
+                                                                          | (client_ids.str.len() > CLIENT_ID_MAX))),
+    })
+    invalid = checks.any(axis=1)
+    errors = [
+        {"row": int(row), "errors": [check for check in checks.columns if flags[check]]}
+        for row, flags in checks[invalid].iterrows()
+    ]
+
+    valid = ~invalid
+    descriptions = df["description"].astype("string")
+    clean = pd.DataFrame({
+        "user_id": user_ids[valid].astype("int64"),
+        "date": dates[valid].dt.date,
+        "category": categories[valid],
+        "amount_paise": paise[valid].astype("int64"),
+        "description": descriptions[valid].astype(object).where(descriptions[valid].notna(), None),
+        "client_id": client_ids[valid].astype(object).where(client_ids[valid].notna(), None),
+        "month": dates[valid].dt.strftime("%Y-%m"),
+    })
+    return clean, errors
+
+# Escape a value for PostgreSQL's COPY text format
+def copy_text(value):
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+# Stream expense rows into PostgreSQL with COPY on the session's connection
+def copy_expense_rows(rows):
+    buffer = io.StringIO()
+    for row in rows:
+        # A column the rows leave out is NULL, as with the INSERT path
+        buffer.write('\t'.join(copy_text(row.get(column)) for column in BULK_INSERT_COLUMNS) + '\n')
+    sql = f"COPY {Expense.__tablename__} ({', '.join(BULK_INSERT_COLUMNS)}) FROM STDIN"
+    cursor = db.session.connection().connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+# Insert expense rows in the session's transaction with the dialect's fastest bulk path
+def insert_expense_rows(rows):
+    if dialect_name() == 'postgresql':
+        copy_expense_rows(rows)
+        return
+    for start in range(0, len(rows), BULK_INSERT_CHUNK):
+        db.session.execute(db.insert(Expense), rows[start:start + BULK_INSERT_CHUNK])
+
+# Stats of some users' categories, read through the primary key
+CATEGORY_STATS_SELECT = db.select(
+    CategoryStats.user_id, CategoryStats.category, CategoryStats.count, CategoryStats.mean_paise, CategoryStats.m2
+).where(CategoryStats.user_id.in_(db.bindparam('user_ids', expanding=True)),
+        CategoryStats.category.in_(db.bindparam('categories', expanding=True)))
+
+# Anomaly alerts for a frame of validated new expenses, scored against the stats from before the batch;
+# then merges the batch into category_stats, one delta per (user, category). expense_ids, when known,
+# are the ids of the frame's rows.
+def bulk_anomaly_alerts(clean, expense_ids=None):
+    keys = list(zip(clean["user_id"].tolist(), clean["category"].tolist()))
+    groups = {}
+    codes = np.fromiter((groups.setdefault(key, len(groups)) for key in keys), dtype=np.int64, count=len(keys))
+    amounts = clean["amount_paise"].to_numpy(dtype=np.int64)
+    counts = np.bincount(codes)
+    means = np.bincount(codes, weights=amounts) / counts
+    m2 = np.bincount(codes, weights=(amounts - means[codes]) ** 2)
+
+    before = np.zeros((len(groups), 3))  # count, mean, m2 per group; zero count for new categories
+    rows = db.session.execute(CATEGORY_STATS_SELECT, {"user_ids": list({user_id for user_id, _ in groups}),
+                                                      "categories": list({category for _, category in groups})})
+    for user_id, category, count, mean_paise, group_m2 in rows:
+        if (user_id, category) in groups:
+            before[groups[(user_id, category)]] = (count, mean_paise, group_m2)
+    apply_stats_deltas([stats_delta(user_id, category, int(count), float(mean), float(group_m2))
+                        for (user_id, category), count, mean, group_m2 in zip(groups, counts, means, m2)])
+
+    scores = anomaly_scores(amounts, *before[codes].T)
+    dates = clean["date"].tolist()
+    return [anomaly_alert(keys[row][0], keys[row][1], dates[row], int(amounts[row]), scores[row],
+                          before[codes[row], 1], expense_ids[row] if expense_ids is not None else None)
+            for row in np.flatnonzero(scores > ANOMALY_Z_SCORE)]
+
+# (user_id, client_id) pairs among a frame's rows that are already stored
+def stored_client_ids(rows):
+    stored = set()
+    client_ids = rows["client_id"].unique().tolist()
+    user_ids = rows["user_id"].unique().tolist()
+    for start in range(0, len(client_ids), BULK_INSERT_CHUNK):
+        stored.update(db.session.execute(
+            db.select(Expense.user_id, Expense.client_id)
+            .where(Expense.user_id.in_(user_ids), Expense.client_id.in_(client_ids[start:start + BULK_INSERT_CHUNK]))
+        ).all())
+    return stored
+
+# Bulk add expenses from a JSON array or an uploaded CSV file; rows whose client_id is already stored are skipped
+@bp.route('/expenses/bulk', methods=['POST'])
+def add_expenses_bulk():
+    if 'file' in request.files:
+        try:
+            df = pd.read_csv(request.files['file'], dtype=str, keep_default_na=False, na_values=[""])
+        except (ValueError, pd.errors.ParserError):
+            return jsonify({"error": "Could not parse CSV file"}), 400
+        if request.form.get('user_id'):
+            df["user_id"] = request.form['user_id']
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+            return jsonify({"error": "Expected a JSON array of expenses or a CSV file"}), 400
+        df = pd.DataFrame.from_records(data)
+
+    if g.user_id is not None:
+        if "user_id" in df and (pd.to_numeric(df["user_id"], errors="coerce").fillna(g.user_id) != g.user_id).any():
+            return jsonify({"error": "Forbidden"}), 403
+        df["user_id"] = g.user_id
+
+    clean, errors = validate_expense_frame(df)
+    unknown = clean["user_id"].isin(missing_users(clean["user_id"].unique().tolist()))
+    if unknown.any():
+        errors = sorted(errors + [{"row": int(row), "errors": ["Unknown user_id"]} for row in clean.index[unknown]],
+                        key=lambda error: error["row"])
+        clean = clean[~unknown]
+    if clean.empty:
+        return jsonify({"error": "No valid expenses", "inserted": 0, "errors": errors}), 400
+
+    # A client replaying an upload whose response it lost sends client ids that are already stored; skip those
+    # rows and repeats within the upload. Were two replays to race, the unique index fails the second with a 500,
+    # which the client retries.
+    tagged = clean["client_id"].notna()
+    duplicate = tagged & clean.duplicated(["user_id", "client_id"])
+    stored = stored_client_ids(clean[tagged])
+    if stored:
+        duplicate |= pd.MultiIndex.from_frame(clean[["user_id", "client_id"]]).isin(list(stored))
+    skipped = int(duplicate.sum())
+    clean = clean[~duplicate]
+    if clean.empty:
+        return jsonify({"message": "Expenses already added", "inserted": 0, "skipped": skipped, "errors": errors}), 200
+
+    # One transaction for the version bump, the rows tagged with it and their totals
+    user_ids = sorted(clean["user_id"].unique().tolist())
+    versions = bump_data_versions(user_ids)
+    clean["version"] = clean["user_id"].map(versions)
+    rows = clean.drop(columns="month").to_dict("records")
+    insert_expense_rows(rows)
+    deltas = clean.groupby(["user_id", "category", "month"], as_index=False) \
+        .agg(total_paise=("amount_paise", "sum"), count=("amount_paise", "size"))
+    deltas = deltas.to_dict("records")
+    apply_category_deltas(deltas)
+    record_alerts(budget_alerts(deltas) + bulk_anomaly_alerts(clean))
     db.session.commit()
+    for user_id in user_ids:
+        response_cache.invalidate(user_id)
 
-    return jsonify({"message": "Expense added successfully"}), 201
+    return jsonify({"message": "Expenses added successfully", "inserted": len(rows), "skipped": skipped,
+                    "errors": errors}), 201
 
-# Get all expenses for a user
-@app.route('/expenses/<int:user_id>', methods=['GET'])
+# Get a page of expenses for a user
+@bp.route('/expenses/<int:user_id>', methods=['GET'])
+@cached_response
 def get_expenses(user_id):
-    expenses = Expense.query.filter_by(user_id=user_id).all()
-    expense_list = []
-    for expense in expenses:
-        expense_list.append({
-            "id": expense.id,
-            "date": expense.date,
-            "category": expense.category,
-            "amount": expense.amount,
-            "description": expense.description
-        })
-
-    return jsonify({"expenses": expense_list}), 200
+    try:
+        after_date = date_arg('after_date')
+    except ValueError:
+        return jsonify({"error": "after_date must be in YYYY-MM-DD format"}), 400
+    after_id = request.args.get('after_id', type=int)
+    if (after_date is None) != (after_id is None):
+        return jsonify({"error": "Pass after_date and after_id together"}), 400
+    limit = request.args.get('limit', EXPENSE_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, EXPENSE_PAGE_MAX))
+    shape = request.args.get('shape', 'rows') if g.response_mimetype == JSON_MIMETYPE else 'columns'
+    if shape not in EXPENSE_SHAPES:
+        return jsonify({"error": "shape must be 'rows' or 'columns'"}), 400
+
+    rows = db.session.execute(expense_page_select(user_id, after_date, after_id, limit)).all()
+    return render_columns(expense_page_body(rows, limit, shape)), 200
+
+# Page size bounds for /expenses/<user_id>/changes
+CHANGES_PAGE_SIZE = 1000
+CHANGES_PAGE_MAX = 10000
+
+# Keyset pagination over (version, id) for a user's expenses changed after data version `since`, or all of them
+def expense_changes_select(user_id, since=None, after_version=None, after_id=None, limit=CHANGES_PAGE_SIZE):
+    stmt = db.select(Expense.id, expense_date_json(), Expense.category, Expense.amount_paise, Expense.description,
+                     Expense.version) \
+        .where(Expense.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(Expense.version > since)
+    if after_version is not None and after_id is not None:
+        stmt = stmt.where(db.tuple_(Expense.version, Expense.id) > db.tuple_(after_version, after_id))
+    return stmt.order_by(Expense.version, Expense.id).limit(limit + 1)
+
+# Expenses added, changed or deleted since data version ?since=, for clients keeping a local copy.
+# since=0, or a version newer than the server's (a reset database), gets a full sync ("full": true).
+# Rows come as columns in (version, id) order, paged with next_after_version/next_after_id; the ids
+# deleted since then come with the first page. Clients store "version" once they have every page.
+@bp.route('/expenses/<int:user_id>/changes', methods=['GET'])
+@cached_response
+def get_expense_changes(user_id):
+    since = request.args.get('since', 0, type=int)
+    after_version = request.args.get('after_version', type=int)
+    after_id = request.args.get('after_id', type=int)
+    limit = request.args.get('limit', CHANGES_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, CHANGES_PAGE_MAX))
+
+    version = data_version(user_id)
+    full = not 0 < since <= version
+    rows = db.session.execute(
+        expense_changes_select(user_id, None if full else since, after_version, after_id, limit)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    deleted = []
+    if not full and after_id is None:
+        deleted = db.session.execute(
+            db.select(ExpenseTombstone.expense_id)
+            .where(ExpenseTombstone.user_id == user_id, ExpenseTombstone.version > since)
+        ).scalars().all()
+    return jsonify({
+        "version": version,
+        "full": full,
+        **expense_list_fields([row[:5] for row in rows], 'columns'),
+        "deleted": deleted,
+        "next_after_version": rows[-1].version if has_more else None,
+        "next_after_id": rows[-1].id if has_more else None,
+    }), 200
+
+# Stream a user's full expense history as NDJSON or CSV
+@bp.route('/expenses/<int:user_id>/export', methods=['GET'])
+def export_expenses(user_id):
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "Unsupported export format"}), 400
+
+    stmt = db.select(Expense.id, Expense.date, Expense.category, Expense.amount_paise, Expense.description) \
+        .where(Expense.user_id == user_id) \
+        .order_by(Expense.date, Expense.id) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    def generate():
+        dumps = current_app.json.dumps
+        result = db.session.execute(stmt)
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
+        # Each partition is one yield_per batch, so only one batch is held in memory at a time
+        for batch in result.partitions():
+            batch = [(id, date.isoformat(), category, from_paise(amount_paise), description)
+                     for id, date, category, amount_paise, description in batch]
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                yield buffer.getvalue()
+            else:
+                yield ''.join(dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n' for row in batch)
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    filename = f"expenses_{user_id}.{export_format}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+# Page size bounds for search results
+SEARCH_PAGE_SIZE = 50
+SEARCH_PAGE_MAX = 500
+# Text matches ranked per request on SQLite: the newest this many that pass the filters.
+# bm25 costs time per match, so ranking every match of a common word would not stay interactive.
+SEARCH_RANK_WINDOW = 1000
+
+# FTS5 query matching every word of free text as a prefix; quoting keeps user input out of the query syntax
+def fts_query(text):
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in text.split())
+
+# The same query as a PostgreSQL tsquery: every word quoted as a lexeme and matched as a prefix
+def tsquery_text(text):
+    return ' & '.join("'{}':*".format(word.replace('\\', '\\\\').replace("'", "''")) for word in text.split())
+
+# Search a user's expenses by text in description/category, amount range, date range and categories.
+# Text matches are ranked best first; without text, newest first. Paged by offset; "truncated" is set
+# on the last page when matches beyond SEARCH_RANK_WINDOW were left out.
+@bp.route('/expenses/<int:user_id>/search', methods=['GET'])
+@cached_response
+def search_expenses(user_id):
+    text = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', SEARCH_PAGE_SIZE, type=int), SEARCH_PAGE_MAX))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    try:
+        start, end = date_arg('from'), date_arg('to')
+        low = to_paise(request.args['min']) if request.args.get('min') else None
+        high = to_paise(request.args['max']) if request.args.get('max') else None
+    except (ValueError, ArithmeticError):
+        return jsonify({"error": "min/max must be numbers and dates YYYY-MM-DD"}), 400
+    shape = request.args.get('shape', 'rows')
+    if shape not in EXPENSE_SHAPES:
+        return jsonify({"error": "shape must be 'rows' or 'columns'"}), 400
+
+    filters = [Expense.user_id == user_id]
+    if low is not None:
+        filters.append(Expense.amount_paise >= low)
+    if high is not None:
+        filters.append(Expense.amount_paise <= high)
+    if start:
+        filters.append(Expense.date >= start)
+    if end:
+        filters.append(Expense.date <= end)
+    categories = request.args.getlist('category')
+    if categories:
+        filters.append(Expense.category.in_(categories))
+
+    stmt = db.select(Expense.id, expense_date_json(), Expense.category, Expense.amount_paise, Expense.description)
+    if text and dialect_name() == 'postgresql':
+        query = db.func.to_tsquery('simple', tsquery_text(text))
+        stmt = stmt.where(expense_search_vector().op('@@')(query), *filters) \
+            .order_by(db.func.ts_rank(expense_search_vector(), query).desc(), Expense.id)
+    elif text:
+        # Walk the FTS index newest first, keep the window of matches passing the filters, rank only those
+        fts = EXPENSE_FTS_TABLE
+        newest = db.select(fts.c.rowid.label('id'), fts.c.rank.label('rank')) \
+            .select_from(fts) \
+            .join(Expense, Expense.id == fts.c.rowid) \
+            .where(db.literal_column('expense_fts').match(fts_query(text)), *filters) \
+            .order_by(fts.c.rowid.desc())
+        matches = newest.limit(SEARCH_RANK_WINDOW).subquery()
+        stmt = stmt.join(matches, matches.c.id == Expense.id).order_by(matches.c.rank, Expense.id)
+    else:
+        stmt = stmt.where(*filters).order_by(Expense.date.desc(), Expense.id.desc())
+
+    rows = db.session.execute(stmt.limit(limit + 1).offset(offset)).all()
+    has_more = len(rows) > limit
+    truncated = False
+    if text and dialect_name() != 'postgresql' and not has_more and offset + len(rows) >= SEARCH_RANK_WINDOW:
+        # The window is full; look for one match past it only once paging has reached its end
+        truncated = db.session.execute(newest.offset(SEARCH_RANK_WINDOW).limit(1)).first() is not None
+    return jsonify({**expense_list_fields(rows[:limit], shape), "next_offset": offset + limit if has_more else None,
+                    "truncated": truncated}), 200
 
 # Visualization route
-@app.route('/visualize/<int:user_id>', methods=['GET'])
+@bp.route('/visualize/<int:user_id>', methods=['GET'])
+@cached_response
 def visualize(user_id):
-    expenses = Expense.query.filter_by(user_id=user_id).all()
-    if not expenses:
+    try:
+        start, end = date_arg('from'), date_arg('to')
+    except ValueError:
+        return jsonify({"error": "Dates must be in YYYY-MM-DD format"}), 400
+
+    stmt = category_totals_select(user_id, start=start, end=end, categories=request.args.getlist('category'))
+    rows = db.session.execute(stmt).all()
+    if not rows:
         return jsonify({"error": "No expenses found"}), 404
 
-    # Convert expenses to a DataFrame
-    data = {
-        "Date": [expense.date for expense in expenses],
-        "Category": [expense.category for expense in expenses],
-        "Amount": [expense.amount for expense in expenses]
-    }
-    df = pd.DataFrame(data)
+    return render_columns(chart_body(rows)), 200
 
-    # Group expenses by category and sum the amounts
-    grouped_data = df.groupby("Category")["Amount"].sum().reset_index()
+# SQL expression bucketing Expense.date into periods of the given frequency
+def period_bucket(freq):
+    if freq == 'D':
+        return Expense.date
+    if freq == 'W':
+        if dialect_name() == 'postgresql':
+            return db.cast(db.func.date_trunc(sql_literal('week'), Expense.date), db.Date)
+        return db.func.date(Expense.date, sql_literal('weekday 0'), sql_literal('-6 days'))
+    return month_label(Expense.date)
 
-    # Convert the grouped data to a dictionary
-    chart_data = {
-        "categories": grouped_data["Category"].tolist(),
-        "amounts": grouped_data["Amount"].tolist()
-    }
+# Per-category spending over time, with rolling means and period-over-period deltas
+@bp.route('/analytics/<int:user_id>/timeseries', methods=['GET'])
+@cached_response
+def timeseries(user_id):
+    freq = request.args.get('freq', 'M')
+    if freq not in TIMESERIES_PERIODS:
+        return jsonify({"error": "freq must be one of D, W, M"}), 400
+    window = max(1, request.args.get('window', TIMESERIES_WINDOW, type=int))
+
+    try:
+        start, end = date_arg('from'), date_arg('to')
+    except ValueError:
+        return jsonify({"error": "Dates must be in YYYY-MM-DD format"}), 400
+    categories = request.args.getlist('category')
+    if freq == 'M' and not start and not end:
+        # Whole-history monthly series are already materialized in category_totals
+        stmt = db.select(CategoryTotal.month, CategoryTotal.category, CategoryTotal.total_paise) \
+            .where(CategoryTotal.user_id == user_id, CategoryTotal.count > 0)
+        if categories:
+            stmt = stmt.where(CategoryTotal.category.in_(categories))
+    else:
+        # Sum per (period, category) in SQL over the (user_id, date) index
+        bucket = period_bucket(freq).label('period')
+        stmt = db.select(bucket, Expense.category, sum_paise(Expense.amount_paise)) \
+            .where(Expense.user_id == user_id) \
+            .group_by(bucket, Expense.category)
+        if start:
+            stmt = stmt.where(Expense.date >= start)
+        if end:
+            stmt = stmt.where(Expense.date <= end)
+        if categories:
+            stmt = stmt.where(Expense.category.in_(categories))
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        return jsonify({"error": "No expenses found"}), 404
+
+    # Scatter the sums into a dense category x period matrix covering every period in range
+    labels, row_categories, sums = (np.array(column) for column in zip(*rows))
+    unit, step = TIMESERIES_PERIODS[freq]
+    labels = labels.astype(unit)
+    periods = np.arange(labels.min(), labels.max() + step, step)
+    categories, category_index = np.unique(row_categories, return_inverse=True)
+    amounts = np.zeros((len(categories), len(periods)))
+    amounts[category_index, (labels - periods[0]).astype(int) // step] = sums.astype(float) / 100
+
+    # Trailing mean over up to `window` periods, using fewer at the start of the series
+    cumulative = np.cumsum(np.pad(amounts, ((0, 0), (1, 0))), axis=1)
+    counts = np.minimum(np.arange(1, len(periods) + 1), window)
+    starts = np.arange(1, len(periods) + 1) - counts
+    rolling_mean = (cumulative[:, 1:] - cumulative[:, starts]) / counts
+
+    previous = np.pad(amounts, ((0, 0), (1, 0)), constant_values=np.nan)[:, :-1]
+    delta = amounts - previous
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta_pct = np.where(previous != 0, delta / previous * 100, np.nan)
+
+    def nullable(values):
+        return np.where(np.isnan(values), None, values).tolist()
+
+    return jsonify({
+        "freq": freq,
+        "window": window,
+        "periods": periods.astype(str).tolist(),
+        "categories": categories.tolist(),
+        "amounts": amounts.tolist(),
+        "totals": amounts.sum(axis=0).tolist(),
+        "rolling_mean": rolling_mean.tolist(),
+        "delta": nullable(delta),
+        "delta_pct": nullable(delta_pct)
+    }), 200
+
+# Monthly budgets of a user, in rupees by category
+@bp.route('/budgets/<int:user_id>', methods=['GET'])
+def get_budgets(user_id):
+    rows = db.session.execute(
+        db.select(Budget.category, Budget.limit_paise).where(Budget.user_id == user_id).order_by(Budget.category)
+    ).all()
+    return jsonify({"budgets": {category: from_paise(limit_paise) for category, limit_paise in rows}}), 200
+
+# Set monthly budgets from an object of category -> rupee limit; a null limit removes the category's budget
+@bp.route('/budgets/<int:user_id>', methods=['PUT'])
+def set_budgets(user_id):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return jsonify({"error": "Expected a JSON object of category to monthly limit"}), 400
+    if missing_users([user_id]):
+        return jsonify({"error": "Unknown user"}), 400
+
+    limits, removed = [], []
+    for category, limit in data.items():
+        if limit is None:
+            removed.append(category)
+            continue
+        try:
+            limit_paise = to_paise(limit)
+        except (TypeError, ValueError, ArithmeticError):
+            limit_paise = 0
+        if not category.strip() or limit_paise <= 0:
+            return jsonify({"error": f"Invalid budget for {category!r}: limits must be positive amounts"}), 400
+        limits.append({"user_id": user_id, "category": category, "limit_paise": limit_paise})
+
+    if removed:
+        db.session.execute(db.delete(Budget).where(Budget.user_id == user_id, Budget.category.in_(removed)))
+    if limits:
+        table = Budget.__table__
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c.user_id, table.c.category],
+                                          set_={"limit_paise": stmt.excluded.limit_paise})
+        db.session.execute(stmt, limits)
+    # Budgets feed the cached /alerts response
+    bump_data_versions([user_id])
+    commit_expense_write([user_id])
+    return jsonify({"message": "Budgets updated successfully"}), 200
+
+# Alert feed page size bounds
+ALERT_PAGE_SIZE = 20
+ALERT_PAGE_MAX = 200
+
+# Month an alerts request without ?month is about; the response then depends on the date, not just the URL
+def implicit_alerts_month():
+    return None if request.args.get('month') else datetime.date.today().strftime('%Y-%m')
+
+# Dashboard summary, budget use for a month (?month=YYYY-MM, default this month) and the newest alerts.
+# Everything comes from category_totals, category_stats and alerts, which the write handlers keep current.
+@bp.route('/alerts/<int:user_id>', methods=['GET'])
+@cached_response(variant=implicit_alerts_month)
+def get_alerts(user_id):
+    month = request.args.get('month') or implicit_alerts_month()
+    try:
+        datetime.datetime.strptime(month, '%Y-%m')
+    except ValueError:
+        return jsonify({"error": "month must be in YYYY-MM format"}), 400
+    limit = max(1, min(request.args.get('limit', ALERT_PAGE_SIZE, type=int), ALERT_PAGE_MAX))
+
+    totals = db.session.execute(materialized_category_totals(user_id)).all()
+    biggest = max(totals, key=lambda row: row[1], default=None)
+    budgets = db.session.execute(
+        db.select(Budget.category, Budget.limit_paise, db.func.coalesce(CategoryTotal.total_paise, 0))
+        .outerjoin(CategoryTotal, (CategoryTotal.user_id == Budget.user_id) & (CategoryTotal.category == Budget.category)
+                   & (CategoryTotal.month == month))
+        .where(Budget.user_id == user_id)
+        .order_by(Budget.category)
+    ).all()
+    stats = db.session.execute(
+        db.select(CategoryStats.category, CategoryStats.count, CategoryStats.mean_paise, CategoryStats.m2)
+        .where(CategoryStats.user_id == user_id, CategoryStats.count > 0)
+        .order_by(CategoryStats.category)
+    ).all()
+    alerts = db.session.execute(
+        db.select(Alert).where(Alert.user_id == user_id).order_by(Alert.id.desc()).limit(limit)
+    ).scalars().all()
+
+    return jsonify({
+        "summary": {
+            "total_spent": from_paise(sum(paise for _, paise in totals)),
+            "biggest_category": {"category": biggest[0], "amount": from_paise(biggest[1])} if biggest else None,
+        },
+        "month": month,
+        "budgets": [
+            {"category": category, "limit": from_paise(limit_paise), "spent": from_paise(spent_paise),
+             "used": spent_paise / limit_paise}
+            for category, limit_paise, spent_paise in budgets
+        ],
+        "stats": [
+            {"category": category, "count": count, "mean": from_paise(mean_paise),
+             "std": from_paise(math.sqrt(max(m2, 0) / (count - 1))) if count > 1 else 0.0}
+            for category, count, mean_paise, m2 in stats
+        ],
+        "alerts": [
+            {"id": alert.id, "kind": alert.kind, "category": alert.category, "month": alert.month,
+             "amount": from_paise(alert.amount_paise), "score": alert.score, "expense_id": alert.expense_id,
+             "message": alert.message, "created_at": alert.created_at}
+            for alert in alerts
+        ],
+    }), 200
+
+# Most ids a bulk PATCH/DELETE may list; larger sets should use a filter
+BULK_TARGET_MAX_IDS = 10000
+
+# Columns an update may change, parsed from a PUT/PATCH body; raises ValueError with a client message
+def expense_changes(data):
+    values = {}
+    if 'amount' in data:
+        try:
+            values['amount_paise'] = to_paise(data['amount'])
+        except (TypeError, ValueError, ArithmeticError):
+            raise ValueError("Amount must be a number")
+    if 'date' in data:
+        try:
+            values['date'] = datetime.date.fromisoformat(data['date'])
+        except (TypeError, ValueError):
+            raise ValueError("Date must be in YYYY-MM-DD format")
+    if 'category' in data:
+        if not isinstance(data['category'], str) or not data['category'].strip():
+            raise ValueError("Category must be a non-empty string")
+        values['category'] = data['category']
+    if 'description' in data:
+        if isinstance(data['description'], (list, dict)):
+            raise ValueError("Description must be text")
+        values['description'] = data['description']
+    if not values:
+        raise ValueError("No data provided")
+    return values
 
-    return jsonify(chart_data), 200
+# WHERE clauses for a bulk PATCH/DELETE body: either "ids" or a "filter" of user_id, category
+# and from/to dates; raises ValueError with a client message
+def bulk_target(data):
+    ids, spec = data.get('ids'), data.get('filter')
+    if (ids is None) == (spec is None):
+        raise ValueError("Provide either ids or filter")
+    where = owner_filter()
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(type(id) is int for id in ids):
+            raise ValueError("ids must be a non-empty list of expense ids")
+        if len(ids) > BULK_TARGET_MAX_IDS:
+            raise ValueError(f"At most {BULK_TARGET_MAX_IDS} ids per request; use a filter instead")
+        return where + [Expense.id.in_(ids)]
+
+    if not isinstance(spec, dict):
+        raise ValueError("filter must be an object")
+    user_id = spec.get('user_id', g.user_id)
+    if type(user_id) is not int:
+        raise ValueError("filter needs a user_id")
+    where.append(Expense.user_id == user_id)
+    categories = spec.get('category')
+    if categories:
+        where.append(Expense.category.in_([categories] if isinstance(categories, str) else categories))
+    try:
+        if spec.get('from'):
+            where.append(Expense.date >= datetime.date.fromisoformat(spec['from']))
+        if spec.get('to'):
+            where.append(Expense.date <= datetime.date.fromisoformat(spec['to']))
+    except (TypeError, ValueError):
+        raise ValueError("Dates must be in YYYY-MM-DD format")
+    return where
+
+# category_totals deltas for (user_id, category, date, amount_paise) rows, merged per month
+def merged_category_deltas(rows, sign=1):
+    merged = {}
+    for user_id, category, date, amount_paise in rows:
+        key = (user_id, category, date.strftime('%Y-%m'))
+        total, count = merged.get(key, (0, 0))
+        merged[key] = (total + sign * amount_paise, count + sign)
+    return [{"user_id": user_id, "category": category, "month": month, "total_paise": total, "count": count}
+            for (user_id, category, month), (total, count) in merged.items()]
+
+# Sum category_totals deltas that hit the same (user_id, category, month)
+def net_category_deltas(deltas):
+    net = {}
+    for delta in deltas:
+        key = (delta["user_id"], delta["category"], delta["month"])
+        total, count = net.get(key, (0, 0))
+        net[key] = (total + delta["total_paise"], count + delta["count"])
+    return [{"user_id": user_id, "category": category, "month": month, "total_paise": total, "count": count}
+            for (user_id, category, month), (total, count) in net.items()]
+
+# Commit and drop cached reads for the users whose data a write touched
+def commit_expense_write(user_ids):
+    db.session.commit()
+    for user_id in user_ids:
+        response_cache.invalidate(user_id)
+
+# Record tombstones for deleted (expense_id, user_id) rows; ids SQLite reused for a later row may already have one
+def record_tombstones(rows, versions):
+    table = ExpenseTombstone.__table__
+    stmt = upsert(table)
+    stmt = stmt.on_conflict_do_update(index_elements=[table.c.expense_id],
+                                      set_={"user_id": stmt.excluded.user_id, "version": stmt.excluded.version})
+    db.session.execute(stmt, [{"expense_id": expense_id, "user_id": user_id, "version": versions[user_id]}
+                              for expense_id, user_id in rows])
+
+# Delete the matching expenses in one statement and take them out of category_totals; returns the count
+def delete_expenses(where):
+    stmt = db.delete(Expense).where(*where) \
+        .returning(Expense.id, Expense.user_id, Expense.category, Expense.date, Expense.amount_paise) \
+        .execution_options(synchronize_session=False)
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        db.session.rollback()
+        return 0
+    user_ids = sorted({row.user_id for row in rows})
+    record_tombstones([(row.id, row.user_id) for row in rows], bump_data_versions(user_ids))
+    apply_category_deltas(merged_category_deltas([row[1:] for row in rows], sign=-1))
+    apply_stats_deltas(merged_stats_deltas([(row.user_id, row.category, row.amount_paise) for row in rows], sign=-1))
+    commit_expense_write(user_ids)
+    return len(rows)
+
+# Update the matching expenses in one statement, move their category totals and stats, and raise the alerts
+# the new values call for; returns the count
+def update_expenses(where, values):
+    # The updated rows take their user's new version, so bump before the UPDATE
+    user_ids = db.session.execute(db.select(Expense.user_id).where(*where).distinct()).scalars().all()
+    if not user_ids:
+        db.session.rollback()
+        return 0
+    bump_data_versions(sorted(user_ids))
+    moves_totals = bool(values.keys() & {'category', 'date', 'amount_paise'})
+    if moves_totals:
+        # Subtract the rows as they are now, one delta per month, before the UPDATE changes them
+        month = month_label(Expense.date)
+        old_totals = db.select(Expense.user_id, Expense.category, month, -sum_paise(Expense.amount_paise), -db.func.count()) \
+            .where(*where) \
+            .group_by(Expense.user_id, Expense.category, month)
+        old_deltas = [{"user_id": user_id, "category": category, "month": month, "total_paise": total, "count": count}
+                      for user_id, category, month, total, count in db.session.execute(old_totals)]
+        apply_category_deltas(old_deltas)
+    moves_stats = bool(values.keys() & {'category', 'amount_paise'})
+    if moves_stats:
+        # Same for the stats: take the old rows out as one group per category
+        old_stats = expense_stats_select(sign=-1).where(*where)
+        db.session.execute(merge_category_stats(
+            upsert(CategoryStats.__table__).from_select(['user_id', 'category', 'count', 'mean_paise', 'm2'], old_stats)
+        ))
+
+    version = db.select(DataVersion.version).where(DataVersion.user_id == Expense.user_id).scalar_subquery()
+    stmt = db.update(Expense).where(*where).values(**values, version=version) \
+        .returning(Expense.user_id, Expense.category, Expense.date, Expense.amount_paise, Expense.id) \
+        .execution_options(synchronize_session=False)
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        db.session.rollback()
+        return 0
+    alerts = []
+    if moves_totals:
+        new_deltas = merged_category_deltas([row[:4] for row in rows])
+        apply_category_deltas(new_deltas)
+        # Budgets are checked against what the update added to each month, net of what it took out
+        alerts += budget_alerts(net_category_deltas(old_deltas + new_deltas))
+    if moves_stats:
+        # The changed rows are scored against their category without them, as if they were new
+        changed = pd.DataFrame(rows, columns=["user_id", "category", "date", "amount_paise", "id"])
+        alerts += bulk_anomaly_alerts(changed, expense_ids=changed["id"].tolist())
+    record_alerts(alerts)
+    commit_expense_write(sorted({row.user_id for row in rows}))
+    return len(rows)
 
 # Delete an expense route
-@app.route('/expenses/<int:expense_id>', methods=['DELETE'])
+@bp.route('/expenses/<int:expense_id>', methods=['DELETE'])
 def delete_expense(expense_id):
-    expense = Expense.query.get(expense_id)
-    if not expense:
+    if not delete_expenses([Expense.id == expense_id, *owner_filter()]):
         return jsonify({"error": "Expense not found"}), 404
 
-    db.session.delete(expense)
-    db.session.commit()
-
     return jsonify({"message": "Expense deleted successfully"}), 200
 
 # Update an expense route
-@app.route('/expenses/<int:expense_id>', methods=['PUT'])
+@bp.route('/expenses/<int:expense_id>', methods=['PUT'])
 def update_expense(expense_id):
-    expense = Expense.query.get(expense_id)
-    if not expense:
-        return jsonify({"error": "Expense not found"}), 404
-
     data = request.get_json()
     if not data:
         return jsonify({"error": "No data provided"}), 400
 
-    expense.date = data.get('date', expense.date)
-    expense.category = data.get('category', expense.category)
-    expense.amount = data.get('amount', expense.amount)
-    expense.description = data.get('description', expense.description)
+    try:
+        values = expense_changes(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    db.session.commit()
+    if not update_expenses([Expense.id == expense_id, *owner_filter()], values):
+        return jsonify({"error": "Expense not found"}), 404
 
     return jsonify({"message": "Expense updated successfully"}), 200
 
+# Update every expense selected by ids or a filter, in one statement and one transaction
+@bp.route('/expenses/bulk', methods=['PATCH'])
+def update_expenses_bulk():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('set'), dict):
+        return jsonify({"error": "Expected a JSON object with ids or filter, and set"}), 400
+
+    try:
+        where = bulk_target(data)
+        values = expense_changes(data['set'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    updated = update_expenses(where, values)
+    return jsonify({"message": "Expenses updated successfully", "updated": updated}), 200
+
+# Delete every expense selected by ids or a filter, in one statement and one transaction
+@bp.route('/expenses/bulk', methods=['DELETE'])
+def delete_expenses_bulk():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object with ids or filter"}), 400
+
+    try:
+        where = bulk_target(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    deleted = delete_expenses(where)
+    return jsonify({"message": "Expenses deleted successfully", "deleted": deleted}), 200
+
+# Prometheus scrape endpoint for the route and SQL metrics
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    if not current_app.config['METRICS_ENABLED']:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Response cache counters
+@bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(response_cache.stats()), 200
+
+# Build the app: load config, bind the database and, unless AUTO_INIT_DB is off, create the schema
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.update(default_config())
+    app.config.update(config or {})
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
+    db.init_app(app)
+    known_users.clear()
+    response_cache.max_entries = app.config['RESPONSE_CACHE_MAX_ENTRIES']
+    response_cache.ttl = app.config['RESPONSE_CACHE_TTL']
+    password_hasher.configure(app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_QUEUE'])
+    token_signer.secret = app.config['SECRET_KEY'].encode()
+    token_signer.ttl = app.config['AUTH_TOKEN_TTL']
+    login_cache.max_entries = app.config['LOGIN_CACHE_MAX_ENTRIES']
+    login_cache.ttl = app.config['LOGIN_CACHE_TTL']
+    app.json = json_provider_class(app.config['JSON_PROVIDER'])(app)
+    app.register_blueprint(bp)
+
+    with app.app_context():
+        if dialect_name() == 'sqlite':
+            pragmas = SQLITE_PROFILES[app.config['SQLITE_PROFILE']]
+            event.listen(db.engine, 'connect', functools.partial(apply_sqlite_profile, pragmas))
+        if app.config['METRICS_ENABLED']:
+            event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(db.engine, 'after_cursor_execute', after_cursor_execute)
+            if not event.contains(db.session, 'do_orm_execute', count_result_rows):
+                event.listen(db.session, 'do_orm_execute', count_result_rows)
+        if app.config['AUTO_INIT_DB']:
+            init_db()
+    return app
+
 # Run the app
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""ASGI serving mode: the hot read routes on an async engine, everything else on the Flask app.
+
+GET /expenses/<user_id> and GET /visualize/<user_id> are served on the event
+loop through SQLAlchemy's async engine (aiosqlite for SQLite, asyncpg for
+PostgreSQL), so any number of them can wait on the database without holding
+a thread each. They share the Flask app's session tokens, response cache,
+ETags and metrics, and answer exactly as the Flask views do. Every other
+route goes to the Flask app through a2wsgi, which runs it on a thread pool.
+
+Needs uvicorn, a2wsgi, SQLAlchemy's asyncio extra and aiosqlite or asyncpg:
+
+    python asgi.py
+    uvicorn --factory asgi:create_asgi_app --port 5000
+"""
+import datetime
+import functools
+import re
+import time
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.datastructures import Headers, MIMEAccept, MultiDict
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+from app import (
+    COLUMNAR_ENDPOINTS, EXPENSE_PAGE_MAX, EXPENSE_PAGE_SIZE, EXPENSE_SHAPES, SQLITE_PROFILES, after_cursor_execute,
+    apply_sqlite_profile, before_cursor_execute, category_totals_select, chart_body, create_app, data_version_select,
+    db, encode_body, engine_options, expense_page_body, expense_page_select, negotiate, representation_etag,
+    request_latency, resolve_user, response_cache
+)
+from serialization import JSON_MIMETYPE, compress
+
+# Async DBAPI driver used for each database backend
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg'}
+
+
+def create_async_db_engine(flask_app):
+    """Async engine on the Flask app's database, with the same pool settings and SQLite profile."""
+    with flask_app.app_context():
+        url = db.engine.url  # Flask-SQLAlchemy has already resolved relative SQLite paths
+    backend = url.get_backend_name()
+    engine = create_async_engine(url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}"),
+                                 **engine_options(flask_app.config))
+    if backend == 'sqlite':
+        pragmas = SQLITE_PROFILES[flask_app.config['SQLITE_PROFILE']]
+        event.listen(engine.sync_engine, 'connect', functools.partial(apply_sqlite_profile, pragmas))
+    if flask_app.config['METRICS_ENABLED']:
+        event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine.sync_engine, 'after_cursor_execute', after_cursor_execute)
+    return engine
+
+
+def _date_arg(args, name):
+    value = args.get(name)
+    return datetime.date.fromisoformat(value) if value else None
+
+
+async def get_expenses(conn, user_id, args, columnar):
+    try:
+        after_date = _date_arg(args, 'after_date')
+    except ValueError:
+        return {"error": "after_date must be in YYYY-MM-DD format"}, 400
+    after_id = args.get('after_id', type=int)
+    if (after_date is None) != (after_id is None):
+        return {"error": "Pass after_date and after_id together"}, 400
+    limit = max(1, min(args.get('limit', EXPENSE_PAGE_SIZE, type=int), EXPENSE_PAGE_MAX))
+    shape = 'columns' if columnar else args.get('shape', 'rows')
+    if shape not in EXPENSE_SHAPES:
+        return {"error": "shape must be 'rows' or 'columns'"}, 400
+    rows = (await conn.execute(expense_page_select(user_id, after_date, after_id, limit))).all()
+    return expense_page_body(rows, limit, shape), 200
+
+
+async def visualize(conn, user_id, args, columnar):
+    try:
+        start, end = _date_arg(args, 'from'), _date_arg(args, 'to')
+    except ValueError:
+        return {"error": "Dates must be in YYYY-MM-DD format"}, 400
+    rows = (await conn.execute(category_totals_select(user_id, start, end, args.getlist('category')))).all()
+    if not rows:
+        return {"error": "No expenses found"}, 404
+    return chart_body(rows), 200
+
+
+# Routes served natively: path pattern -> (Flask endpoint name, view)
+ASYNC_ROUTES = [
+    (re.compile(r'/expenses/(\d+)'), ('finance.get_expenses', get_expenses)),
+    (re.compile(r'/visualize/(\d+)'), ('finance.visualize', visualize)),
+]
+
+
+class FinanceASGI:
+    """ASGI app serving ASYNC_ROUTES itself and passing everything else to the Flask app."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self.engine = create_async_db_engine(flask_app)
+        # One WSGI thread per pooled connection, as under a threaded WSGI server
+        self.wsgi = WSGIMiddleware(flask_app, workers=self.config['DB_POOL_SIZE'])
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern, route in ASYNC_ROUTES:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    await self.serve(route, int(match.group(1)), scope, send)
+                    return
+        await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def serve(self, route, user_id, scope, send):
+        """Same contract as cached_response(): token check, ETag, then the response cache, then the view."""
+        started = time.perf_counter()
+        endpoint, view = route
+        headers = Headers([(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']])
+        _, error = resolve_user(headers.get('Authorization', ''), user_id, self.config['AUTH_REQUIRED'])
+        if error is not None:
+            message, status = error
+            await self.respond(send, status, self.json_body({"error": message}), JSON_MIMETYPE)
+        else:
+            mimetype, coding = negotiate(endpoint, parse_accept_header(headers.get('Accept'), MIMEAccept),
+                                         parse_accept_header(headers.get('Accept-Encoding')),
+                                         self.config['COMPRESSION_ENABLED'])
+            async with self.engine.connect() as conn:
+                version = (await conn.execute(data_version_select(user_id))).scalar() or 0
+                etag = representation_etag(version, mimetype, coding)
+                if parse_etags(headers.get('If-None-Match')).contains(etag):
+                    status, body = 304, None
+                else:
+                    key = (endpoint, scope['query_string'], etag)
+                    cached = response_cache.get(user_id, key)
+                    if cached is not None:
+                        body, status, mimetype = cached
+                    else:
+                        generation = response_cache.generation(user_id)
+                        args = MultiDict(parse_qsl(scope['query_string'].decode(), keep_blank_values=True))
+                        payload, status = await view(conn, user_id, args, mimetype != JSON_MIMETYPE)
+                        if status != 200:  # errors are always JSON
+                            mimetype = JSON_MIMETYPE
+                        body = encode_body(payload, mimetype, endpoint, self.flask_app.json)
+                        if coding:
+                            body = compress(body, coding)
+                        response_cache.set(user_id, key, (body, status, mimetype), generation)
+            vary = 'Accept-Encoding, Accept' if endpoint in COLUMNAR_ENDPOINTS else 'Accept-Encoding'
+            await self.respond(send, status, body, mimetype, etag, coding, vary)
+        if self.config['METRICS_ENABLED']:
+            request_latency.observe(time.perf_counter() - started, endpoint, 'GET', status)
+
+    def json_body(self, payload):
+        # Serialized by the Flask app's JSON provider, byte for byte what jsonify() would send
+        return self.flask_app.json.response(payload).get_data()
+
+    async def respond(self, send, status, body, mimetype, etag=None, coding=None, vary=None):
+        headers = [] if etag is None else [(b'etag', quote_etag(etag).encode())]
+        if vary is not None:
+            headers.append((b'vary', vary.encode()))
+        if body is not None:
+            headers += [(b'content-type', mimetype.encode()), (b'content-length', str(len(body)).encode())]
+            if coding:
+                headers.append((b'content-encoding', coding.encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body or b''})
+
+
+def create_asgi_app(config=None):
+    """Build the Flask app with create_app(config) and wrap it for an ASGI server."""
+    return FinanceASGI(create_app(config))
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(create_asgi_app(), port=5000)
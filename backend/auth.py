@@ -0,0 +1,129 @@
+"""Password hashing on a bounded worker pool and HMAC-signed session tokens."""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# scrypt cost: 16 MiB of memory and roughly 50 ms of CPU per hash
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+HASH_SCHEME = 'scrypt'
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """Hash a password as ``scrypt$n$r$p$salt$digest``."""
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=32)
+    return '$'.join([HASH_SCHEME, str(n), str(r), str(p), _b64encode(salt), _b64encode(digest)])
+
+
+# Stored hash checked for unknown usernames so a failed login costs the same scrypt either way;
+# its zero digest is no password's
+DUMMY_HASH = '$'.join([HASH_SCHEME, str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P), _b64encode(bytes(16)),
+                       _b64encode(bytes(32))])
+
+
+def is_hashed(stored):
+    return stored.startswith(HASH_SCHEME + '$')
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash, or against a legacy plaintext value."""
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, n, r, p, salt, digest = stored.split('$')
+    expected = _b64decode(digest)
+    candidate = hashlib.scrypt(password.encode(), salt=_b64decode(salt), n=int(n), r=int(r), p=int(p),
+                               dklen=len(expected))
+    return hmac.compare_digest(candidate, expected)
+
+
+class HasherBusy(Exception):
+    """Raised when every hashing worker is busy and the wait queue is full."""
+
+
+class PasswordHasher:
+    """Runs hash_password/verify_password on a bounded thread pool.
+
+    scrypt releases the GIL, so the workers hash in parallel while request
+    threads only wait on the result. At most ``workers`` hashes run at once and
+    at most ``queue`` more wait; past that, calls raise HasherBusy right away so
+    a burst of logins cannot tie up every request thread.
+    """
+
+    def __init__(self, workers=4, queue=16):
+        self._lock = threading.Lock()
+        self._executor = None
+        self.configure(workers, queue)
+
+    def configure(self, workers, queue):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self.workers = workers
+            self.queue = queue
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+            self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def verify(self, password, stored):
+        return self._run(verify_password, password, stored)
+
+    def _run(self, fn, *args):
+        with self._lock:
+            executor, slots = self._executor, self._slots
+        if not slots.acquire(blocking=False):
+            raise HasherBusy()
+        future = executor.submit(fn, *args)
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+
+class TokenSigner:
+    """Issues ``<user_id>.<expires>.<signature>`` tokens signed with HMAC-SHA256.
+
+    A token is checked by recomputing its signature, so no database lookup is
+    needed to trust the user id inside it until it expires.
+    """
+
+    def __init__(self, secret=b'', ttl=86400, clock=time.time):
+        self.secret = secret
+        self.ttl = ttl
+        self.clock = clock
+
+    def sign(self, user_id):
+        payload = f"{user_id}.{int(self.clock()) + self.ttl}"
+        return f"{payload}.{self._signature(payload)}"
+
+    def verify(self, token):
+        """Return the user id of a valid, unexpired token, else None."""
+        try:
+            user_id, expires, signature = token.split('.')
+            if not hmac.compare_digest(signature, self._signature(f"{user_id}.{expires}")):
+                return None
+            if int(expires) <= self.clock():
+                return None
+            return int(user_id)
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def fingerprint(self, *parts):
+        """Keyed digest of some values, for cache keys that must not hold them in clear."""
+        return hmac.new(self.secret, '\0'.join(parts).encode(), hashlib.sha256).hexdigest()
+
+    def _signature(self, payload):
+        return _b64encode(hmac.new(self.secret, payload.encode(), hashlib.sha256).digest())
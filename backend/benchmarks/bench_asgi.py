@@ -0,0 +1,86 @@
+"""Compare the threaded WSGI server with the ASGI mode on the read routes.
+
+Both servers run in their own process on the same seeded database, with the
+response cache off so every request reaches the database. The WSGI side is
+Werkzeug's threaded server, as used by app.run(); the ASGI side is uvicorn
+serving asgi.create_asgi_app(). Load comes from keep-alive HTTP connections
+in this process, at each level of concurrency in CONNECTIONS.
+
+Run from the backend directory:  python -m benchmarks.bench_asgi
+"""
+import logging
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.common import DATABASE_URI, bench_app, seed
+from benchmarks.load import http_concurrent
+
+ROWS = 200_000
+USERS = 20
+CONNECTIONS = [8, 64, 256]
+DURATION = 5.0  # seconds
+PORTS = {'wsgi': 5101, 'asgi': 5102}
+SERVER_CONFIG = {'SQLALCHEMY_DATABASE_URI': DATABASE_URI, 'RESPONSE_CACHE_MAX_ENTRIES': 0, 'AUTO_INIT_DB': False}
+
+
+def read_request(get, rng):
+    user = rng.randint(1, USERS)
+    if rng.random() < 0.5:
+        return get(f'/expenses/{user}?limit=100')
+    return get(f'/visualize/{user}?from=2024-{rng.randint(1, 12):02d}-01')
+
+
+def serve(mode, port):
+    if mode == 'wsgi':
+        from werkzeug.serving import make_server
+
+        from app import create_app
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no per-request access log
+        make_server('127.0.0.1', port, create_app(SERVER_CONFIG), threaded=True).serve_forever()
+    else:
+        import uvicorn
+
+        from asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(SERVER_CONFIG), host='127.0.0.1', port=port, log_level='warning')
+
+
+def start_server(mode):
+    port = PORTS[mode]
+    # The server process must open this process's scratch database, not a new one
+    env = {**os.environ, 'FINANCE_BENCH_DATABASE_URI': DATABASE_URI}
+    server = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_asgi', mode, str(port)], env=env)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=1)
+            return server, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def main():
+    bench_app()
+    seed(ROWS, users=USERS)
+    print(f"{ROWS} rows over {USERS} users, response cache off, {DURATION:.0f}s per row")
+    print(f"{'mode':>5} {'conns':>6} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}")
+    for mode in PORTS:
+        server, base_url = start_server(mode)
+        try:
+            for connections in CONNECTIONS:
+                stats = http_concurrent(base_url, read_request, connections, DURATION)
+                print(f"{mode:>5} {connections:>6} {stats['throughput_rps']:>8.0f} {stats['p50_ms']:>9.1f} "
+                      f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['errors']:>7}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        serve(sys.argv[1], int(sys.argv[2]))
+    else:
+        main()
@@ -0,0 +1,48 @@
+"""Compare ingest throughput of POST /expenses/bulk with looping over POST /expenses.
+
+Run from the backend directory:  python -m benchmarks.bench_bulk
+"""
+import random
+import time
+
+from benchmarks.common import CATEGORIES, bench_app, seed
+
+app = bench_app()
+
+LOOP_ROWS = 2_000
+BULK_SIZES = [2_000, 100_000]
+
+
+def make_expenses(rows):
+    rng = random.Random(7)
+    return [
+        {"user_id": 1, "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+         "category": rng.choice(CATEGORIES), "amount": round(rng.uniform(10, 5000), 2), "description": "bench"}
+        for _ in range(rows)
+    ]
+
+
+def main():
+    client = app.test_client()
+    print(f"{'mode':>6} {'rows':>8} {'time (s)':>9} {'rows/s':>10}")
+
+    seed(0)
+    expenses = make_expenses(LOOP_ROWS)
+    start = time.perf_counter()
+    for expense in expenses:
+        client.post('/expenses', json=expense)
+    elapsed = time.perf_counter() - start
+    print(f"{'loop':>6} {LOOP_ROWS:>8} {elapsed:>9.2f} {LOOP_ROWS / elapsed:>10.0f}")
+
+    for rows in BULK_SIZES:
+        seed(0)
+        expenses = make_expenses(rows)
+        start = time.perf_counter()
+        response = client.post('/expenses/bulk', json=expenses)
+        elapsed = time.perf_counter() - start
+        assert response.json["inserted"] == rows
+        print(f"{'bulk':>6} {rows:>8} {elapsed:>9.2f} {rows / elapsed:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Compare per-id DELETE/PUT calls with DELETE/PATCH /expenses/bulk.
+
+Run from the backend directory:  python -m benchmarks.bench_bulk_write
+"""
+import time
+
+from benchmarks.common import bench_app, seed
+
+from app import Expense, db
+
+app = bench_app()
+
+ROWS = 20_000
+TARGETS = 5_000
+
+
+def target_ids():
+    with app.app_context():
+        return db.session.execute(db.select(Expense.id).order_by(Expense.id).limit(TARGETS)).scalars().all()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    client = app.test_client()
+    print(f"{'operation':>10} {'mode':>5} {'rows':>6} {'time (s)':>9}")
+
+    seed(ROWS)
+    ids = target_ids()
+    elapsed = timed(lambda: [client.put(f'/expenses/{id}', json={"amount": 1}) for id in ids])
+    print(f"{'update':>10} {'loop':>5} {TARGETS:>6} {elapsed:>9.3f}")
+
+    seed(ROWS)
+    ids = target_ids()
+    elapsed = timed(lambda: client.patch('/expenses/bulk', json={"ids": ids, "set": {"amount": 1}}))
+    print(f"{'update':>10} {'bulk':>5} {TARGETS:>6} {elapsed:>9.3f}")
+
+    seed(ROWS)
+    ids = target_ids()
+    elapsed = timed(lambda: [client.delete(f'/expenses/{id}') for id in ids])
+    print(f"{'delete':>10} {'loop':>5} {TARGETS:>6} {elapsed:>9.3f}")
+
+    seed(ROWS)
+    ids = target_ids()
+    elapsed = timed(lambda: client.delete('/expenses/bulk', json={"ids": ids}))
+    print(f"{'delete':>10} {'bulk':>5} {TARGETS:>6} {elapsed:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
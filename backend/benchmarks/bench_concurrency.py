@@ -0,0 +1,82 @@
+"""Run concurrent readers and writers against the app under each SQLite profile.
+
+Readers page through GET /expenses and GET /visualize while writers POST
+/expenses; each profile runs in its own process so that the journal mode
+set by one run does not carry over into the next.
+
+Run from the backend directory:  python -m benchmarks.bench_concurrency
+"""
+import logging
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import CATEGORIES, bench_app, seed
+
+PROFILES = ['rollback', 'wal']
+ROWS = 50_000
+READERS = 8
+WRITERS = 4
+DURATION = 5.0  # seconds
+
+
+def reader(client, deadline, stats):
+    paths = ['/expenses/1?limit=100', '/visualize/1', '/visualize/1?from=2024-06-01']
+    while time.perf_counter() < deadline:
+        for path in paths:
+            start = time.perf_counter()
+            status = client.get(path).status_code
+            stats.append(('read', status, time.perf_counter() - start))
+
+
+def writer(client, deadline, stats, seed_value):
+    rng = random.Random(seed_value)
+    while time.perf_counter() < deadline:
+        expense = {"user_id": 1, "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                   "category": rng.choice(CATEGORIES), "amount": round(rng.uniform(10, 5000), 2),
+                   "description": "bench"}
+        start = time.perf_counter()
+        status = client.post('/expenses', json=expense).status_code
+        stats.append(('write', status, time.perf_counter() - start))
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def run_profile(profile):
+    app = bench_app(SQLITE_PROFILE=profile)
+    app.logger.setLevel(logging.CRITICAL)  # failed requests are counted, not printed
+
+    seed(ROWS)
+    stats = []
+    deadline = time.perf_counter() + DURATION
+    threads = [threading.Thread(target=reader, args=(app.test_client(), deadline, stats)) for _ in range(READERS)]
+    threads += [threading.Thread(target=writer, args=(app.test_client(), deadline, stats, n)) for n in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for kind in ('read', 'write'):
+        timings = [elapsed for k, status, elapsed in stats if k == kind and status < 500]
+        errors = sum(1 for k, status, _ in stats if k == kind and status >= 500)
+        print(f"{profile:>9} {kind:>6} {len(timings) / DURATION:>9.0f} "
+              f"{percentile(timings, 0.5) * 1000:>9.1f} {percentile(timings, 0.95) * 1000:>9.1f} {errors:>7}")
+
+
+def main():
+    print(f"{READERS} readers, {WRITERS} writers, {ROWS} rows, {DURATION:.0f}s per profile")
+    print(f"{'profile':>9} {'kind':>6} {'req/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'errors':>7}")
+    for profile in PROFILES:
+        subprocess.run([sys.executable, '-m', 'benchmarks.bench_concurrency', profile], check=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run_profile(sys.argv[1])
+    else:
+        main()
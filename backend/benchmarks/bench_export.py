@@ -0,0 +1,58 @@
+"""Check that streaming /expenses/<user_id>/export keeps peak memory flat as history grows.
+
+Peak traced memory for the largest history must stay within MAX_PEAK_GROWTH
+times the peak for the smallest, per format; otherwise the script reports
+the regression and exits with status 1.
+
+Run from the backend directory:  python -m benchmarks.bench_export
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import bench_app, seed
+
+app = bench_app()
+
+SIZES = [10_000, 100_000, 1_000_000]
+# Allowed ratio of peak memory at SIZES[-1] to peak memory at SIZES[0]
+MAX_PEAK_GROWTH = 3
+
+
+def measure(url):
+    client = app.test_client()
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url, buffered=False)
+    size = 0
+    for chunk in response.response:
+        size += len(chunk)
+    response.close()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def main():
+    peaks = {}
+    print(f"{'rows':>10} {'format':>7} {'time (s)':>9} {'bytes':>12} {'peak MiB':>9}")
+    for rows in SIZES:
+        seed(rows)
+        for export_format in ('ndjson', 'csv'):
+            elapsed, size, peak = measure(f'/expenses/1/export?format={export_format}')
+            peaks[rows, export_format] = peak
+            print(f"{rows:>10} {export_format:>7} {elapsed:>9.2f} {size:>12} {peak / 2**20:>9.2f}")
+
+    failed = False
+    for export_format in ('ndjson', 'csv'):
+        growth = peaks[SIZES[-1], export_format] / peaks[SIZES[0], export_format]
+        if growth > MAX_PEAK_GROWTH:
+            failed = True
+            print(f"REGRESSION: {export_format} peak memory grew {growth:.1f}x from {SIZES[0]} to {SIZES[-1]} rows "
+                  f"(allowed {MAX_PEAK_GROWTH}x)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
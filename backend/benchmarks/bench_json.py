@@ -0,0 +1,66 @@
+"""Time building and serializing a 100k-row expense list with each JSON provider and shape.
+
+The first row is the old path for comparison: rows fetched with Date objects,
+one dict per row with the date and amount converted in Python, encoded by
+Flask's default provider.
+
+Run from the backend directory:  python -m benchmarks.bench_json
+"""
+import time
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.common import bench_app, seed
+
+from app import Expense, db, expense_list_fields, expense_page_select, from_paise
+from serialization import OrjsonProvider, StdlibJSONProvider, orjson
+
+app = bench_app()
+
+ROWS = 100_000
+REPEAT = 5
+
+
+def dicts_before(rows):
+    return {"expenses": [
+        {"id": id, "date": date.isoformat(), "category": category, "amount": from_paise(amount_paise),
+         "description": description}
+        for id, date, category, amount_paise, description in rows
+    ]}
+
+
+def best_of(fn):
+    best, result = float('inf'), None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    seed(ROWS)
+    before_stmt = db.select(Expense.id, Expense.date, Expense.category, Expense.amount_paise, Expense.description) \
+        .where(Expense.user_id == 1).order_by(Expense.date, Expense.id)
+    with app.app_context():
+        fetch_before, before_rows = best_of(lambda: db.session.execute(before_stmt).all())
+        fetch, rows = best_of(lambda: db.session.execute(expense_page_select(1, limit=ROWS)).all()[:ROWS])
+    print(f"{len(rows)} rows fetched in {fetch * 1000:.1f} ms ({fetch_before * 1000:.1f} ms with Date objects)")
+
+    cases = [("dicts (before)", DefaultJSONProvider, lambda rows: dicts_before(before_rows))]
+    providers = [StdlibJSONProvider] + ([OrjsonProvider] if orjson is not None else [])
+    for provider in providers:
+        for shape in ('rows', 'columns'):
+            cases.append((shape, provider, lambda rows, shape=shape: expense_list_fields(rows, shape)))
+
+    print(f"{'provider':>19} {'shape':>15} {'build (ms)':>11} {'encode (ms)':>12} {'total (ms)':>11} {'bytes':>10}")
+    for label, provider_class, build in cases:
+        provider = provider_class(app)
+        build_time, body = best_of(lambda: build(rows))
+        encode_time, payload = best_of(lambda: provider.response(body).get_data())
+        print(f"{provider_class.__name__:>19} {label:>15} {build_time * 1000:>11.1f} {encode_time * 1000:>12.1f} "
+              f"{(build_time + encode_time) * 1000:>11.1f} {len(payload):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Measure logins per second as the password hashing pool grows.
+
+Client threads log in continuously while a few others hit GET /visualize, to
+show that a saturated hashing pool does not hold up unrelated requests. The
+last row repeats the run with the login cache on.
+
+Run from the backend directory:  python -m benchmarks.bench_login
+"""
+import logging
+import threading
+import time
+
+from benchmarks.common import bench_app, seed
+
+from app import User, db, login_cache, password_hasher
+from auth import hash_password
+
+app = bench_app()
+
+USERS = 64
+POOL_SIZES = [1, 2, 4, 8]
+CLIENTS = 16
+READERS = 2
+DURATION = 3.0  # seconds
+
+
+def login_client(client, index, deadline, stats):
+    while time.perf_counter() < deadline:
+        username = f'login{index % USERS}'
+        status = client.post('/login', json={"username": username, "password": "bench"}).status_code
+        stats.append(status)
+
+
+def reader(client, deadline, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        client.get('/visualize/1')
+        latencies.append(time.perf_counter() - start)
+
+
+def run(label):
+    stats, latencies = [], []
+    deadline = time.perf_counter() + DURATION
+    threads = [threading.Thread(target=login_client, args=(app.test_client(), n, deadline, stats))
+               for n in range(CLIENTS)]
+    threads += [threading.Thread(target=reader, args=(app.test_client(), deadline, latencies)) for _ in range(READERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p95 = latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0
+    print(f"{label:>8} {stats.count(200) / DURATION:>10.0f} {stats.count(503):>6} {p95 * 1000:>17.1f}")
+
+
+def main():
+    app.logger.setLevel(logging.CRITICAL)
+    seed(10_000)
+    with app.app_context():
+        stored = hash_password('bench')
+        db.session.execute(db.delete(User).where(User.username.like('login%')))
+        db.session.execute(db.insert(User), [{"username": f'login{n}', "password": stored} for n in range(USERS)])
+        db.session.commit()
+
+    print(f"{CLIENTS} login clients, {READERS} readers, {DURATION:.0f}s per row")
+    print(f"{'workers':>8} {'logins/s':>10} {'503s':>6} {'reader p95 (ms)':>17}")
+    cache_ttl = login_cache.ttl
+    login_cache.ttl = 0  # every login hashes
+    for workers in POOL_SIZES:
+        password_hasher.configure(workers, queue=CLIENTS)
+        run(str(workers))
+
+    login_cache.ttl = cache_ttl
+    run('cached')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Time /expenses/<user_id>/search for text, range and combined queries as history grows.
+
+Run from the backend directory:  python -m benchmarks.bench_search
+"""
+import time
+
+from benchmarks.common import bench_app, seed
+
+from app import response_cache
+
+app = bench_app()
+
+SIZES = [100_000, 1_000_000]
+REPEAT = 5
+QUERIES = {
+    "common word": "q=lunch",
+    "rare word": "q=donation",
+    "two words": "q=coffee+metro",
+    "prefix": "q=pha",
+    "word + ranges": "q=taxi&min=100&max=500&from=2024-03-01&to=2024-06-30",
+    "ranges only": "min=4000&from=2024-12-01",
+    "category": "q=gift&category=Shopping",
+}
+
+
+def main():
+    client = app.test_client()
+    print(f"{'rows':>10} {'query':>14} {'hits':>5} {'best (ms)':>10}")
+    for rows in SIZES:
+        seed(rows)
+        for label, query in QUERIES.items():
+            best = float('inf')
+            for _ in range(REPEAT):
+                response_cache.invalidate(1)  # time the query, not the response cache
+                start = time.perf_counter()
+                response = client.get(f'/expenses/1/search?{query}')
+                best = min(best, time.perf_counter() - start)
+            assert response.status_code == 200, response.json
+            print(f"{rows:>10} {label:>14} {len(response.json['expenses']):>5} {best * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Time the dashboard's local expense copy: a first full sync, a cold start, and a delta sync after a few writes.
+
+The full sync pages GET /expenses/1/changes through the test client into a
+LocalStore (frontend/local_store.py) in a scratch directory. Cold start is
+opening that store and reading the first list page from it, against fetching
+the same page from GET /expenses/1. The delta sync follows a handful of adds,
+updates and deletes and transfers only those rows and tombstones.
+
+Run from the backend directory:  python -m benchmarks.bench_sync
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.common import bench_app, seed
+
+from app import CHANGES_PAGE_MAX, EXPENSE_PAGE_SIZE
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'frontend'))
+from local_store import LocalStore  # noqa: E402
+
+app = bench_app()
+
+ROWS = 100_000
+WRITES = 10
+REPEAT = 20
+
+
+def sync(client, store):
+    """Apply every page of changes since the store's version; returns (pages, rows, bytes)"""
+    params = {"since": store.version(), "limit": CHANGES_PAGE_MAX}
+    version, pages, rows, size = None, 0, 0, 0
+    while True:
+        response = client.get('/expenses/1/changes', query_string=params)
+        assert response.status_code == 200, response.status
+        payload = response.get_json()
+        size += len(response.get_data())
+        store.apply_changes(payload, version is None)
+        version = payload["version"] if version is None else version
+        pages += 1
+        rows += len(payload["ids"]) + len(payload["deleted"])
+        if payload["next_after_id"] is None:
+            store.finish_sync(version)
+            return pages, rows, size
+        params.update(after_version=payload["next_after_version"], after_id=payload["next_after_id"])
+
+
+def best_of(fn):
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    seed(ROWS)
+    client = app.test_client()
+    path = os.path.join(tempfile.mkdtemp(), 'expenses-1.db')
+    store = LocalStore(path)
+
+    start = time.perf_counter()
+    pages, rows, size = sync(client, store)
+    print(f"full sync: {rows} rows in {pages} pages, {size / 1e6:.1f} MB, {time.perf_counter() - start:.2f} s")
+    store.close()
+
+    def cold_start():
+        cold = LocalStore(path)
+        assert len(cold.page(None, EXPENSE_PAGE_SIZE)["ids"]) == EXPENSE_PAGE_SIZE
+        cold.close()
+
+    def server_page():
+        assert client.get(f'/expenses/1?limit={EXPENSE_PAGE_SIZE}&shape=columns').status_code == 200
+
+    print(f"first page, local store: {best_of(cold_start) * 1000:.2f} ms")
+    print(f"first page, server:      {best_of(server_page) * 1000:.2f} ms (response cache on)")
+
+    store = LocalStore(path)
+    ids = client.get('/expenses/1?limit=1000&shape=columns').get_json()["ids"]
+    for i in range(WRITES):
+        client.post('/expenses', json={"user_id": 1, "date": "2024-06-01", "category": "Food", "amount": 10 + i})
+        client.put(f'/expenses/{ids[2 * i]}', json={"amount": 99})
+        client.delete(f'/expenses/{ids[2 * i + 1]}')
+    start = time.perf_counter()
+    pages, rows, size = sync(client, store)
+    print(f"delta sync after {3 * WRITES} writes: {rows} rows in {pages} page, {size} bytes, "
+          f"{(time.perf_counter() - start) * 1000:.2f} ms")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Time /analytics/<user_id>/timeseries at each frequency as history grows.
+
+Run from the backend directory:  python -m benchmarks.bench_timeseries
+"""
+import time
+
+from benchmarks.common import bench_app, seed
+
+from app import response_cache
+
+app = bench_app()
+
+SIZES = [10_000, 100_000, 1_000_000]
+REPEAT = 5
+
+
+def main():
+    client = app.test_client()
+    print(f"{'rows':>10} {'freq':>4} {'periods':>8} {'best (ms)':>10}")
+    for rows in SIZES:
+        seed(rows)
+        for freq in ('D', 'W', 'M'):
+            best = float('inf')
+            for _ in range(REPEAT):
+                response_cache.invalidate(1)  # time the computation, not the cache
+                start = time.perf_counter()
+                response = client.get(f'/analytics/1/timeseries?freq={freq}')
+                best = min(best, time.perf_counter() - start)
+            print(f"{rows:>10} {freq:>4} {len(response.json['periods']):>8} {best * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
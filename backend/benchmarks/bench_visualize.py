@@ -0,0 +1,50 @@
+"""Compare the category aggregations behind /visualize with the old ORM + pandas path.
+
+Run from the backend directory:  python -m benchmarks.bench_visualize
+"""
+import time
+
+import pandas as pd
+
+from app import db, Expense, materialized_category_totals, scan_category_totals
+from benchmarks.common import bench_app, seed
+
+app = bench_app()
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def pandas_totals(user_id):
+    expenses = Expense.query.filter_by(user_id=user_id).all()
+    df = pd.DataFrame({
+        "Date": [expense.date for expense in expenses],
+        "Category": [expense.category for expense in expenses],
+        "Amount": [expense.amount_paise / 100 for expense in expenses]
+    })
+    grouped = df.groupby("Category")["Amount"].sum().reset_index()
+    return grouped["Category"].tolist(), grouped["Amount"].tolist()
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    with app.app_context():
+        print(f"{'rows':>10} {'orm+pandas (s)':>16} {'sql scan (s)':>14} {'materialized (s)':>18}")
+        for rows in SIZES:
+            seed(rows)
+            legacy = timed(lambda: pandas_totals(1))
+            scan = timed(lambda: db.session.execute(scan_category_totals(1)).all())
+            materialized = timed(lambda: db.session.execute(materialized_category_totals(1)).all())
+            print(f"{rows:>10} {legacy:>16.4f} {scan:>14.4f} {materialized:>18.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare response formats and content codings for a full expense page: bytes, server time, client decode time.
+
+Each case requests GET /expenses/1 with EXPENSE_PAGE_MAX rows through the
+test client with the response cache off, then decompresses and decodes the
+body with the dashboard's own decoder (frontend/wire.py). The first case is
+the row-shaped JSON the dashboard used to fetch. Arrow, MessagePack, brotli
+and zstd cases only run when their libraries are installed.
+
+Run from the backend directory:  python -m benchmarks.bench_wire
+"""
+import gzip
+import os
+import sys
+import time
+
+from benchmarks.common import bench_app, seed
+
+from app import EXPENSE_PAGE_MAX
+from serialization import JSON_MIMETYPE, brotli, columnar_mimetypes, content_codings, zstandard
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'frontend'))
+import wire  # noqa: E402
+
+app = bench_app(RESPONSE_CACHE_MAX_ENTRIES=0)
+
+ROWS = 100_000
+REPEAT = 20
+DECOMPRESS = {
+    None: lambda data: data,
+    'gzip': gzip.decompress,
+    'br': lambda data: brotli.decompress(data),
+    'zstd': lambda data: zstandard.ZstdDecompressor().decompress(data),
+}
+
+
+def best_of(fn):
+    best, result = float('inf'), None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    seed(ROWS)
+    client = app.test_client()
+    url = f'/expenses/1?limit={EXPENSE_PAGE_MAX}'
+    cases = [("rows", JSON_MIMETYPE, None)]
+    for mimetype in [JSON_MIMETYPE] + columnar_mimetypes():
+        for coding in [None] + content_codings():
+            cases.append(("columns", mimetype, coding))
+
+    print(f"{EXPENSE_PAGE_MAX}-row page of {ROWS} rows")
+    print(f"{'shape':>8} {'format':>36} {'coding':>7} {'bytes':>9} {'server (ms)':>12} {'decode (ms)':>12}")
+    for shape, mimetype, coding in cases:
+        headers = {'Accept': mimetype, 'Accept-Encoding': coding or 'identity'}
+        server, response = best_of(lambda: client.get(f'{url}&shape={shape}', headers=headers))
+        assert response.status_code == 200 and response.mimetype == mimetype, response.status
+        assert response.headers.get('Content-Encoding') == coding
+        body = response.get_data()
+        decode, payload = best_of(lambda: wire.decode(mimetype, DECOMPRESS[coding](body)))
+        assert len(payload["expenses"] if shape == "rows" else payload["ids"]) == EXPENSE_PAGE_MAX
+        print(f"{shape:>8} {mimetype:>36} {coding or 'none':>7} {len(body):>9} {server * 1000:>12.2f} "
+              f"{decode * 1000:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
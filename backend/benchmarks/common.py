@@ -0,0 +1,117 @@
+"""Shared setup for the benchmark scripts.
+
+Benchmarks run against a scratch SQLite file unless FINANCE_BENCH_DATABASE_URI
+points them at another database, e.g. a local PostgreSQL. seed() deletes every
+expense in that database.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+DATABASE_URI = os.environ.get('FINANCE_BENCH_DATABASE_URI', f'sqlite:///{DB_PATH}')
+
+CATEGORIES = ["Food", "Transport", "Entertainment", "Shopping", "Bills", "Health", "Other"]
+# Share of expenses in each category, and the median (paise) and spread of its log-normal amounts
+CATEGORY_WEIGHTS = [0.32, 0.18, 0.10, 0.14, 0.08, 0.06, 0.12]
+CATEGORY_MEDIANS = [25_000, 15_000, 60_000, 150_000, 250_000, 80_000, 40_000]
+CATEGORY_SIGMAS = [0.8, 0.7, 0.9, 1.1, 0.6, 1.0, 1.2]
+# Description words, drawn with Zipf-like weights so some are common and most are rare
+WORDS = ("lunch dinner coffee groceries taxi metro fuel movie concert rent electricity water internet phone "
+         "pharmacy doctor gym shoes shirt books gift snacks pizza biryani paneer chai bus train flight hotel "
+         "parking laundry haircut insurance repair furniture laptop headphones subscription donation").split()
+WORD_WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+# Monthly budget per category, in paise, set for every seeded user so writes check them
+CATEGORY_BUDGETS = [median * 40 for median in CATEGORY_MEDIANS]
+
+# Rows generated and inserted at a time, so memory use does not grow with the row count
+SEED_CHUNK = 50_000
+
+_app = None
+
+
+def bench_app(**config):
+    """The app under benchmark, created on first use with any config overrides."""
+    global _app
+    if _app is None:
+        from app import create_app
+        _app = create_app({'SQLALCHEMY_DATABASE_URI': DATABASE_URI, **config})
+    return _app
+
+
+def generate_expenses(rows, user_ids=(1,), start='2024-01-01', days=366, seed=42):
+    """Yield DataFrames of at most SEED_CHUNK random expenses, ``rows`` in total.
+
+    Categories follow CATEGORY_WEIGHTS with log-normal amounts around each
+    category's median; dates are uniform over ``days`` days from ``start``.
+    Rows go to ``user_ids`` with Zipf-like weights, so the first user has the
+    most history and later ones progressively less.
+    """
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS)
+    word_p = np.array(WORD_WEIGHTS) / sum(WORD_WEIGHTS)
+    descriptions = np.array([' '.join(rng.choice(words, size=rng.integers(1, 5), p=word_p)) for _ in range(1000)])
+    user_ids = np.asarray(user_ids)
+    user_p = 1 / np.arange(1, len(user_ids) + 1)
+    user_p /= user_p.sum()
+    medians, sigmas = np.log(CATEGORY_MEDIANS), np.array(CATEGORY_SIGMAS)
+
+    for offset in range(0, rows, SEED_CHUNK):
+        n = min(SEED_CHUNK, rows - offset)
+        category = rng.choice(len(CATEGORIES), size=n, p=CATEGORY_WEIGHTS)
+        amount = np.exp(rng.normal(medians[category], sigmas[category]))
+        yield pd.DataFrame({
+            "user_id": rng.choice(user_ids, size=n, p=user_p),
+            "date": np.datetime64(start, 'D') + rng.integers(0, days, size=n),
+            "category": np.array(CATEGORIES)[category],
+            "amount_paise": np.clip(amount, 100, 100_000_000).astype(np.int64),
+            "description": descriptions[rng.integers(0, len(descriptions), size=n)],
+        })
+
+
+def seed(rows, user_id=1, users=1):
+    """Replace all expenses with ``rows`` random ones for users ``user_id`` .. ``user_id + users - 1``.
+
+    Each user also gets CATEGORY_BUDGETS, and any earlier alerts are dropped.
+    """
+    from app import (
+        Alert, Budget, Expense, User, bump_data_versions, create_search_index, db, dialect_name, insert_expense_rows,
+        rebuild_category_totals, response_cache
+    )
+
+    user_ids = list(range(user_id, user_id + users))
+    with bench_app().app_context():
+        if dialect_name() == 'sqlite':
+            # Index the text once at the end rather than row by row through the FTS triggers
+            with db.engine.begin() as conn:
+                for trigger in ('expense_fts_insert', 'expense_fts_delete', 'expense_fts_update'):
+                    conn.execute(db.text(f"DROP TRIGGER IF EXISTS {trigger}"))
+                conn.execute(db.text("DROP TABLE IF EXISTS expense_fts"))
+        db.session.execute(db.delete(Expense))
+        db.session.execute(db.delete(Alert))
+        db.session.execute(db.delete(Budget))
+        existing = set(db.session.execute(db.select(User.id).where(User.id.in_(user_ids))).scalars())
+        db.session.add_all(User(id=uid, username=f'bench{uid}', password='bench')
+                           for uid in user_ids if uid not in existing)
+        db.session.flush()
+        if dialect_name() == 'postgresql':
+            # The ids above bypassed the sequence; move it past them so later registrations get free ids
+            db.session.execute(db.text(
+                "SELECT setval(pg_get_serial_sequence('\"user\"', 'id'), (SELECT MAX(id) FROM \"user\"))"))
+        db.session.execute(db.insert(Budget), [{"user_id": uid, "category": category, "limit_paise": limit}
+                                               for uid in user_ids
+                                               for category, limit in zip(CATEGORIES, CATEGORY_BUDGETS)])
+        versions = bump_data_versions(user_ids)
+        for chunk in generate_expenses(rows, user_ids):
+            chunk["date"] = chunk["date"].dt.date
+            chunk["version"] = chunk["user_id"].map(versions)
+            insert_expense_rows(chunk.to_dict("records"))
+        db.session.commit()
+        # Rows bypassed the write handlers, so refresh the materialized totals and the cache
+        rebuild_category_totals()
+        create_search_index()
+    for uid in user_ids:
+        response_cache.invalidate(uid)
@@ -0,0 +1,123 @@
+"""Closed-loop load generation through Flask test clients or over HTTP, and latency summaries.
+
+Each worker thread has its own client and issues requests back to back, so
+the offered load is ``threads`` requests in flight at all times.
+"""
+import http.client
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows; peak RSS is reported as null
+    resource = None
+
+# Untimed requests sent first, so connection setup and first-call costs stay out of the numbers
+WARMUP_REQUESTS = 10
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(latencies, errors, elapsed):
+    """p50/p95/p99 in ms and throughput in requests/s for one run."""
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _timed(request, client, rng, latencies, errors):
+    start = time.perf_counter()
+    status = request(client, rng)
+    latencies.append(time.perf_counter() - start)
+    if status >= 500:
+        errors.append(status)
+
+
+def sequential(app, request, count, seed=0):
+    """Issue ``count`` requests one at a time; request(client, rng) returns a status code."""
+    client, rng = app.test_client(), random.Random(seed)
+    latencies, errors = [], []
+    for _ in range(WARMUP_REQUESTS):
+        request(client, rng)
+    start = time.perf_counter()
+    for _ in range(count):
+        _timed(request, client, rng, latencies, errors)
+    return summarize(latencies, len(errors), time.perf_counter() - start)
+
+
+def concurrent(app, request, threads, duration, seed=0):
+    """Run ``threads`` workers issuing requests back to back for ``duration`` seconds."""
+    latencies, errors = [], []  # list.append is atomic, so the workers share them
+    deadline = time.perf_counter() + duration
+
+    def worker(n):
+        client, rng = app.test_client(), random.Random(seed + n)
+        while time.perf_counter() < deadline:
+            _timed(request, client, rng, latencies, errors)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return summarize(latencies, len(errors), time.perf_counter() - start)
+
+
+def http_concurrent(base_url, request, connections, duration, seed=0):
+    """concurrent() against a running server, one keep-alive connection per worker thread.
+
+    request(get, rng) returns a status code, where get(path) issues a GET and
+    returns its status. Connection failures count as errors.
+    """
+    url = urlsplit(base_url)
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+
+    def worker(n):
+        conn, rng = http.client.HTTPConnection(url.hostname, url.port, timeout=30), random.Random(seed + n)
+
+        def get(path):
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                return response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()  # reconnects on the next request
+                return 599
+
+        while time.perf_counter() < deadline:
+            _timed(request, get, rng, latencies, errors)
+        conn.close()
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(connections)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return summarize(latencies, len(errors), time.perf_counter() - start)
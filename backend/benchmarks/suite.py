@@ -0,0 +1,238 @@
+"""Benchmark suite: seed synthetic data, load the main endpoints, compare with a baseline.
+
+For each row count the suite runs in a fresh process, so every size gets its
+own scratch database and its own peak RSS. Each scenario is timed once with a
+single client issuing requests one at a time, and once under concurrent load
+from --threads clients. Results are written as JSON; with --baseline, p95
+latency, throughput and peak RSS are compared against an earlier run and any
+change worse than --tolerance is reported as a regression (exit status 1).
+--databases runs the same scenarios against each database in turn ("sqlite"
+for a scratch file, or a SQLAlchemy URI), so SQLite and PostgreSQL share one
+suite and each is compared with its own baseline runs.
+
+Run from the backend directory:
+    python -m benchmarks.suite --rows 1000 100000 --output results.json
+    python -m benchmarks.suite --rows 1000 100000 --baseline results.json
+    python -m benchmarks.suite --rows 100000 --databases sqlite postgresql+psycopg://localhost/finance_bench
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import time
+
+from benchmarks.common import CATEGORIES, DATABASE_URI, WORDS, bench_app, seed
+from benchmarks.load import concurrent, peak_rss_mb, sequential
+
+
+def scenarios(rows, users):
+    """Request functions by name; each takes (client, rng) and returns a status code."""
+    def user(rng):
+        return rng.randint(1, users)
+
+    def expenses_page(client, rng):
+        after = f"&after_date=2024-{rng.randint(1, 12):02d}-01&after_id={rng.randint(1, rows)}" \
+            if rng.random() < 0.5 else ""
+        return client.get(f'/expenses/{user(rng)}?limit=100{after}').status_code
+
+    def visualize(client, rng):
+        month = rng.randint(1, 12)
+        return client.get(f'/visualize/{user(rng)}?from=2024-{month:02d}-01').status_code
+
+    def timeseries(client, rng):
+        return client.get(f'/analytics/{user(rng)}/timeseries?freq={rng.choice("DWM")}').status_code
+
+    def search(client, rng):
+        return client.get(f'/expenses/{user(rng)}/search?q={rng.choice(WORDS)}').status_code
+
+    def add_expense(client, rng):
+        expense = {"user_id": user(rng), "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                   "category": rng.choice(CATEGORIES), "amount": round(rng.uniform(10, 5000), 2),
+                   "description": rng.choice(WORDS)}
+        return client.post('/expenses', json=expense).status_code
+
+    def bulk_insert(client, rng):
+        uid = user(rng)
+        expenses = [{"user_id": uid, "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                     "category": rng.choice(CATEGORIES), "amount": round(rng.uniform(10, 5000), 2)}
+                    for _ in range(100)]
+        return client.post('/expenses/bulk', json=expenses).status_code
+
+    reads = [expenses_page, visualize, timeseries, search]
+
+    def mixed(client, rng):
+        # Mostly reads, with enough writes to keep invalidating the response cache
+        return add_expense(client, rng) if rng.random() < 0.1 else rng.choice(reads)(client, rng)
+
+    return {fn.__name__: fn for fn in reads + [add_expense, bulk_insert, mixed]}
+
+
+def run_size(rows, args):
+    """Seed ``rows`` expenses and run every selected scenario; returns this size's results."""
+    config = {'RESPONSE_CACHE_MAX_ENTRIES': 0} if args.no_cache else {}
+    app = bench_app(**config)
+    app.logger.setLevel(logging.CRITICAL)  # failed requests are counted, not printed
+
+    start = time.perf_counter()
+    seed(rows, users=args.users)
+    result = {"database": dialect(DATABASE_URI), "rows": rows, "users": args.users,
+              "seed_seconds": round(time.perf_counter() - start, 2),
+              "scenarios": {}}
+    for name, request in scenarios(rows, args.users).items():
+        if args.scenarios and name not in args.scenarios:
+            continue
+        result["scenarios"][name] = {
+            "sequential": sequential(app, request, args.requests),
+            "concurrent": concurrent(app, request, args.threads, args.duration),
+        }
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def dialect(uri):
+    return uri.split(':', 1)[0]
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """List the measurements that got worse than the baseline by more than ``tolerance``."""
+    regressions = []
+    # Runs from before --databases carry the database in the environment
+    default = baseline["environment"].get("database")
+    previous_runs = {(run.get("database", default), run["rows"]): run for run in baseline["runs"]}
+
+    def check(label, value, before, higher_is_worse):
+        if value is None or not before:
+            return
+        change = (value - before) / before
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append(f"{label}: {before} -> {value} ({change:+.0%})")
+
+    for run in results["runs"]:
+        previous = previous_runs.get((run["database"], run["rows"]))
+        if previous is None:
+            continue
+        prefix = f"{run['database']} {run['rows']} rows"
+        check(f"{prefix} peak_rss_mb", run["peak_rss_mb"], previous.get("peak_rss_mb"), True)
+        for name, modes in run["scenarios"].items():
+            for mode, stats in modes.items():
+                before = previous["scenarios"].get(name, {}).get(mode)
+                if before is None:
+                    continue
+                label = f"{prefix} {name} {mode}"
+                check(f"{label} p95_ms", stats["p95_ms"], before["p95_ms"], True)
+                check(f"{label} throughput_rps", stats["throughput_rps"], before["throughput_rps"], False)
+    return regressions
+
+
+def print_table(results):
+    print(f"{'database':>20} {'rows':>10} {'scenario':>14} {'mode':>10} {'req/s':>8} {'p50 (ms)':>9} "
+          f"{'p95 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}", file=sys.stderr)
+    for run in results["runs"]:
+        for name, modes in run["scenarios"].items():
+            for mode, stats in modes.items():
+                print(f"{run['database']:>20} {run['rows']:>10} {name:>14} {mode:>10} "
+                      f"{stats['throughput_rps']:>8.0f} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+                      f"{stats['p99_ms']:>9.1f} {stats['errors']:>7}", file=sys.stderr)
+        print(f"{run['database']:>20} {run['rows']:>10} rows: seeded in {run['seed_seconds']}s, "
+              f"peak RSS {run['peak_rss_mb']} MB", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000],
+                        help="expense counts to benchmark, each in its own process (1k to 10M)")
+    parser.add_argument('--databases', nargs='+',
+                        default=[os.environ.get('FINANCE_BENCH_DATABASE_URI', 'sqlite')],
+                        help="databases to run against: 'sqlite' for a scratch file, or SQLAlchemy URIs "
+                             "(default: FINANCE_BENCH_DATABASE_URI or scratch SQLite)")
+    parser.add_argument('--users', type=int, default=50, help="users the rows are spread across")
+    parser.add_argument('--scenarios', nargs='+', help="run only these scenarios")
+    parser.add_argument('--requests', type=int, default=200, help="requests per sequential run")
+    parser.add_argument('--threads', type=int, default=8, help="clients in each concurrent run")
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per concurrent run")
+    parser.add_argument('--no-cache', action='store_true', help="disable the response cache")
+    parser.add_argument('--output', help="write the JSON results here instead of stdout")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="relative change beyond which a measurement counts as a regression")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def settings(args):
+    return {"users": args.users, "requests": args.requests, "threads": args.threads, "duration": args.duration,
+            "response_cache": not args.no_cache}
+
+
+def strip_option(argv, *names):
+    """Drop ``names`` and their values from an argument list."""
+    kept, skipping = [], False
+    for arg in argv:
+        if arg.startswith('--'):
+            skipping = arg.split('=', 1)[0] in names
+        if not skipping:
+            kept.append(arg)
+    return kept
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        json.dump(run_size(args.rows[0], args), sys.stdout)
+        return 0
+
+    runs = []
+    for database in args.databases:
+        env = dict(os.environ)
+        if database == 'sqlite':
+            env.pop('FINANCE_BENCH_DATABASE_URI', None)
+        else:
+            env['FINANCE_BENCH_DATABASE_URI'] = database
+        for rows in args.rows:
+            command = [sys.executable, '-m', 'benchmarks.suite', '--child', '--rows', str(rows)]
+            command += strip_option(sys.argv[1:], '--rows', '--output', '--baseline', '--databases')
+            print(f"benchmarking {rows} rows on {dialect(database)}...", file=sys.stderr)
+            runs.append(json.loads(subprocess.run(command, check=True, capture_output=True, text=True,
+                                                  env=env).stdout))
+    results = {"environment": environment(), "settings": settings(args), "runs": runs}
+
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""In-process LRU + TTL cache for serialized per-user responses."""
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Bounded LRU cache of values keyed by (user_id, key), with a TTL and per-user invalidation.
+
+    Each user has a generation number that invalidate() bumps. Callers read it
+    with generation() before computing a value and pass it to set(), so a value
+    computed from data that changed in the meantime is never stored.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # (user_id, key) -> (expires_at, value), least recently used first
+        self._user_keys = {}  # user_id -> set of cached keys
+        self._generations = {}  # user_id -> invalidation counter
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def generation(self, user_id):
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, user_id, key):
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                self._remove(user_id, key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self.hits += 1
+            return value
+
+    def set(self, user_id, key, value, generation):
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self._remove(user_id, key)
+            self._entries[(user_id, key)] = (self.clock() + self.ttl, value)
+            self._user_keys.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                (old_user, old_key), _ = self._entries.popitem(last=False)
+                self._discard_key(old_user, old_key)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            keys = self._user_keys.pop(user_id, ())
+            for key in keys:
+                del self._entries[(user_id, key)]
+            self.invalidations += len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, user_id, key):
+        if self._entries.pop((user_id, key), None) is not None:
+            self._discard_key(user_id, key)
+
+    def _discard_key(self, user_id, key):
+        keys = self._user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[user_id]
@@ -0,0 +1,156 @@
+"""Response encodings: JSON providers, binary columnar bodies and content-coding compression.
+
+The JSON providers use orjson when it is installed and the standard library
+otherwise; both write dates as ISO 8601 strings, so routes can hand result
+rows to jsonify() without converting each date themselves. Arrow IPC and
+MessagePack bodies, and brotli and zstd compression, are offered only when
+their libraries are installed; gzip is always available.
+"""
+import datetime
+import gzip
+import json
+import zlib
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; StdlibJSONProvider is used without it
+    orjson = None
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # optional; no Arrow responses without it
+    pyarrow = None
+try:
+    import msgpack
+except ImportError:  # optional; no MessagePack responses without it
+    msgpack = None
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+JSON_MIMETYPE = 'application/json'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+def _default(value):
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if hasattr(value, 'tolist'):  # numpy arrays and scalars
+        return value.tolist()
+    return DefaultJSONProvider.default(value)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider, with ISO dates instead of HTTP dates."""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serializes with orjson: compact, keys in insertion order, UTF-8 rather than escapes."""
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:  # json.dumps options orjson does not take, e.g. indent
+            return super().dumps(obj, default=_default, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s) if not kwargs else super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self.options | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def json_provider_class(name):
+    """Provider for the JSON_PROVIDER setting: 'orjson', 'stdlib', or 'auto' for orjson if installed."""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name == 'orjson' and orjson is None:
+        raise ValueError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+    return {'orjson': OrjsonProvider, 'stdlib': StdlibJSONProvider}[name]
+
+
+def columnar_mimetypes():
+    """Binary formats for columnar bodies that this install can write, most preferred first."""
+    return [mimetype for mimetype, library in ((ARROW_MIMETYPE, pyarrow), (MSGPACK_MIMETYPE, msgpack))
+            if library is not None]
+
+
+def encode_columns(body, mimetype, arrow_types=None):
+    """Encode a columnar body as Arrow or MessagePack.
+
+    For Arrow, list-valued fields become the columns of one record batch and
+    the remaining fields are stored as JSON in the schema metadata.
+    ``arrow_types`` maps column names to 'date32' (ISO date strings) or
+    'dictionary' (strings with few distinct values).
+    """
+    if mimetype == MSGPACK_MIMETYPE:
+        return msgpack.packb(body, default=_default)
+    arrays, names, metadata = [], [], {}
+    for name, value in body.items():
+        if not isinstance(value, (list, tuple, np.ndarray)):
+            metadata[name] = json.dumps(value, default=_default)
+            continue
+        array = pyarrow.array(value)
+        kind = (arrow_types or {}).get(name)
+        if kind == 'date32':
+            array = array.cast(pyarrow.date32())
+        elif kind == 'dictionary':
+            array = array.dictionary_encode()
+        arrays.append(array)
+        names.append(name)
+    batch = pyarrow.RecordBatch.from_arrays(arrays, names=names).replace_schema_metadata(metadata)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+# Compression levels for dynamic responses: close to the best ratio each coding gets cheaply
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+def content_codings():
+    """Content codings this install can produce, most preferred first."""
+    return [coding for coding, available in (('zstd', zstandard), ('br', brotli), ('gzip', True)) if available]
+
+
+def compress(data, coding):
+    if coding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if coding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, coding):
+    """Compress an iterable of byte chunks as it is consumed, for streamed responses."""
+    if coding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        process, finish = compressor.compress, compressor.flush
+    elif coding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+        process, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
@@ -0,0 +1,108 @@
+"""Fixtures for the backend tests: an app on a fresh database per test.
+
+Every test runs against a scratch SQLite file. FINANCE_TEST_DATABASE_URIS
+adds more databases, space-separated, e.g. a local PostgreSQL through each of
+its drivers; each test drops every table in them before it starts.
+"""
+import os
+
+import pytest
+from sqlalchemy.engine import make_url
+
+from app import CategoryStats, CategoryTotal, User, create_app, db, init_db, login_cache, response_cache
+
+TEST_DATABASE_URIS = os.environ.get('FINANCE_TEST_DATABASE_URIS', '').split()
+
+
+def database_params():
+    params = [pytest.param('sqlite', id='sqlite')]
+    params += [pytest.param(uri, id=make_url(uri).drivername) for uri in TEST_DATABASE_URIS]
+    if not any(make_url(uri).get_backend_name() == 'postgresql' for uri in TEST_DATABASE_URIS):
+        params.append(pytest.param(None, id='postgresql', marks=pytest.mark.skip(
+            reason='set FINANCE_TEST_DATABASE_URIS to a scratch PostgreSQL database')))
+    return params
+
+
+@pytest.fixture(params=database_params())
+def database_uri(request, tmp_path):
+    if request.param == 'sqlite':
+        return f"sqlite:///{tmp_path / 'finance.db'}"
+    return request.param
+
+
+@pytest.fixture
+def app(database_uri):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, 'AUTO_INIT_DB': False})
+    with app.app_context():
+        db.drop_all()
+        init_db()
+    yield app
+    with app.app_context():
+        # The caches are process-wide and keyed by ids and versions the next test's database reuses
+        for user_id, username in db.session.execute(db.select(User.id, User.username)):
+            response_cache.invalidate(user_id)
+            login_cache.invalidate(username)
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def dialect(app):
+    with app.app_context():
+        return db.engine.dialect.name
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def add_user(app):
+    """Factory storing a user directly, without the password hash of /register; returns the new id."""
+    def add_user(username, password='secret'):
+        with app.app_context():
+            user = User(username=username, password=password)
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    return add_user
+
+
+@pytest.fixture
+def user_id(add_user):
+    return add_user('alice')
+
+
+@pytest.fixture
+def category_totals(app):
+    """Function reading a user's category_totals as {(category, month): (total_paise, count)}, empty rows left out."""
+    def category_totals(user_id):
+        with app.app_context():
+            rows = db.session.execute(
+                db.select(CategoryTotal.category, CategoryTotal.month, CategoryTotal.total_paise, CategoryTotal.count)
+                .where(CategoryTotal.user_id == user_id, CategoryTotal.count != 0))
+            return {(category, month): (total_paise, count) for category, month, total_paise, count in rows}
+    return category_totals
+
+
+@pytest.fixture
+def category_stats(app):
+    """Function reading a user's category_stats as {category: (count, mean_paise)}, empty rows left out."""
+    def category_stats(user_id):
+        with app.app_context():
+            rows = db.session.execute(
+                db.select(CategoryStats.category, CategoryStats.count, CategoryStats.mean_paise)
+                .where(CategoryStats.user_id == user_id, CategoryStats.count != 0))
+            return {category: (count, pytest.approx(mean_paise)) for category, count, mean_paise in rows}
+    return category_stats
+
+
+@pytest.fixture
+def verify_totals(app):
+    """Function asserting that `rebuild-totals --verify` finds category_totals and category_stats in sync."""
+    def verify_totals():
+        result = app.test_cli_runner().invoke(args=['rebuild-totals', '--verify'])
+        assert result.exit_code == 0, result.output
+        assert '0 drifted row(s)' in result.output, result.output
+    return verify_totals
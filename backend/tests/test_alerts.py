@@ -0,0 +1,91 @@
+"""Budgets and the budget and anomaly alerts raised by the write handlers."""
+
+
+def add(client, user_id, date, category, amount):
+    return client.post('/expenses', json={"user_id": user_id, "date": date, "category": category, "amount": amount,
+                                          "description": ""})
+
+
+def alerts(client, user_id, month='2024-03'):
+    return client.get(f'/alerts/{user_id}?month={month}&limit=50').get_json()
+
+
+def test_budgets_round_trip(client, user_id):
+    assert client.put(f'/budgets/{user_id}', json={"Food": 1000, "Rent": 25000.5}).status_code == 200
+    assert client.put(f'/budgets/{user_id}', json={"Rent": None}).status_code == 200
+    assert client.get(f'/budgets/{user_id}').get_json() == {"budgets": {"Food": 1000.0}}
+
+    assert client.put(f'/budgets/{user_id}', json={"Food": -5}).status_code == 400
+    assert client.put(f'/budgets/{user_id + 100}', json={"Food": 5}).status_code == 400
+
+
+def test_crossing_a_budget_raises_one_alert_per_threshold(client, user_id):
+    client.put(f'/budgets/{user_id}', json={"Food": 1000})
+    add(client, user_id, '2024-03-01', 'Food', 700)
+    add(client, user_id, '2024-03-02', 'Food', 150)  # 85%
+    add(client, user_id, '2024-03-03', 'Food', 10)   # still 86%
+    add(client, user_id, '2024-03-04', 'Food', 200)  # 106%
+
+    body = alerts(client, user_id)
+    assert [(alert['kind'], alert['amount']) for alert in body['alerts']] == [('budget', 1060.0), ('budget', 850.0)]
+    assert body['budgets'] == [{"category": 'Food', "limit": 1000.0, "spent": 1060.0, "used": 1.06}]
+    assert alerts(client, user_id, '2024-04')['budgets'][0]['spent'] == 0
+
+
+def test_bulk_add_checks_budgets_and_scores_anomalies(client, user_id):
+    client.put(f'/budgets/{user_id}', json={"Food": 1000})
+    steady = [{"user_id": user_id, "date": f'2024-02-{day:02d}', "category": 'Food', "amount": 20 + day % 3}
+              for day in range(1, 13)]
+    client.post('/expenses/bulk', json=steady)
+    assert alerts(client, user_id)['alerts'] == []
+
+    response = client.post('/expenses/bulk', json=[
+        {"user_id": user_id, "date": '2024-03-01', "category": 'Food', "amount": 900},
+        {"user_id": user_id, "date": '2024-03-02', "category": 'Food', "amount": 21},
+    ])
+    assert response.status_code == 201
+
+    kinds = sorted(alert['kind'] for alert in alerts(client, user_id)['alerts'])
+    assert kinds == ['anomaly', 'budget']
+
+
+def test_anomaly_alert_names_the_expense(client, user_id):
+    for day in range(1, 13):
+        add(client, user_id, f'2024-03-{day:02d}', 'Transport', 100 + day % 4)
+    outlier = add(client, user_id, '2024-03-20', 'Transport', 2500).get_json()['id']
+
+    body = alerts(client, user_id)
+    assert [(alert['kind'], alert['expense_id']) for alert in body['alerts']] == [('anomaly', outlier)]
+    assert body['alerts'][0]['score'] > 3
+    assert body['stats'][0]['count'] == 13
+
+
+def test_updates_raise_alerts_on_what_they_add(client, user_id):
+    client.put(f'/budgets/{user_id}', json={"Food": 1000})
+    ids = [add(client, user_id, f'2024-03-{day:02d}', 'Food', 50 + day % 3).get_json()['id'] for day in range(1, 13)]
+
+    # Raising one expense past both the budget's 80% mark and the category's usual amounts
+    client.put(f'/expenses/{ids[0]}', json={"amount": 400})
+    assert sorted((alert['kind'], alert['expense_id']) for alert in alerts(client, user_id)['alerts']) == \
+        [('anomaly', ids[0]), ('budget', None)]
+
+    # Lowering it again adds nothing, however the month's total moves
+    client.put(f'/expenses/{ids[0]}', json={"amount": 51})
+    assert len(alerts(client, user_id)['alerts']) == 2
+
+    # Moving spending into an untouched month checks that month's budget
+    client.patch('/expenses/bulk', json={"ids": ids[1:], "set": {"date": '2024-04-15', "amount": 80}})
+    assert [(alert['kind'], alert['month']) for alert in alerts(client, user_id)['alerts']][0] == ('budget', '2024-04')
+
+
+def test_alerts_etag_changes_with_budgets(client, user_id):
+    add(client, user_id, '2024-03-01', 'Food', 10)
+    first = client.get(f'/alerts/{user_id}?month=2024-03')
+    assert client.get(f'/alerts/{user_id}?month=2024-03',
+                      headers={"If-None-Match": first.headers['ETag']}).status_code == 304
+
+    client.put(f'/budgets/{user_id}', json={"Food": 100})
+    second = client.get(f'/alerts/{user_id}?month=2024-03', headers={"If-None-Match": first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.get_json()['budgets'][0]['used'] == 0.1
+    assert client.get(f'/alerts/{user_id}?month=March').status_code == 400
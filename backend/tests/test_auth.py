@@ -0,0 +1,49 @@
+"""Registration, login and the session tokens that scope writes to their user."""
+import pytest
+
+from app import User, db
+
+
+def test_register_and_login(app, client):
+    assert client.post('/register', json={"username": 'carol', "password": 'pw-1'}).status_code == 201
+    assert client.post('/register', json={"username": 'carol', "password": 'other'}).status_code == 400
+    with app.app_context():
+        stored = db.session.execute(db.select(User.password).where(User.username == 'carol')).scalar()
+    assert stored.startswith('scrypt$')
+
+    response = client.post('/login', json={"username": 'carol', "password": 'pw-1'})
+    assert response.status_code == 200
+    assert response.get_json()['token'].startswith(f"{response.get_json()['user_id']}.")
+
+
+@pytest.mark.parametrize('credentials', [
+    {"username": 'carol', "password": 'wrong'},
+    {"username": 'nobody', "password": 'pw-1'},
+    {"username": ['carol'], "password": 'pw-1'},
+    {"username": 'carol'},
+])
+def test_login_refuses_bad_credentials_alike(client, credentials):
+    client.post('/register', json={"username": 'carol', "password": 'pw-1'})
+    response = client.post('/login', json=credentials)
+    assert (response.status_code, response.get_json()) == (401, {"error": "Invalid username or password"})
+
+
+def test_legacy_plaintext_password_is_rehashed(app, client, add_user):
+    add_user('dave', 'plain-old')
+    assert client.post('/login', json={"username": 'dave', "password": 'plain-old'}).status_code == 200
+    with app.app_context():
+        stored = db.session.execute(db.select(User.password).where(User.username == 'dave')).scalar()
+    assert stored.startswith('scrypt$')
+
+
+def test_token_scopes_writes_to_its_user(client, add_user):
+    other = add_user('erin')
+    client.post('/register', json={"username": 'carol', "password": 'pw-1'})
+    login = client.post('/login', json={"username": 'carol', "password": 'pw-1'}).get_json()
+    headers = {"Authorization": f"Bearer {login['token']}"}
+    expense = {"date": '2024-03-01', "category": 'Food', "amount": 10}
+
+    assert client.post('/expenses', json=expense, headers=headers).status_code == 201
+    assert client.post('/expenses', json={**expense, "user_id": other}, headers=headers).status_code == 403
+    assert client.get(f'/expenses/{other}', headers=headers).status_code == 403
+    assert client.get(f"/expenses/{login['user_id']}", headers={"Authorization": "Bearer forged"}).status_code == 401
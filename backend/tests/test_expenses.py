@@ -0,0 +1,149 @@
+"""Expense write handlers and the category_totals / category_stats rows they keep current."""
+import io
+
+import pytest
+
+
+def add(client, user_id, date, category, amount, **fields):
+    return client.post('/expenses', json={"user_id": user_id, "date": date, "category": category, "amount": amount,
+                                          "description": "", **fields})
+
+
+def test_add_expense_updates_totals_and_stats(client, user_id, category_totals, category_stats, verify_totals):
+    assert add(client, user_id, '2024-03-05', 'Food', 120.5).status_code == 201
+    assert add(client, user_id, '2024-03-20', 'Food', 79.5).status_code == 201
+    assert add(client, user_id, '2024-04-01', 'Bills', 1000).status_code == 201
+
+    assert category_totals(user_id) == {('Food', '2024-03'): (20_000, 2), ('Bills', '2024-04'): (100_000, 1)}
+    assert category_stats(user_id) == {'Food': (2, 10_000), 'Bills': (1, 100_000)}
+    verify_totals()
+
+
+@pytest.mark.parametrize('user_field', [1.7, True, '1', [1]])
+def test_add_expense_rejects_non_integer_user_id(client, user_id, user_field):
+    assert add(client, user_field, '2024-03-05', 'Food', 10).status_code == 400
+
+
+@pytest.mark.parametrize('fields', [
+    {"amount": "ten"},
+    {"date": "05/03/2024"},
+    {"category": ["Food"]},
+    {"description": {"note": "lunch"}},
+])
+def test_add_expense_rejects_invalid_fields(client, user_id, category_totals, fields):
+    body = {"user_id": user_id, "date": '2024-03-05', "category": 'Food', "amount": 10, **fields}
+    assert client.post('/expenses', json=body).status_code == 400
+    assert category_totals(user_id) == {}
+
+
+def test_add_expense_retry_returns_the_stored_expense(client, user_id, category_totals):
+    first = add(client, user_id, '2024-03-05', 'Food', 10, client_id='outbox-1')
+    retry = add(client, user_id, '2024-03-05', 'Food', 10, client_id='outbox-1')
+
+    assert (first.status_code, retry.status_code) == (201, 200)
+    assert retry.get_json()['id'] == first.get_json()['id']
+    assert category_totals(user_id) == {('Food', '2024-03'): (1000, 1)}
+
+
+def test_bulk_json_inserts_valid_rows_and_reports_the_rest(client, user_id, category_totals, category_stats,
+                                                           verify_totals):
+    rows = [
+        {"user_id": user_id, "date": '2024-01-10', "category": 'Food', "amount": 12.25, "description": 'lunch'},
+        {"user_id": user_id, "date": '2024-01-11', "category": 'Food', "amount": 7.75, "description": 'tea'},
+        {"user_id": user_id, "date": 'not a date', "category": 'Food', "amount": 1},
+        {"user_id": user_id, "date": '2024-02-01', "category": 'Travel', "amount": 'x'},
+        {"user_id": user_id, "date": '2024-02-02', "category": 'Travel', "amount": 300, "description": ['nested']},
+    ]
+    response = client.post('/expenses/bulk', json=rows)
+
+    body = response.get_json()
+    assert response.status_code == 201, body
+    assert body['inserted'] == 2
+    assert [error['row'] for error in body['errors']] == [2, 3, 4]
+    assert category_totals(user_id) == {('Food', '2024-01'): (2000, 2)}
+    assert category_stats(user_id) == {'Food': (2, 1000)}
+    verify_totals()
+
+
+def test_bulk_csv_upload(client, user_id, category_totals, verify_totals):
+    # On PostgreSQL the rows go in through COPY, so the text needs its tabs, newlines and backslashes escaped
+    upload = 'date,category,amount,description\n' \
+             '2024-05-01,Food,10.10,"tab\there"\n' \
+             '2024-05-02,Food,20.20,"two\nlines"\n' \
+             '2024-05-03,Rent,500,back\\slash\n'
+    response = client.post('/expenses/bulk', data={
+        "user_id": str(user_id), "file": (io.BytesIO(upload.encode()), 'expenses.csv')})
+
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()['inserted'] == 3
+    assert category_totals(user_id) == {('Food', '2024-05'): (3030, 2), ('Rent', '2024-05'): (50_000, 1)}
+    descriptions = client.get(f'/expenses/{user_id}').get_json()['expenses']
+    assert sorted(expense['description'] for expense in descriptions) == ['back\\slash', 'tab\there', 'two\nlines']
+    verify_totals()
+
+
+def test_bulk_replay_skips_stored_client_ids(client, user_id, category_totals):
+    rows = [{"user_id": user_id, "date": '2024-01-10', "category": 'Food', "amount": 5, "client_id": f'c{i}'}
+            for i in range(3)]
+    assert client.post('/expenses/bulk', json=rows[:2]).status_code == 201
+
+    response = client.post('/expenses/bulk', json=rows)
+    assert response.status_code == 201
+    assert (response.get_json()['inserted'], response.get_json()['skipped']) == (1, 2)
+    assert client.post('/expenses/bulk', json=rows).status_code == 200
+    assert category_totals(user_id) == {('Food', '2024-01'): (1500, 3)}
+
+
+def test_update_moves_totals_and_stats(client, user_id, category_totals, category_stats, verify_totals):
+    expense_id = add(client, user_id, '2024-03-05', 'Food', 10).get_json()['id']
+    add(client, user_id, '2024-03-06', 'Food', 30)
+
+    assert client.put(f'/expenses/{expense_id}', json={"amount": 50, "date": '2024-04-01', "category": 'Bills'}) \
+        .status_code == 200
+    assert category_totals(user_id) == {('Food', '2024-03'): (3000, 1), ('Bills', '2024-04'): (5000, 1)}
+    assert category_stats(user_id) == {'Food': (1, 3000), 'Bills': (1, 5000)}
+    assert client.put(f'/expenses/{expense_id}', json={"description": ['x']}).status_code == 400
+    assert client.put(f'/expenses/{expense_id + 100}', json={"amount": 1}).status_code == 404
+    verify_totals()
+
+
+def test_bulk_update_by_filter(client, user_id, add_user, category_totals, category_stats, verify_totals):
+    other = add_user('bob')
+    for day in (1, 2, 3):
+        add(client, user_id, f'2024-03-0{day}', 'Food', day)
+    add(client, other, '2024-03-01', 'Food', 1)
+
+    response = client.patch('/expenses/bulk', json={
+        "filter": {"user_id": user_id, "category": 'Food', "from": '2024-03-02'}, "set": {"category": 'Groceries'}})
+
+    assert response.get_json()['updated'] == 2
+    assert category_totals(user_id) == {('Food', '2024-03'): (100, 1), ('Groceries', '2024-03'): (500, 2)}
+    assert category_stats(user_id) == {'Food': (1, 100), 'Groceries': (2, 250)}
+    assert category_totals(other) == {('Food', '2024-03'): (100, 1)}
+    verify_totals()
+
+
+def test_deletes_leave_tombstones_for_sync(client, user_id, category_totals, category_stats, verify_totals):
+    ids = [add(client, user_id, f'2024-03-0{day}', 'Food', day).get_json()['id'] for day in (1, 2, 3, 4)]
+    version = client.get(f'/expenses/{user_id}/changes').get_json()['version']
+
+    assert client.delete(f'/expenses/{ids[0]}').status_code == 200
+    assert client.delete(f'/expenses/{ids[0]}').status_code == 404
+    assert client.delete('/expenses/bulk', json={"ids": ids[1:3]}).get_json()['deleted'] == 2
+
+    changes = client.get(f'/expenses/{user_id}/changes?since={version}').get_json()
+    assert not changes['full']
+    assert sorted(changes['deleted']) == ids[:3]
+    assert category_totals(user_id) == {('Food', '2024-03'): (400, 1)}
+    assert category_stats(user_id) == {'Food': (1, 400)}
+    verify_totals()
+
+
+def test_large_amounts_sum_exactly(client, user_id, category_totals, verify_totals):
+    # Totals past 2**31 paise need 64-bit columns on PostgreSQL
+    for _ in range(3):
+        assert add(client, user_id, '2024-03-05', 'Property', 10_000_000).status_code == 201
+
+    assert category_totals(user_id) == {('Property', '2024-03'): (3_000_000_000, 3)}
+    assert client.get(f'/visualize/{user_id}').get_json()['amounts'] == [30_000_000]
+    verify_totals()
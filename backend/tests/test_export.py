@@ -0,0 +1,71 @@
+"""Streaming exports keep peak memory flat as a user's history grows."""
+import datetime
+import tracemalloc
+
+import pytest
+
+from app import EXPORT_COLUMNS, bump_data_versions, db, insert_expense_rows
+
+CATEGORIES = ["Food", "Transport", "Bills", "Health", "Other"]
+BASELINE_ROWS = 5_000
+# Allowed ratio of the export's peak traced memory to the peak for BASELINE_ROWS
+MAX_PEAK_GROWTH = 2
+SEED_CHUNK = 50_000
+
+
+def seed_expenses(app, user_id, rows):
+    with app.app_context():
+        version = bump_data_versions([user_id])[user_id]
+        start = datetime.date(2024, 1, 1)
+        for offset in range(0, rows, SEED_CHUNK):
+            insert_expense_rows([
+                {"user_id": user_id, "date": start + datetime.timedelta(days=row % 366),
+                 "category": CATEGORIES[row % len(CATEGORIES)], "amount_paise": 100 + row % 100_000,
+                 "description": f"expense {row}", "version": version, "client_id": None}
+                for row in range(offset, min(offset + SEED_CHUNK, rows))
+            ])
+        db.session.commit()
+
+
+def export_peak(client, user_id, export_format):
+    """Stream one export, returning its line count and the peak traced memory while it ran."""
+    tracemalloc.start()
+    try:
+        response = client.get(f'/expenses/{user_id}/export?format={export_format}', buffered=False)
+        assert response.status_code == 200
+        lines = 0
+        for chunk in response.response:
+            lines += chunk.count(b'\n' if isinstance(chunk, bytes) else '\n')
+        response.close()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return lines, peak
+
+
+@pytest.mark.parametrize('rows', [50_000, pytest.param(1_000_000, marks=pytest.mark.large)])
+def test_export_memory_stays_flat(app, client, add_user, rows):
+    small, large = add_user('small'), add_user('large')
+    seed_expenses(app, small, BASELINE_ROWS)
+    seed_expenses(app, large, rows)
+
+    for export_format, header_lines in (('ndjson', 0), ('csv', 1)):
+        lines, baseline_peak = export_peak(client, small, export_format)
+        assert lines == BASELINE_ROWS + header_lines
+        lines, peak = export_peak(client, large, export_format)
+        assert lines == rows + header_lines
+        assert peak <= MAX_PEAK_GROWTH * baseline_peak, \
+            f"{export_format} export of {rows} rows peaked at {peak / baseline_peak:.1f}x the {BASELINE_ROWS}-row export"
+
+
+def test_export_rows(app, client, add_user):
+    user_id = add_user('exporter')
+    seed_expenses(app, user_id, 3)
+
+    response = client.get(f'/expenses/{user_id}/export?format=csv')
+    assert response.headers['Content-Disposition'] == f'attachment; filename=expenses_{user_id}.csv'
+    header, first = response.get_data(as_text=True).splitlines()[:2]
+    assert header.split(',') == EXPORT_COLUMNS
+    assert first.split(',')[1:] == ['2024-01-01', 'Food', '1.0', 'expense 0']
+
+    assert client.get(f'/expenses/{user_id}/export?format=xml').status_code == 400
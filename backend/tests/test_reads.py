@@ -0,0 +1,115 @@
+"""Read routes, including the SQL that differs between SQLite and PostgreSQL."""
+import pytest
+
+
+@pytest.fixture
+def expenses(client, user_id):
+    rows = [
+        ('2024-01-31', 'Food', 100, 'paneer tikka dinner'),
+        ('2024-02-01', 'Food', 50, 'coffee beans'),
+        ('2024-02-06', 'Transport', 200, 'metro card'),
+        ('2024-03-04', 'Food', 25.5, 'coffee and cake'),
+        ('2024-03-06', 'Bills', 999, "o'neill's broadband"),
+    ]
+    response = client.post('/expenses/bulk', json=[
+        {"user_id": user_id, "date": date, "category": category, "amount": amount, "description": description}
+        for date, category, amount, description in rows])
+    assert response.status_code == 201
+    return rows
+
+
+def test_visualize_sums_per_category(client, user_id, expenses):
+    body = client.get(f'/visualize/{user_id}').get_json()
+    assert dict(zip(body['categories'], body['amounts'])) == {'Food': 175.5, 'Transport': 200.0, 'Bills': 999.0}
+
+    body = client.get(f'/visualize/{user_id}?from=2024-02-01&to=2024-02-29&category=Food').get_json()
+    assert dict(zip(body['categories'], body['amounts'])) == {'Food': 50.0}
+    assert client.get(f'/visualize/{user_id}?from=2030-01-01').status_code == 404
+
+
+@pytest.mark.parametrize('query, periods', [
+    # Whole history from category_totals
+    ('freq=M', ['2024-01', '2024-02', '2024-03']),
+    # Month labels computed in SQL (strftime or to_char)
+    ('freq=M&from=2024-02-01', ['2024-02', '2024-03']),
+    # Weeks labelled by their Monday (date() modifiers or date_trunc)
+    ('freq=W&to=2024-02-29', ['2024-01-29', '2024-02-05']),
+    ('freq=D&from=2024-03-04&to=2024-03-06', ['2024-03-04', '2024-03-05', '2024-03-06']),
+])
+def test_timeseries_periods(client, user_id, expenses, query, periods):
+    body = client.get(f'/analytics/{user_id}/timeseries?{query}').get_json()
+    assert body['periods'] == periods
+
+
+def test_timeseries_amounts(client, user_id, expenses):
+    body = client.get(f'/analytics/{user_id}/timeseries?freq=W&to=2024-02-29&window=2').get_json()
+    assert body['categories'] == ['Food', 'Transport']
+    assert body['amounts'] == [[150.0, 0.0], [0.0, 200.0]]
+    assert body['totals'] == [150.0, 200.0]
+    assert body['rolling_mean'] == [[150.0, 75.0], [0.0, 100.0]]
+    assert body['delta'] == [[None, -150.0], [None, 200.0]]
+    assert client.get(f'/analytics/{user_id}/timeseries?freq=Y').status_code == 400
+
+
+def search(client, user_id, query):
+    return client.get(f'/expenses/{user_id}/search?{query}').get_json()
+
+
+def test_search_matches_word_prefixes(client, user_id, expenses):
+    assert {expense['description'] for expense in search(client, user_id, 'q=coff')['expenses']} == \
+        {'coffee beans', 'coffee and cake'}
+    # Every word must match
+    assert [expense['description'] for expense in search(client, user_id, 'q=coffee+ca')['expenses']] == \
+        ['coffee and cake']
+    # Categories are searched too, and quotes are only text
+    assert [expense['category'] for expense in search(client, user_id, 'q=transp')['expenses']] == ['Transport']
+    assert [expense['amount'] for expense in search(client, user_id, "q=o'neill's")['expenses']] == [999.0]
+    assert search(client, user_id, 'q=nothing+like+this')['expenses'] == []
+
+
+def test_search_filters_and_pages(client, user_id, expenses):
+    body = search(client, user_id, 'category=Food&min=30&limit=1')
+    assert [expense['date'] for expense in body['expenses']] == ['2024-02-01']
+    assert body['next_offset'] == 1
+    body = search(client, user_id, 'category=Food&min=30&limit=1&offset=1')
+    assert [expense['date'] for expense in body['expenses']] == ['2024-01-31']
+    assert body['next_offset'] is None
+
+    body = search(client, user_id, 'q=coffee&from=2024-03-01&shape=columns')
+    assert body['amounts'] == [25.5]
+    assert client.get(f'/expenses/{user_id}/search?min=lots').status_code == 400
+
+
+def test_expense_pages_follow_the_cursor(client, user_id, expenses):
+    seen = []
+    page = client.get(f'/expenses/{user_id}?limit=2').get_json()
+    while True:
+        seen += [expense['date'] for expense in page['expenses']]
+        if page['next_after_id'] is None:
+            break
+        page = client.get(f"/expenses/{user_id}?limit=2&after_date={page['next_after_date']}"
+                          f"&after_id={page['next_after_id']}").get_json()
+    assert seen == sorted(date for date, *_ in expenses)
+
+
+def test_changes_page_through_every_row(client, user_id, expenses):
+    body = client.get(f'/expenses/{user_id}/changes?limit=3').get_json()
+    assert body['full'] and len(body['ids']) == 3
+    rest = client.get(f"/expenses/{user_id}/changes?limit=3&after_version={body['next_after_version']}"
+                      f"&after_id={body['next_after_id']}").get_json()
+    assert len(rest['ids']) == 2 and rest['next_after_id'] is None
+
+    client.put(f"/expenses/{body['ids'][0]}", json={"amount": 1})
+    since = client.get(f"/expenses/{user_id}/changes?since={body['version']}").get_json()
+    assert (since['full'], since['ids'], since['amounts']) == (False, [body['ids'][0]], [1.0])
+
+
+def test_reads_revalidate_until_a_write(client, user_id, expenses):
+    first = client.get(f'/visualize/{user_id}')
+    etag = first.headers['ETag']
+    assert client.get(f'/visualize/{user_id}', headers={"If-None-Match": etag}).status_code == 304
+
+    client.post('/expenses', json={"user_id": user_id, "date": '2024-03-07', "category": 'Food', "amount": 1})
+    second = client.get(f'/visualize/{user_id}', headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert dict(zip(second.get_json()['categories'], second.get_json()['amounts']))['Food'] == 176.5
@@ -0,0 +1,72 @@
+"""Compare chart refresh time of the incremental renderers with clearing and rebuilding the figure,
+for refreshes with new amounts and refreshes with unchanged data.
+
+Run from the frontend directory:  python -m benchmarks.bench_charts
+"""
+import random
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from charts import BarChart, PieChart  # noqa: E402
+
+PALETTE = ['#F28C28', '#7B68EE', '#1ED760', '#E84393', '#36D7B7', '#FF6B6B', '#FFD93D']
+SIZES = [10, 100, 1000]
+REFRESHES = 5
+
+
+def new_canvas():
+    return FigureCanvasAgg(Figure(figsize=(5, 4), facecolor='#1E1E2E'))
+
+
+def rebuild_bar(canvas, categories, amounts):
+    canvas.figure.clear()
+    ax = canvas.figure.add_subplot(111)
+    colors = [PALETTE[i % len(PALETTE)] for i in range(len(categories))]
+    for bar in ax.bar(categories, amounts, color=colors, width=0.6):
+        ax.text(bar.get_x() + bar.get_width() / 2., bar.get_height() + 0.1,
+                f'₹{bar.get_height():.0f}', ha='center', va='bottom', color='white', fontsize=9)
+    canvas.figure.tight_layout()
+    canvas.draw()
+
+
+def rebuild_pie(canvas, categories, amounts):
+    canvas.figure.clear()
+    ax = canvas.figure.add_subplot(111)
+    colors = [PALETTE[i % len(PALETTE)] for i in range(len(categories))]
+    ax.pie(amounts, labels=categories, autopct='%1.1f%%', startangle=90, colors=colors,
+           wedgeprops={'edgecolor': '#1E1E2E', 'linewidth': 1}, textprops={'color': 'white', 'fontsize': 9})
+    canvas.figure.tight_layout()
+    canvas.draw()
+
+
+def timed_refreshes(refresh, categories, rng, changed=True):
+    amounts = [rng.uniform(10, 5000) for _ in categories]
+    refresh(categories, amounts)  # first draw is not a refresh
+    start = time.perf_counter()
+    for _ in range(REFRESHES):
+        if changed:
+            amounts = [rng.uniform(10, 5000) for _ in categories]
+        refresh(categories, list(amounts))
+    return (time.perf_counter() - start) / REFRESHES
+
+
+def main():
+    rng = random.Random(3)
+    print(f"{'categories':>10} {'chart':>5} {'rebuild (ms)':>13} {'incremental (ms)':>17} {'unchanged (ms)':>15}")
+    for size in SIZES:
+        categories = [f"Category {i}" for i in range(size)]
+        for name, rebuild, chart_class in (('bar', rebuild_bar, BarChart), ('pie', rebuild_pie, PieChart)):
+            canvas = new_canvas()
+            legacy = timed_refreshes(lambda c, a: rebuild(canvas, c, a), categories, rng)
+            chart = chart_class(new_canvas(), PALETTE)
+            incremental = timed_refreshes(chart.update, categories, rng)
+            unchanged = timed_refreshes(chart.update, categories, rng, changed=False)
+            print(f"{size:>10} {name:>5} {legacy * 1000:>13.1f} {incremental * 1000:>17.1f} {unchanged * 1000:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""Incremental bar and pie charts for the analytics tab.
+
+Axes and artists are created once and updated in place on refresh. Artists
+are only rebuilt when the number of categories changes. The data artists are
+animated: a full draw paints the axes, ticks and titles and caches them, and
+a refresh that leaves those alone restores the cache and blits only the bars
+or wedges. Full redraws go through draw_idle() so several updates in one
+event-loop turn cost one paint, and a refresh with unchanged data draws nothing.
+"""
+import math
+
+
+class BlittedChart:
+    """Chart on its own canvas whose data artists are redrawn over a cached background"""
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.categories = []
+        self.amounts = []
+        self.background = None
+        self.stale = True
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def data_artists(self):
+        return []
+
+    def unchanged(self, categories, amounts):
+        if categories == self.categories and list(amounts) == self.amounts:
+            return True
+        self.amounts = list(amounts)
+        return False
+
+    def redraw(self, full=False):
+        # A full draw is pending or needed; the draw_event handler recaches the background
+        if full or self.stale or self.background is None:
+            self.stale = True
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_data()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def _draw_data(self):
+        for artist in self.data_artists():
+            self.canvas.figure.draw_artist(artist)
+
+    def _on_draw(self, event):
+        # Saving renders at another size and includes the animated artists
+        if self.canvas.is_saving():
+            self.background = None
+            return
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.stale = False
+        self._draw_data()
+
+
+class BarChart(BlittedChart):
+    """Bar chart of amount per category drawn on an existing canvas"""
+    HEADROOM = 1.15
+    REFIT = 0.5
+    MAX_TICK_LABELS = 25
+
+    def __init__(self, canvas, palette):
+        super().__init__(canvas)
+        self.palette = palette
+        self.bars = []
+        self.labels = []
+
+        self.ax = canvas.figure.add_subplot(111)
+        self.ax.set_title("Expense by Category", fontsize=12, pad=10)
+        self.ax.set_xlabel("Category", fontsize=10, labelpad=10)
+        self.ax.set_ylabel("Amount (₹)", fontsize=10, labelpad=10)
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.spines['bottom'].set_color('#555555')
+        self.ax.spines['left'].set_color('#555555')
+        self.ax.tick_params(colors='#aaaaaa', labelsize=9)
+        self.ax.set_facecolor('#1E1E2E')
+        # Margins are fitted once; refitting to every category set is slow and
+        # cannot fit hundreds of tick labels anyway
+        canvas.figure.tight_layout()
+
+    def data_artists(self):
+        return self.bars + self.labels
+
+    def update(self, categories, amounts):
+        if self.unchanged(categories, amounts):
+            return
+        full = False
+        if len(categories) != len(self.bars):
+            self._rebuild(len(categories))
+            full = True
+        for bar, label, amount in zip(self.bars, self.labels, amounts):
+            bar.set_height(amount)
+            label.set_y(amount + 0.1)
+            label.set_text(f'₹{amount:.0f}')
+
+        if categories != self.categories:
+            self._set_ticks(categories)
+            self.categories = list(categories)
+            full = True
+
+        full = self._fit_values(amounts) or full
+        self.redraw(full)
+
+    def _set_ticks(self, categories):
+        step = max(1, math.ceil(len(categories) / self.MAX_TICK_LABELS))
+        ticks = range(0, len(categories), step)
+        self.ax.set_xticks(ticks)
+        self.ax.set_xticklabels([categories[i] for i in ticks])
+
+    def _fit_values(self, amounts):
+        # Keep the y-limits while the values fit without leaving most of the axes empty,
+        # so ordinary refreshes do not redraw the ticks
+        low = min(0.0, min(amounts, default=0.0))
+        high = max(0.0, max(amounts, default=0.0))
+        bottom, top = self.ax.get_ylim()
+        if bottom <= low * self.HEADROOM and self.REFIT * top <= high <= top and (low < 0) == (bottom < 0):
+            return False
+        self.ax.set_ylim(low * self.HEADROOM, (high * self.HEADROOM) or 1.0)
+        return True
+
+    def _rebuild(self, count):
+        for artist in self.bars + self.labels:
+            artist.remove()
+        colors = [self.palette[i % len(self.palette)] for i in range(count)]
+        self.bars = list(self.ax.bar(range(count), [0] * count, color=colors, width=0.6))
+        self.labels = [
+            self.ax.text(bar.get_x() + bar.get_width() / 2., 0, '', ha='center', va='bottom', color='white', fontsize=9)
+            for bar in self.bars
+        ]
+        for artist in self.data_artists():
+            artist.set_animated(True)
+        self.ax.set_xlim(-0.5, count - 0.5)
+        self.categories = None
+
+
+class PieChart(BlittedChart):
+    """Pie chart of each category's share, with wedge angles updated in place"""
+    START_ANGLE = 90
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+
+    def __init__(self, canvas, palette):
+        super().__init__(canvas)
+        self.palette = palette
+        self.wedges = []
+        self.texts = []
+        self.autotexts = []
+
+        self.ax = canvas.figure.add_subplot(111)
+        self.ax.set_title("Expense Distribution", fontsize=12, pad=10)
+        self.ax.set_facecolor('#1E1E2E')
+        canvas.figure.tight_layout()
+
+    def data_artists(self):
+        return self.wedges + self.texts + self.autotexts
+
+    def update(self, categories, amounts):
+        if self.unchanged(categories, amounts):
+            return
+        # Wedges and their labels are all animated, so only a new wedge count needs a full draw
+        full = len(categories) != len(self.wedges)
+        if full:
+            self._rebuild(categories, amounts)
+        else:
+            self._move_wedges(categories, amounts)
+        self.categories = list(categories)
+        self.redraw(full)
+
+    def _rebuild(self, categories, amounts):
+        for artist in self.wedges + self.texts + self.autotexts:
+            artist.remove()
+        colors = [self.palette[i % len(self.palette)] for i in range(len(categories))]
+        self.wedges, self.texts, self.autotexts = self.ax.pie(
+            amounts,
+            labels=categories,
+            autopct='%1.1f%%',
+            startangle=self.START_ANGLE,
+            colors=colors,
+            shadow=False,
+            labeldistance=self.LABEL_DISTANCE,
+            pctdistance=self.PCT_DISTANCE,
+            wedgeprops={'edgecolor': '#1E1E2E', 'linewidth': 1},
+            textprops={'color': 'white', 'fontsize': 9}
+        )
+        # Style the percentage text
+        for autotext in self.autotexts:
+            autotext.set_fontsize(8)
+            autotext.set_fontweight('bold')
+        for artist in self.data_artists():
+            artist.set_animated(True)
+
+    def _move_wedges(self, categories, amounts):
+        total = float(sum(amounts)) or 1.0
+        theta = self.START_ANGLE
+        for wedge, text, autotext, category, amount in zip(
+                self.wedges, self.texts, self.autotexts, categories, amounts):
+            span = 360.0 * amount / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + span)
+
+            middle = math.radians(theta + span / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            text.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            text.set_text(category)
+            autotext.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            autotext.set_text(f'{100.0 * amount / total:1.1f}%')
+            theta += span
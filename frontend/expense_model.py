@@ -0,0 +1,152 @@
+"""Columnar, virtualized model behind the dashboard's expense list."""
+import sys
+from array import array
+
+import numpy as np
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor
+
+
+class ExpenseListModel(QAbstractListModel):
+    """Expenses stored column-wise and formatted only when a row is painted.
+
+    Rows stay ordered by (date, id) like the backend pages. Amounts, dates
+    (as YYYYMMDD integers) and category codes live in typed arrays and each
+    category string is stored once. Pages arrive as columns (JSON lists or
+    decoded Arrow/MessagePack arrays) and are appended a column at a time.
+    When the view reaches the end of the loaded rows, the next page is
+    requested through fetch_page(after_id).
+    """
+    IdRole = Qt.UserRole + 1
+
+    def __init__(self, palette, fetch_page, parent=None):
+        super().__init__(parent)
+        self.palette = [QColor(color) for color in palette]
+        self.fetch_page = fetch_page
+        self.next_after_id = None
+        self.fetching = False
+        self._clear()
+
+    def _clear(self):
+        self.ids = array('q')
+        self.amounts = array('d')
+        self.dates = array('l')
+        self.category_codes = array('l')
+        self.descriptions = []
+        self.categories = []
+        self.category_colors = []
+        self._category_lookup = {}
+
+    def _category_code(self, category):
+        code = self._category_lookup.get(category)
+        if code is None:
+            code = len(self.categories)
+            self._category_lookup[category] = code
+            self.categories.append(sys.intern(category))
+            self.category_colors.append(self.palette[hash(category) % len(self.palette)])
+        return code
+
+    @staticmethod
+    def _extend(column, values):
+        column.frombytes(np.asarray(values, dtype=column.typecode).tobytes())
+
+    def _append(self, page):
+        if not len(page['ids']):
+            return
+        self._extend(self.ids, page['ids'])
+        self._extend(self.amounts, page['amounts'])
+        # ISO strings or Arrow date32 values, to YYYYMMDD
+        days = np.asarray(page['dates'], dtype='datetime64[D]')
+        months = days.astype('datetime64[M]')
+        self._extend(self.dates, (months.astype('datetime64[Y]').astype(np.int64) + 1970) * 10000
+                     + (months.astype(np.int64) % 12 + 1) * 100 + (days - months).astype(np.int64) + 1)
+        names, inverse = np.unique(np.asarray(page['categories'], dtype=object), return_inverse=True)
+        codes = np.array([self._category_code(name) for name in names], dtype=np.int64)
+        self._extend(self.category_codes, codes[inverse])
+        self.descriptions.extend(page['descriptions'])
+
+    @property
+    def has_more(self):
+        return self.next_after_id is not None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            date = self.dates[row]
+            return (f"⬤ {self.categories[self.category_codes[row]]} | ₹{self.amounts[row]:.2f}\n"
+                    f"     📅 {date // 10000:04d}-{date // 100 % 100:02d}-{date % 100:02d} | ✏️ {self.descriptions[row]}")
+        if role == Qt.ForegroundRole:
+            return self.category_colors[self.category_codes[row]]
+        if role == self.IdRole:
+            return self.ids[row]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self.fetching = True
+            self.fetch_page(self.next_after_id)
+
+    def reset(self, page):
+        """Replace all rows with a first page from the backend"""
+        self.beginResetModel()
+        self._clear()
+        self._append(page)
+        self.next_after_id = page.get("next_after_id")
+        self.fetching = False
+        self.endResetModel()
+
+    def append_page(self, page):
+        """Append the page requested by fetchMore()"""
+        self.fetching = False
+        self.next_after_id = page.get("next_after_id")
+        count = len(page["ids"])
+        if count:
+            start = len(self.ids)
+            self.beginInsertRows(QModelIndex(), start, start + count - 1)
+            self._append(page)
+            self.endInsertRows()
+
+    def fetch_failed(self):
+        self.fetching = False
+
+    def insert_expense(self, exp):
+        """Insert one new expense at its (date, id) position; rows beyond the loaded pages arrive by paging"""
+        key = (int(exp['date'].replace('-', '')), exp['id'])
+        low, high = 0, len(self.ids)
+        while low < high:
+            mid = (low + high) // 2
+            if (self.dates[mid], self.ids[mid]) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low == len(self.ids) and self.has_more:
+            return
+
+        self.beginInsertRows(QModelIndex(), low, low)
+        self.ids.insert(low, exp['id'])
+        self.amounts.insert(low, exp['amount'])
+        self.dates.insert(low, key[0])
+        self.category_codes.insert(low, self._category_code(exp['category']))
+        self.descriptions.insert(low, exp['description'])
+        self.endInsertRows()
+
+    def remove_expense(self, expense_id):
+        try:
+            row = self.ids.index(expense_id)
+        except ValueError:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.ids[row]
+        del self.amounts[row]
+        del self.dates[row]
+        del self.category_codes[row]
+        del self.descriptions[row]
+        self.endRemoveRows()
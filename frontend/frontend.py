@@ -1,17 +1,23 @@
+import datetime
+import os
 import sys
-import requests
 import matplotlib.pyplot as plt
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QMessageBox, 
-    QLineEdit, QTextEdit, QListWidget, QTabWidget, QHBoxLayout, QGridLayout,
+    QLineEdit, QTextEdit, QListView, QTabWidget, QHBoxLayout, QGridLayout,
     QFrame, QSplitter, QComboBox, QScrollArea
 )
-from PyQt5.QtGui import QFont, QPalette, QColor, QIcon
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QFont, QPalette, QIcon
+from PyQt5.QtCore import Qt, QSize, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib as mpl
 
+from charts import BarChart, PieChart
+from expense_model import ExpenseListModel
+from local_store import LocalStore, cache_path
+from network import ApiClient
+
 # Set matplotlib to use dark background for all plots
 plt.style.use('dark_background')
 mpl.rcParams['text.color'] = 'white'
@@ -35,7 +41,7 @@ class RoundedFrame(QFrame):
         """)
 
 class FinanceDashboard(QWidget):
-    def __init__(self, user_id):
+    def __init__(self, user_id, token=None):
         super().__init__()
         self.user_id = user_id
         # Color palette - modern vibrant accents on dark background
@@ -50,7 +56,30 @@ class FinanceDashboard(QWidget):
             'text_dim': '#A0A0A0'
         }
         self.category_colors = ['#F28C28', '#7B68EE', '#1ED760', '#E84393', '#36D7B7', '#FF6B6B', '#FFD93D']
+        self.expense_page_size = 100
+        self.alert_feed_size = 5
+        # Search runs once typing pauses for this long; None while the full list is shown
+        self.search_delay_ms = 300
+        self.search_query = None
+        self.showing_search = False
+        self.search_truncated = False  # the backend ranked only the newest matches and older ones were left out
+        # The expense list is paged out of a local copy that delta syncs keep current; writes are
+        # queued locally and replayed in batches, so the dashboard also works while offline
+        self.store = LocalStore(cache_path(user_id))
+        self.sync_page_size = 5000
+        self.sync_patch_limit = 200  # larger syncs reload the list instead of patching it row by row
+        self.outbox_batch_size = 500
+        self.sync_interval_ms = 30000
+        self.sync_again = False
+        self.sending_ids = set()  # temporary ids of offline adds being uploaded
+        self.offline = False
+        # All backend calls run in the background and report back through callbacks
+        self.api = ApiClient("http://127.0.0.1:5000", token=token, parent=self)
         self.initUI()
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(self.sync_interval_ms)
+        self.sync_timer.timeout.connect(self.flush_outbox)
+        self.sync_timer.start()
 
     def initUI(self):
         """Initialize UI with enhanced dark mode and better visuals"""
@@ -77,7 +106,7 @@ class FinanceDashboard(QWidget):
                 background-color: #333344; 
                 border: 1px solid {self.colors['accent2']};
             }}
-            QLineEdit, QTextEdit, QListWidget, QComboBox {{ 
+            QLineEdit, QTextEdit, QListView, QComboBox {{ 
                 background-color: #16161e; 
                 border: 1px solid #333344; 
                 border-radius: 6px; 
@@ -107,17 +136,17 @@ class FinanceDashboard(QWidget):
             QTabBar::tab:hover:!selected {{ 
                 background: #222235;
             }}
-            QListWidget {{ 
+            QListView {{ 
                 border-radius: 8px; 
                 padding: 5px; 
                 outline: none;
             }}
-            QListWidget::item {{ 
+            QListView::item {{ 
                 border-bottom: 1px solid #222235; 
                 padding: 8px; 
                 margin: 2px 0px;
             }}
-            QListWidget::item:selected {{ 
+            QListView::item:selected {{ 
                 background-color: #2d2d44; 
                 border-radius: 6px;
             }}
@@ -258,6 +287,10 @@ class FinanceDashboard(QWidget):
         self.view_expenses_btn.clicked.connect(self.view_expenses)
         button_layout.addWidget(self.view_expenses_btn)
         
+        self.delete_expense_btn = QPushButton("🗑️ Delete Selected")
+        self.delete_expense_btn.clicked.connect(self.delete_expense)
+        button_layout.addWidget(self.delete_expense_btn)
+        
         input_layout.addLayout(button_layout)
         tab_layout.addWidget(input_frame)
         
@@ -270,6 +303,16 @@ class FinanceDashboard(QWidget):
         list_title.setStyleSheet(f"font-size: 16px; font-weight: bold; color: {self.colors['accent2']};")
         list_header.addWidget(list_title)
         
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔍 Search descriptions and categories...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.search_delay_ms)
+        self.search_timer.timeout.connect(self.search_expenses)
+        self.search_input.textChanged.connect(lambda _: self.search_timer.start())
+        list_header.addWidget(self.search_input)
+        
         self.expense_count = QLabel("0 items")
         self.expense_count.setStyleSheet(f"color: {self.colors['text_dim']};")
         self.expense_count.setAlignment(Qt.AlignRight)
@@ -277,10 +320,18 @@ class FinanceDashboard(QWidget):
         
         list_layout.addLayout(list_header)
         
-        self.expense_list = QListWidget()
+        # Columnar model: only visible rows are formatted, further pages load on scroll
+        self.expense_model = ExpenseListModel(self.category_colors, self.fetch_expense_page, self)
+        self.expense_model.modelReset.connect(self.update_expense_count)
+        self.expense_model.rowsInserted.connect(self.update_expense_count)
+        self.expense_model.rowsRemoved.connect(self.update_expense_count)
+        
+        self.expense_list = QListView()
+        self.expense_list.setModel(self.expense_model)
+        self.expense_list.setUniformItemSizes(True)
         self.expense_list.setAlternatingRowColors(True)
         self.expense_list.setStyleSheet(f"""
-            QListWidget {{
+            QListView {{
                 alternate-background-color: #1a1a2a;
             }}
         """)
@@ -314,6 +365,7 @@ class FinanceDashboard(QWidget):
         bar_layout.addWidget(bar_title)
         
         self.bar_canvas = FigureCanvas(Figure(figsize=(5, 4), facecolor='#1E1E2E'))
+        self.bar_chart = BarChart(self.bar_canvas, self.category_colors)
         bar_layout.addWidget(self.bar_canvas)
         charts_layout.addWidget(bar_frame)
         
@@ -326,6 +378,7 @@ class FinanceDashboard(QWidget):
         pie_layout.addWidget(pie_title)
         
         self.pie_canvas = FigureCanvas(Figure(figsize=(5, 4), facecolor='#1E1E2E'))
+        self.pie_chart = PieChart(self.pie_canvas, self.category_colors)
         pie_layout.addWidget(self.pie_canvas)
         charts_layout.addWidget(pie_frame)
         
@@ -350,7 +403,11 @@ class FinanceDashboard(QWidget):
         self.biggest_category_label = QLabel("Biggest Category: N/A")
         summary_grid.addWidget(self.biggest_category_label, 0, 1)
         
-        # Additional summaries could be added here
+        # Budget use this month and the newest alerts
+        self.alerts_label = QLabel("No alerts")
+        self.alerts_label.setWordWrap(True)
+        summary_grid.addWidget(self.alerts_label, 1, 0, 1, 2)
+        
         summary_layout.addLayout(summary_grid)
         
         # Action buttons for visualization options
@@ -376,7 +433,6 @@ class FinanceDashboard(QWidget):
 
     def add_expense(self):
         """Send new expense data to backend & clear inputs after submission"""
-        url = "http://127.0.0.1:5000/expenses"
         data = {
             "user_id": self.user_id,
             "date": "2024-03-09",
@@ -395,145 +451,264 @@ class FinanceDashboard(QWidget):
             QMessageBox.warning(self, "⚠️ Warning", "Amount must be a number!")
             return
 
-        response = requests.post(url, json=data)
+        # Stored locally under a temporary id and uploaded by flush_outbox(); the sync that follows
+        # swaps in the server's row, re-runs a search and refreshes the charts
+        expense = self.store.add(data)
+        if not self.showing_search:
+            self.expense_model.insert_expense(expense)
+        self.update_expense_count()
+        self.flush_outbox()
 
-        if response.status_code == 201:
-            QMessageBox.information(self, "✅ Success", "Expense added successfully!")
-            self.amount_input.clear()
-            self.category_input.setCurrentIndex(-1)
-            self.description_input.clear()
-            self.view_expenses()
-            # Refresh charts if on visualization tab
-            if self.tabs.currentIndex() == 1:
-                self.fetch_and_update_charts()
-        else:
-            QMessageBox.warning(self, "❌ Error", "Failed to add expense.")
+        QMessageBox.information(self, "✅ Success", "Expense added successfully!")
+        self.amount_input.clear()
+        self.category_input.setCurrentIndex(-1)
+        self.description_input.clear()
+
+    def delete_expense(self):
+        """Delete the selected expense on the backend"""
+        index = self.expense_list.currentIndex()
+        if not index.isValid():
+            QMessageBox.warning(self, "⚠️ Warning", "Select an expense to delete!")
+            return
+
+        expense_id = index.data(ExpenseListModel.IdRole)
+        if expense_id in self.sending_ids:
+            QMessageBox.information(self, "⏳ Syncing", "This expense is being uploaded; try again in a moment.")
+            return
+        # Removed locally at once; the backend delete is queued like an offline add
+        self.store.delete(expense_id)
+        self.expense_model.remove_expense(expense_id)
+        self.flush_outbox()
 
     def view_expenses(self):
-        """Fetch and display expenses from backend with enhanced formatting"""
-        url = f"http://127.0.0.1:5000/expenses/{self.user_id}"
-        response = requests.get(url)
+        """Show the local copy of the expense list at once, then bring it up to date with the backend"""
+        if self.search_query:
+            self.search_expenses()
+            return
+        self.show_local_expenses(self.expense_page_size)
+        self.flush_outbox()
 
-        if response.status_code == 200:
-            self.expense_list.clear()
-            expenses = response.json()["expenses"]
-            
-            # Update expense count
-            self.expense_count.setText(f"{len(expenses)} items")
-            
-            for exp in expenses:
-                category = exp['category']
-                # Create color indicator based on category
-                color_indicator = "⬤ "  # Unicode circle
-                
-                # Create formatted item with better spacing and layout
-                item_text = f"{color_indicator}{category} | ₹{exp['amount']:.2f}\n"
-                item_text += f"     📅 {exp['date']} | ✏️ {exp['description']}"
-                
-                list_item = self.expense_list.addItem(item_text)
-                
-                # Set different colors for different categories
-                category_hash = hash(category) % len(self.category_colors)
-                item = self.expense_list.item(self.expense_list.count() - 1)
-                item.setForeground(QColor(self.category_colors[category_hash]))
+    def show_local_expenses(self, limit):
+        """Reset the list to the first `limit` rows of the local copy"""
+        # A search page requested against the old rows no longer lines up
+        self.api.cancel("expense_page")
+        self.showing_search = False
+        self.expense_model.reset(self.store.page(None, limit))
+
+    def search_expenses(self):
+        """Search on the backend for the text in the search box; an empty box shows the full list again"""
+        self.search_query = self.search_input.text().strip() or None
+        if self.search_query is None:
+            self.api.cancel("search")
+            self.view_expenses()
+            return
+        params = {"q": self.search_query, "limit": self.expense_page_size, "shape": "columns"}
+        self.api.get(f"/expenses/{self.user_id}/search", self.on_search_results, key="search", params=params)
+
+    def on_search_results(self, reply):
+        if reply.status_code != 200:
+            QMessageBox.warning(self, "❌ Error", "Search failed.")
+            return
+        if self.search_query is None:
+            return
+        self.api.cancel("expense_page")
+        self.showing_search = True
+        self.expense_model.reset(self.search_page(reply.payload))
+
+    def search_page(self, payload):
+        """Search results as a model page; the model's paging cursor is the next offset"""
+        self.search_truncated = payload["truncated"]
+        return {**payload, "next_after_id": payload["next_offset"]}
+
+    def fetch_expense_page(self, after_id):
+        """Load the page after the cursor after_id; called by the model when the list is scrolled to its end"""
+        if self.showing_search:
+            params = {"q": self.search_query, "limit": self.expense_page_size, "offset": after_id,
+                      "shape": "columns"}
+            self.api.get(f"/expenses/{self.user_id}/search",
+                         lambda reply: self.on_next_expense_page(reply, self.search_page),
+                         key="expense_page", params=params, revalidate=False)
+            return
+        self.expense_model.append_page(self.store.page(after_id, self.expense_page_size))
+
+    def on_next_expense_page(self, reply, to_page=None):
+        if reply.status_code == 200:
+            self.expense_model.append_page(to_page(reply.payload) if to_page else reply.payload)
         else:
+            self.expense_model.fetch_failed()
             QMessageBox.warning(self, "❌ Error", "Failed to fetch expenses.")
 
+    def update_expense_count(self):
+        """Show the loaded row count ("+" while more pages remain), unsynced writes and whether the backend is reachable"""
+        more = "+" if self.expense_model.has_more else ""
+        text = f"{self.expense_model.rowCount()}{more} items"
+        if self.showing_search and self.search_truncated:
+            text += " · older matches not shown, narrow the search"
+        pending = self.store.pending_count()
+        if pending:
+            text += f" · {pending} unsynced"
+        if self.offline:
+            text += " · offline"
+        self.expense_count.setText(text)
+
+    def set_offline(self, offline):
+        self.offline = offline
+        self.update_expense_count()
+
+    def flush_outbox(self):
+        """Upload queued writes a batch at a time, then sync; runs on a timer and after every local write"""
+        if self.api.in_flight("outbox"):
+            return
+        adds = self.store.pending("add", self.outbox_batch_size)
+        if adds:
+            self.sending_ids = {expense_id for _, expense_id, _ in adds}
+            self.api.post("/expenses/bulk", lambda reply: self.on_outbox_sent(reply, adds), key="outbox",
+                          json=[payload for _, _, payload in adds])
+            return
+        deletes = self.store.pending("delete", self.outbox_batch_size)
+        if deletes:
+            self.api.request("DELETE", "/expenses/bulk", lambda reply: self.on_outbox_sent(reply, deletes),
+                             key="outbox", json={"ids": [expense_id for _, expense_id, _ in deletes]})
+            return
+        self.sync_expenses()
+
+    def on_outbox_sent(self, reply, entries):
+        self.sending_ids = set()
+        # Unreachable or failing backend: keep the batch for the next timer tick
+        if reply.status_code is None or reply.status_code >= 500:
+            self.set_offline(True)
+            return
+        self.set_offline(False)
+        if reply.status_code in (401, 403):
+            QMessageBox.warning(self, "❌ Error", "Not allowed to upload offline changes; they stay queued.")
+            return
+        # Anything else was either taken or rejected for good (e.g. a row that fails validation)
+        rejected = len(entries) if reply.status_code >= 400 else len((reply.payload or {}).get("errors", []))
+        self.store.sent([seq for seq, _, _ in entries])
+        if rejected:
+            QMessageBox.warning(self, "❌ Error", f"{rejected} offline change(s) were rejected by the server.")
+        self.flush_outbox()
+
+    def sync_expenses(self):
+        """Fetch the expenses changed since the local copy's version, a page at a time"""
+        if self.api.in_flight("sync"):
+            self.sync_again = True  # the running sync may have missed the latest writes
+            return
+        state = {"version": None, "reload": False, "pages": [], "changes": 0}
+        self.request_changes({"since": self.store.version(), "limit": self.sync_page_size}, state)
+
+    def request_changes(self, params, state):
+        self.api.get(f"/expenses/{self.user_id}/changes", lambda reply: self.on_changes(reply, params, state),
+                     key="sync", params=params, revalidate=False)
+
+    def on_changes(self, reply, params, state):
+        if reply.status_code != 200:
+            self.set_offline(reply.status_code is None or reply.status_code >= 500)
+            return
+        self.set_offline(False)
+        payload = reply.payload
+        first_page = state["version"] is None
+        if first_page:
+            state["version"] = payload["version"]
+        self.store.apply_changes(payload, first_page)
+
+        # Small syncs patch the loaded rows; full or large ones reload the list from the local copy
+        state["changes"] += len(payload["ids"]) + len(payload["deleted"])
+        if payload["full"] or state["changes"] > self.sync_patch_limit:
+            state["reload"], state["pages"] = True, []
+        else:
+            state["pages"].append(payload)
+        if payload["next_after_id"] is not None:
+            self.request_changes({**params, "after_version": payload["next_after_version"],
+                                  "after_id": payload["next_after_id"]}, state)
+            return
+
+        # Offline rows are only dropped by a sync that started after their upload, which has their server copies
+        replaced = self.store.finish_sync(state["version"], drop_replaced=not self.sync_again)
+        if state["changes"] or replaced:
+            self.show_changes(state, replaced)
+        self.update_expense_count()
+        if self.sync_again:
+            self.sync_again = False
+            self.sync_expenses()
+
+    def show_changes(self, state, replaced):
+        """Bring the list, a search and the charts up to date after a sync changed the local copy"""
+        if self.showing_search:
+            self.search_expenses()
+        elif state["reload"]:
+            self.show_local_expenses(max(self.expense_model.rowCount(), self.expense_page_size))
+        else:
+            for expense_id in replaced:
+                self.expense_model.remove_expense(expense_id)
+            for page in state["pages"]:
+                for expense_id in page["deleted"]:
+                    self.expense_model.remove_expense(expense_id)
+                for expense_id, date, category, amount, description in zip(
+                        page["ids"], page["dates"], page["categories"], page["amounts"], page["descriptions"]):
+                    self.expense_model.remove_expense(expense_id)
+                    self.expense_model.insert_expense({"id": expense_id, "date": date, "category": category,
+                                                       "amount": amount, "description": description})
+        if self.tabs.currentIndex() == 1:
+            self.fetch_and_update_charts()
+
     def fetch_and_update_charts(self):
-        """Fetch expense data and update all charts"""
-        url = f"http://127.0.0.1:5000/visualize/{self.user_id}"
-        response = requests.get(url)
-
-        if response.status_code == 200:
-            data = response.json()
-            categories = data["categories"]
-            amounts = data["amounts"]
-            
-            # Calculate total spent
-            total = sum(amounts)
-            self.total_spent_label.setText(f"Total Spent: ₹{total:.2f}")
-            
-            # Find biggest category
-            if categories and amounts:
-                max_index = amounts.index(max(amounts))
-                self.biggest_category_label.setText(f"Biggest Category: {categories[max_index]} (₹{amounts[max_index]:.2f})")
+        """Fetch expense data and the summary in the background; charts and labels update when they arrive"""
+        self.api.get(f"/visualize/{self.user_id}", self.on_chart_data, key="charts")
+        month = datetime.date.today().strftime("%Y-%m")
+        self.api.get(f"/alerts/{self.user_id}", self.on_alerts, key="alerts",
+                     params={"month": month, "limit": self.alert_feed_size})
+
+    def on_chart_data(self, reply):
+        """Update all charts from a /visualize reply"""
+        if reply.status_code == 200:
+            # Charts already show this payload
+            if not reply.changed:
+                return
+
+            data = reply.payload
+            # Lists from JSON, or arrays from a binary reply
+            categories = [str(category) for category in data["categories"]]
+            amounts = [float(amount) for amount in data["amounts"]]
             
             # Update Bar Chart
-            self.update_bar_chart(categories, amounts)
+            self.bar_chart.update(categories, amounts)
             
             # Update Pie Chart
-            self.update_pie_chart(categories, amounts)
+            self.pie_chart.update(categories, amounts)
         else:
             QMessageBox.warning(self, "❌ Error", "Failed to fetch data.")
 
-    def update_bar_chart(self, categories, amounts):
-        """Update the bar chart with the given data"""
-        self.bar_canvas.figure.clear()
-        ax_bar = self.bar_canvas.figure.add_subplot(111)
-        
-        # Generate color map from our palette
-        bar_colors = [self.category_colors[i % len(self.category_colors)] for i in range(len(categories))]
-        
-        # Create the bars with better styling
-        bars = ax_bar.bar(categories, amounts, color=bar_colors, width=0.6)
-        
-        # Add value labels on top of bars
-        for bar in bars:
-            height = bar.get_height()
-            ax_bar.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                    f'₹{height:.0f}', ha='center', va='bottom', color='white', fontsize=9)
-        
-        # Style the chart
-        ax_bar.set_title("Expense by Category", fontsize=12, pad=10)
-        ax_bar.set_xlabel("Category", fontsize=10, labelpad=10)
-        ax_bar.set_ylabel("Amount (₹)", fontsize=10, labelpad=10)
-        ax_bar.spines['top'].set_visible(False)
-        ax_bar.spines['right'].set_visible(False)
-        ax_bar.spines['bottom'].set_color('#555555')
-        ax_bar.spines['left'].set_color('#555555')
-        ax_bar.tick_params(colors='#aaaaaa', labelsize=9)
-        ax_bar.set_facecolor('#1E1E2E')
-        
-        self.bar_canvas.figure.tight_layout()
-        self.bar_canvas.draw()
-
-    def update_pie_chart(self, categories, amounts):
-        """Update the pie chart with the given data"""
-        self.pie_canvas.figure.clear()
-        ax_pie = self.pie_canvas.figure.add_subplot(111)
-        
-        # Generate colors from our palette
-        pie_colors = [self.category_colors[i % len(self.category_colors)] for i in range(len(categories))]
-        
-        # Create a prettier pie chart
-        wedges, texts, autotexts = ax_pie.pie(
-            amounts, 
-            labels=categories, 
-            autopct='%1.1f%%', 
-            startangle=90, 
-            colors=pie_colors,
-            shadow=False, 
-            wedgeprops={'edgecolor': '#1E1E2E', 'linewidth': 1},
-            textprops={'color': 'white', 'fontsize': 9}
-        )
-        
-        # Style the percentage text
-        for autotext in autotexts:
-            autotext.set_fontsize(8)
-            autotext.set_fontweight('bold')
-        
-        ax_pie.set_title("Expense Distribution", fontsize=12, pad=10)
-        
-        # Create some spacing around the pie
-        ax_pie.set_facecolor('#1E1E2E')
-        
-        self.pie_canvas.figure.tight_layout()
-        self.pie_canvas.draw()
+    def on_alerts(self, reply):
+        """Update the summary labels and alert feed from an /alerts reply"""
+        if reply.status_code != 200:
+            QMessageBox.warning(self, "❌ Error", "Failed to fetch alerts.")
+            return
+        if not reply.changed:
+            return
+
+        data = reply.payload
+        summary = data["summary"]
+        self.total_spent_label.setText(f"Total Spent: ₹{summary['total_spent']:.2f}")
+        biggest = summary["biggest_category"]
+        self.biggest_category_label.setText(
+            f"Biggest Category: {biggest['category']} (₹{biggest['amount']:.2f})" if biggest else "Biggest Category: N/A")
+
+        lines = [f"{'⚠️' if budget['used'] >= 1 else '💰'} {budget['category']}: ₹{budget['spent']:.2f} of "
+                 f"₹{budget['limit']:.2f} ({budget['used']:.0%}) in {data['month']}" for budget in data["budgets"]]
+        lines += [f"🔔 {alert['message']}" for alert in data["alerts"]]
+        self.alerts_label.setText("\n".join(lines) or "No alerts")
+
+    def closeEvent(self, event):
+        """Stop background requests before the window goes away"""
+        self.sync_timer.stop()
+        self.api.shutdown()
+        self.store.close()
+        super().closeEvent(event)
 
     def export_chart(self):
         """Export the current charts as images"""
         # Save both charts with date timestamp
-        import datetime
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         
         try:
@@ -558,9 +733,10 @@ if __name__ == '__main__':
     app = QApplication(sys.argv)
     app.setStyle('Fusion')  # Use Fusion style for better cross-platform appearance
     user_id = 1
-    dashboard = FinanceDashboard(user_id)
+    token = os.environ.get('FINANCE_TOKEN')  # session token from /login, when the backend requires one
+    dashboard = FinanceDashboard(user_id, token)
     dashboard.show()
-    dashboard.view_expenses()  # Load expenses on startup
+    dashboard.view_expenses()  # Show the local copy on startup, then sync it
     sys.exit(app.exec_())
 
     #comment
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""Local SQLite copy of a user's expenses, kept current by delta sync, plus a queue of offline writes.
+
+The dashboard pages its expense list out of this store, so it starts from
+local rows without waiting for the network and keeps working while the
+backend is unreachable. GET /expenses/<user_id>/changes?since=<version>
+brings the store up to date; writes made locally are queued in the outbox
+and replayed against the bulk endpoints. Rows added offline carry negative
+temporary ids until a sync brings back their server copies. Each queued add
+also carries a client_id, so replaying an upload whose reply was lost does
+not store it twice.
+"""
+import json
+import os
+import sqlite3
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_expenses_date_id ON expenses (date, id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    expense_id INTEGER NOT NULL,
+    payload TEXT
+);
+"""
+
+
+def cache_path(user_id):
+    """Store file for a user, under FINANCE_CACHE_DIR or ~/.finance_dashboard"""
+    directory = os.environ.get("FINANCE_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".finance_dashboard")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"expenses-{user_id}.db")
+
+
+class LocalStore:
+    """One user's synced expenses and pending writes in a local SQLite file.
+
+    Pages come out in the backend's (date, id) order, as the columnar pages
+    ExpenseListModel takes; their cursor is the (date, id) of the last row,
+    so paging survives rows being removed underneath it.
+    """
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def version(self):
+        """Data version of the last completed sync, 0 before the first"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def page(self, after=None, limit=100):
+        """Rows after the (date, id) cursor, as a model page"""
+        if after is None:
+            rows = self.conn.execute(
+                "SELECT id, date, category, amount, description FROM expenses ORDER BY date, id LIMIT ?",
+                (limit + 1,)).fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT id, date, category, amount, description FROM expenses WHERE (date, id) > (?, ?) "
+                "ORDER BY date, id LIMIT ?", (*after, limit + 1)).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        ids, dates, categories, amounts, descriptions = (list(column) for column in zip(*rows)) if rows \
+            else ([], [], [], [], [])
+        return {"ids": ids, "dates": dates, "categories": categories, "amounts": amounts,
+                "descriptions": descriptions, "next_after_id": (dates[-1], ids[-1]) if has_more else None}
+
+    def apply_changes(self, payload, first_page):
+        """Store one page of a /changes reply; a full sync first drops every synced row"""
+        with self.conn:
+            if first_page and payload["full"]:
+                self.conn.execute("DELETE FROM expenses WHERE id > 0")
+            if payload["deleted"]:
+                self.conn.executemany("DELETE FROM expenses WHERE id = ?", ((id,) for id in payload["deleted"]))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO expenses (id, date, category, amount, description) VALUES (?, ?, ?, ?, ?)",
+                zip(payload["ids"], payload["dates"], payload["categories"], payload["amounts"],
+                    payload["descriptions"]))
+            # Deletes still waiting in the outbox win over the server's copy
+            self.conn.execute("DELETE FROM expenses WHERE id IN (SELECT expense_id FROM outbox WHERE kind = 'delete')")
+
+    def finish_sync(self, version, drop_replaced=True):
+        """Record a completed sync; with drop_replaced, offline rows whose add was sent are removed.
+
+        Returns the removed temporary ids: the sync has brought back their server copies.
+        """
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (version,))
+            if not drop_replaced:
+                return []
+            replaced = [id for id, in self.conn.execute(
+                "SELECT id FROM expenses WHERE id < 0 AND id NOT IN (SELECT expense_id FROM outbox WHERE kind = 'add')")]
+            self.conn.execute("DELETE FROM expenses WHERE id < 0 AND id NOT IN "
+                              "(SELECT expense_id FROM outbox WHERE kind = 'add')")
+        return replaced
+
+    def add(self, expense):
+        """Store a new expense under a temporary id and queue it for the backend; returns the row"""
+        with self.conn:
+            local_id = self.conn.execute("SELECT MIN(COALESCE(MIN(id), 0), 0) - 1 FROM expenses").fetchone()[0]
+            self.conn.execute("INSERT INTO expenses (id, date, category, amount, description) VALUES (?, ?, ?, ?, ?)",
+                              (local_id, expense["date"], expense["category"], expense["amount"],
+                               expense["description"]))
+            self.conn.execute("INSERT INTO outbox (kind, expense_id, payload) VALUES ('add', ?, ?)",
+                              (local_id, json.dumps({**expense, "client_id": uuid.uuid4().hex})))
+        return {**expense, "id": local_id}
+
+    def delete(self, expense_id):
+        """Remove an expense locally; server rows are queued for deletion, unsent offline adds are dropped"""
+        with self.conn:
+            self.conn.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+            if expense_id < 0:
+                self.conn.execute("DELETE FROM outbox WHERE kind = 'add' AND expense_id = ?", (expense_id,))
+            else:
+                self.conn.execute("INSERT INTO outbox (kind, expense_id) VALUES ('delete', ?)", (expense_id,))
+
+    def pending(self, kind, limit):
+        """Oldest queued writes of one kind, as (seq, expense_id, payload) with the add payloads decoded"""
+        rows = self.conn.execute("SELECT seq, expense_id, payload FROM outbox WHERE kind = ? ORDER BY seq LIMIT ?",
+                                 (kind, limit)).fetchall()
+        return [(seq, expense_id, json.loads(payload) if payload else None) for seq, expense_id, payload in rows]
+
+    def pending_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def sent(self, seqs):
+        """Drop queued writes the backend has taken (or rejected for good)"""
+        with self.conn:
+            self.conn.executemany("DELETE FROM outbox WHERE seq = ?", ((seq,) for seq in seqs))
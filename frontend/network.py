@@ -0,0 +1,177 @@
+"""Background HTTP layer for the dashboard.
+
+Requests run on a QThreadPool over one keep-alive requests.Session and their
+replies are delivered back on the GUI thread through a Qt signal, so the
+window never blocks on the network. Bodies are decompressed and decoded on
+the pool thread too, in whichever format wire.accept_header() asked for.
+"""
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+import wire
+
+
+class Reply:
+    """Outcome of one request; status_code is None when the request itself failed"""
+    def __init__(self, status_code=None, payload=None, headers=None, error=None, changed=True):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+        self.error = error
+        # False when a revalidated GET got a 304 and payload is the cached copy
+        self.changed = changed
+
+
+class _Signals(QObject):
+    finished = pyqtSignal(object, object)  # task, Reply
+
+
+class _Task(QRunnable):
+    """Performs one HTTP request on a pool thread, decoding the body off the GUI thread"""
+    def __init__(self, session, signals, method, url, timeout, kwargs):
+        super().__init__()
+        self.setAutoDelete(False)  # ApiClient owns the task until its reply is handled
+        self.session = session
+        self.signals = signals
+        self.method = method
+        self.url = url
+        self.timeout = timeout
+        self.kwargs = kwargs
+        self.key = None
+        self.signature = None
+        self.callbacks = []
+        self.revalidated = None
+        self.cancelled = False
+
+    def run(self):
+        try:
+            response = self.session.request(self.method, self.url, timeout=self.timeout, **self.kwargs)
+            payload = None
+            if response.content:
+                try:
+                    payload = wire.decode(response.headers.get("Content-Type", ""), response.content)
+                except ValueError:
+                    pass
+            reply = Reply(response.status_code, payload, dict(response.headers))
+        except requests.RequestException as exc:
+            reply = Reply(error=str(exc))
+        self.signals.finished.emit(self, reply)
+
+
+class ApiClient(QObject):
+    """Asynchronous client for the Finance Dashboard backend.
+
+    Requests that share a key are coalesced when identical and cancel each
+    other otherwise: only the newest request for a key reports back. GETs are
+    revalidated with the last ETag seen for their URL; only the most recently
+    used ETAG_CACHE_SIZE URLs are remembered, since every distinct search
+    query is a URL of its own.
+    """
+    ETAG_CACHE_SIZE = 32
+
+    def __init__(self, base_url, max_threads=4, timeout=10, token=None, parent=None):
+        super().__init__(parent)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        # One keep-alive session with a connection per worker thread
+        self.session = requests.Session()
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        # requests already sends Accept-Encoding for every coding it can decompress
+        accept = wire.accept_header()
+        if accept:
+            self.session.headers["Accept"] = accept
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_threads)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._signals = _Signals()
+        self._signals.finished.connect(self._on_finished)
+
+        self._in_flight = {}  # key -> task
+        self._detached = set()  # unkeyed or cancelled tasks, kept alive until they finish
+        self._etags = OrderedDict()  # full url -> (etag, payload) of the last 200 response, least recent first
+
+    def get(self, path, callback, key=None, params=None, revalidate=True):
+        self.request("GET", path, callback, key=key, params=params, revalidate=revalidate)
+
+    def post(self, path, callback, key=None, json=None):
+        self.request("POST", path, callback, key=key, json=json)
+
+    def delete(self, path, callback, key=None):
+        self.request("DELETE", path, callback, key=key)
+
+    def request(self, method, path, callback, key=None, params=None, revalidate=False, **kwargs):
+        url = requests.Request(method, self.base_url + path, params=params).prepare().url
+
+        if key is not None:
+            current = self._in_flight.get(key)
+            if current is not None:
+                # Identical request already running: share its reply
+                if current.signature == (method, url, kwargs):
+                    current.callbacks.append(callback)
+                    return
+                self.cancel(key)
+
+        cached = self._etags.get(url) if revalidate else None
+        task_kwargs = dict(kwargs)
+        if cached is not None:
+            self._etags.move_to_end(url)
+            task_kwargs["headers"] = {**task_kwargs.get("headers", {}), "If-None-Match": cached[0]}
+
+        task = _Task(self.session, self._signals, method, url, self.timeout, task_kwargs)
+        task.key = key
+        task.signature = (method, url, kwargs)
+        task.callbacks.append(callback)
+        task.revalidated = cached
+        if key is not None:
+            self._in_flight[key] = task
+        else:
+            self._detached.add(task)
+        self.pool.start(task)
+
+    def in_flight(self, key):
+        return key in self._in_flight
+
+    def cancel(self, key):
+        """Drop the pending request for key; a queued one never runs and a running one is ignored"""
+        task = self._in_flight.pop(key, None)
+        if task is not None:
+            task.cancelled = True
+            if not self.pool.tryTake(task):
+                self._detached.add(task)
+
+    def shutdown(self, wait_ms=2000):
+        for key in list(self._in_flight):
+            self.cancel(key)
+        self.pool.clear()
+        self.pool.waitForDone(wait_ms)
+        self.session.close()
+
+    def _on_finished(self, task, reply):
+        if task.key is not None and self._in_flight.get(task.key) is task:
+            del self._in_flight[task.key]
+        self._detached.discard(task)
+        if task.cancelled:
+            return
+
+        if task.method == "GET":
+            if reply.status_code == 304 and task.revalidated is not None:
+                reply = Reply(200, task.revalidated[1], reply.headers, changed=False)
+            elif reply.status_code == 200 and reply.payload is not None and "ETag" in reply.headers:
+                self._remember_etag(task.url, reply.headers["ETag"], reply.payload)
+
+        for callback in task.callbacks:
+            callback(reply)
+
+    def _remember_etag(self, url, etag, payload):
+        self._etags[url] = (etag, payload)
+        self._etags.move_to_end(url)
+        while len(self._etags) > self.ETAG_CACHE_SIZE:
+            self._etags.popitem(last=False)
@@ -0,0 +1,50 @@
+"""Decoding of backend response bodies: JSON, and Arrow or MessagePack columns when installed.
+
+The backend answers /expenses and /visualize in a binary columnar format
+when the Accept header asks for one. Arrow bodies decode to numpy columns
+without parsing each value; both binary formats are optional here as they
+are on the backend, and JSON is always accepted.
+"""
+import json
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # optional; Arrow bodies are not requested without it
+    pyarrow = None
+try:
+    import msgpack
+except ImportError:  # optional; MessagePack bodies are not requested without it
+    msgpack = None
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MIMETYPE = "application/msgpack"
+
+
+def accept_header():
+    """Accept header preferring the binary formats this install can decode, or None for plain JSON"""
+    binary = [mimetype for mimetype, library in ((ARROW_MIMETYPE, pyarrow), (MSGPACK_MIMETYPE, msgpack))
+              if library is not None]
+    return ", ".join(binary + ["application/json;q=0.5"]) if binary else None
+
+
+def decode(content_type, content):
+    """Payload of a response body, or None when its type is not one the dashboard reads"""
+    if ARROW_MIMETYPE in content_type and pyarrow is not None:
+        return decode_arrow(content)
+    if MSGPACK_MIMETYPE in content_type and msgpack is not None:
+        return msgpack.unpackb(content)
+    if "json" in content_type:
+        return json.loads(content)
+    return None
+
+
+def decode_arrow(content):
+    """Columns of an Arrow stream as numpy arrays, plus the fields kept in its schema metadata"""
+    table = pyarrow.ipc.open_stream(content).read_all()
+    payload = {key.decode(): json.loads(value) for key, value in (table.schema.metadata or {}).items()}
+    for name, column in zip(table.column_names, table.columns):
+        if pyarrow.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        payload[name] = column.to_numpy()
+    return payload